@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -8,14 +8,97 @@ class Settings(BaseSettings):
     
     # Firebase
     firebase_credentials_path: str = "./serviceAccountKey.json"
+    firestore_max_workers: int = 16  # Threads for blocking Firestore calls
+    
+    # Storage backend: "firestore" or "memory"
+    storage_backend: str = "firestore"
+    memory_latency_ms: float = 0.0  # Simulated latency per operation
+    memory_jitter_ms: float = 0.0  # Extra random latency, 0..jitter
+    memory_op_latency_ms: Dict[str, float] = {}  # Per-operation override, e.g. {"get": 5}
+    memory_latency_seed: Optional[int] = None
+    memory_snapshot_path: Optional[str] = None  # JSON file to load/save the store
+    memory_snapshot_interval_s: float = 30.0
     
     # JWT
     jwt_secret_key: str = "dev-secret-key-change-in-production"
     jwt_algorithm: str = "HS256"
     jwt_expiration_hours: int = 24
+    session_token_ttl_s: int = 900  # Local session tokens issued for a Firebase ID token
+    
+    # Legacy email/password auth: bcrypt runs on a process pool, off the event loop
+    bcrypt_rounds: int = 12  # Stored hashes with a lower cost are upgraded on the next login
+    password_hash_workers: int = 2  # 0 = hash on the event loop
+    password_hash_max_queue: int = 64  # Hashes in flight before logins are refused with 503
+    
+    # Resident games (finished and abandoned ones are evicted; running ones spill to storage over the caps)
+    game_max_resident: int = 10000
+    game_max_resident_mb: int = 256
+    game_finished_ttl_s: float = 300.0
+    game_abandoned_ttl_s: float = 1800.0
+    
+    checkpoint_interval_s: float = 1.0  # How often changed running games are checkpointed
+    
+    # Write-behind persistence of answers and results
+    persist_batch_size: int = 500  # Firestore WriteBatch limit
+    persist_flush_interval_s: float = 5.0
+    persist_retry_base_s: float = 0.5
+    persist_retry_max_s: float = 30.0
+    persist_max_queue: int = 100000
+    
+    # Multiple workers: Socket.IO rooms and the connection registry are shared through Redis
+    redis_url: Optional[str] = None  # e.g. redis://localhost:6379/0; unset = single worker
+    redis_prefix: str = "codequest"  # Key and channel prefix
+    worker_heartbeat_s: float = 5.0
+    worker_ttl_s: float = 15.0  # A worker missing heartbeats this long is considered dead
+    room_lease_ttl_s: float = 10.0  # A room's game fails over this long after its worker stops renewing
+    room_ring_vnodes: int = 64  # Points per worker on the room hash ring
+    room_lock_ttl_s: float = 5.0  # Cross-worker lock held around each lobby change
+    
+    # Socket.IO packet serializer: "json", or "msgpack" (binary, integer-keyed game events)
+    socketio_serializer: str = "json"
+    
+    # Admin endpoints (disabled unless a key is set)
+    admin_api_key: Optional[str] = None
+    
+    # Verified Firebase ID token cache
+    token_cache_size: int = 10000
+    token_cache_max_ttl_s: int = 3600  # Entries also expire at the token's own exp
+    
+    # Firebase ID token verification
+    firebase_project_id: Optional[str] = None  # Defaults to the Firebase app's project
+    firebase_certs_file: Optional[str] = None  # Local signing certs (tests/offline) instead of Google's
+    firebase_keys_refresh_s: float = 3600.0  # Used when no Cache-Control max-age is available
+    firebase_keys_refresh_margin_s: float = 300.0  # Refresh this long before the keys expire
+    firebase_keys_min_refresh_s: float = 60.0
+    firebase_keys_retry_s: float = 30.0
+    token_verify_workers: int = 2  # 0 = verify on the event loop
+    token_clock_skew_s: int = 0
+    
+    # Rooms: in-memory room actors are dropped after this long without activity
+    room_actor_idle_s: float = 600.0
+    room_code_batch_size: int = 256  # Free room codes reserved ahead of time
+    disconnect_grace_s: float = 20.0  # A disconnected player leaves their lobby if not back by then
+    
+    # Game timing
+    question_time_s: int = 15
+    question_pause_s: float = 2.0
+    game_clock_tick_ms: int = 100  # Resolution of the shared game timer wheel
+    game_clock_slots: int = 1024
+    broadcast_window_ms: int = 150  # Answers within this window share one broadcast
+    
+    # User profile cache
+    user_cache_size: int = 10000
+    user_cache_ttl_s: float = 300.0
     
     # Quiz API
     quiz_api_url: str = "https://opentdb.com/api.php"
+    quiz_api_timeout_s: float = 10.0
+    quiz_api_min_interval_s: float = 5.0  # OpenTDB allows one request per 5 s per IP
+    quiz_api_backoff_s: float = 30.0  # Pause after being rate limited
+    question_bank_path: str = "./question_bank.db"
+    question_bank_target: int = 500  # Grow each difficulty from OpenTDB up to this size
+    question_bank_refill_s: float = 300.0
+    question_history_size: int = 200  # Recently seen questions remembered per player
     
     # CORS - Allow all origins for development
     cors_origins: List[str] = ["*"]
@@ -1,14 +1,93 @@
+import asyncio
+import functools
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional
 import firebase_admin
 from firebase_admin import credentials, firestore
+from google.api_core.exceptions import AlreadyExists
 from app.config import settings
+from app.database.repository import Repository, StorageBackend, Write
 import os
 
 
-class FirestoreClient:
+# Maximum writes in one Firestore WriteBatch
+MAX_BATCH_WRITES = 500
+
+
+class FirestoreCollection(Repository):
+    """Async access to a Firestore collection.
+    
+    The Firestore SDK is blocking (every call is a gRPC round trip), so each
+    operation runs on the client's bounded thread pool instead of the event loop.
+    """
+    
+    def __init__(self, client: "FirestoreClient", name: str):
+        self._client = client
+        self.name = name
+    
+    @property
+    def ref(self):
+        """Underlying Firestore collection reference"""
+        return self._client.db.collection(self.name)
+    
+    def new_id(self) -> str:
+        """Generate a new document ID (local, no round trip)"""
+        return self.ref.document().id
+    
+    async def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Get a document as a dict, or None if it does not exist"""
+        doc = await self._client.run(self.ref.document(doc_id).get)
+        return doc.to_dict() if doc.exists else None
+    
+    async def exists(self, doc_id: str) -> bool:
+        """Check if a document exists"""
+        doc = await self._client.run(self.ref.document(doc_id).get)
+        return doc.exists
+    
+    async def set(self, doc_id: str, data: Dict[str, Any]) -> None:
+        """Create or overwrite a document"""
+        await self._client.run(self.ref.document(doc_id).set, data)
+    
+    async def create(self, doc_id: str, data: Dict[str, Any]) -> bool:
+        """Create a document unless it exists; False if it already did"""
+        try:
+            await self._client.run(self.ref.document(doc_id).create, data)
+            return True
+        except AlreadyExists:
+            return False
+    
+    async def update(self, doc_id: str, fields: Dict[str, Any]) -> None:
+        """Update fields of an existing document"""
+        await self._client.run(self.ref.document(doc_id).update, fields)
+    
+    async def delete(self, doc_id: str) -> None:
+        """Delete a document"""
+        await self._client.run(self.ref.document(doc_id).delete)
+    
+    async def find_one(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        """Get the first document where `field == value`"""
+        query = self.ref.where(field, "==", value).limit(1)
+        docs = await self._client.run(query.get)
+        return docs[0].to_dict() if docs else None
+    
+    async def stream_ids(self, page_size: int = 500) -> AsyncIterator[str]:
+        """Iterate over all document IDs, one page per round trip"""
+        pages = self.ref.list_documents(page_size=page_size)
+        while True:
+            refs = await self._client.run(lambda: list(itertools.islice(pages, page_size)))
+            if not refs:
+                return
+            for ref in refs:
+                yield ref.id
+
+
+class FirestoreClient(StorageBackend):
     """Firestore database client"""
     
     _instance = None
     _db = None
+    _executor = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -46,22 +125,58 @@ class FirestoreClient:
             self._initialize()
         return self._db
     
-    # Collection references
     @property
-    def users(self):
-        """Users collection"""
-        return self.db.collection('users')
+    def executor(self) -> ThreadPoolExecutor:
+        """Bounded thread pool for blocking Firestore calls"""
+        if self._executor is None:
+            FirestoreClient._executor = ThreadPoolExecutor(
+                max_workers=settings.firestore_max_workers,
+                thread_name_prefix="firestore",
+            )
+        return self._executor
     
-    @property
-    def rooms(self):
-        """Rooms collection"""
-        return self.db.collection('rooms')
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking Firestore call off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
     
-    @property
-    def games(self):
-        """Games collection"""
-        return self.db.collection('games')
+    def _commit(self, writes: List[Write]):
+        batch = self.db.batch()
+        for write in writes:
+            ref = self.db.collection(write.collection).document(write.doc_id)
+            if write.data is None:
+                batch.delete(ref)
+            else:
+                batch.set(ref, write.data, merge=write.merge)
+        batch.commit()
+    
+    async def batch_write(self, writes: List[Write]) -> None:
+        """Commit writes as WriteBatches of up to 500 (one round trip each)"""
+        for start in range(0, len(writes), MAX_BATCH_WRITES):
+            await self.run(self._commit, writes[start:start + MAX_BATCH_WRITES])
+    
+    async def stop(self):
+        """Release the thread pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            FirestoreClient._executor = None
+    
+    def collection(self, name: str) -> FirestoreCollection:
+        """Get a collection by name"""
+        return FirestoreCollection(self, name)
+
+
+def _create_client() -> StorageBackend:
+    """Create the storage backend selected by `settings.storage_backend`"""
+    if settings.storage_backend == "memory":
+        from app.database.memory import MemoryClient
+        return MemoryClient()
+    if settings.storage_backend != "firestore":
+        raise ValueError(f"Unknown storage backend: {settings.storage_backend}")
+    return FirestoreClient()
 
 
-# Singleton instance
-firestore_client = FirestoreClient()
+# Singleton instance (named for the default backend)
+firestore_client = _create_client()
@@ -0,0 +1,191 @@
+import asyncio
+import copy
+import json
+import os
+import random
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional
+from app.config import settings
+from app.database.repository import Repository, StorageBackend, Write
+
+
+def _merge(target: dict, fields: dict):
+    """Deep-merge nested dicts, like a Firestore set with merge=True"""
+    for key, value in fields.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+
+class MemoryCollection(Repository):
+    """In-process document collection.
+    
+    Documents are deep-copied on the way in and out so callers never share
+    state with the store, the same as with a remote database.
+    """
+    
+    def __init__(self, client: "MemoryClient", name: str, docs: Dict[str, dict]):
+        self._client = client
+        self.name = name
+        self._docs = docs
+    
+    def new_id(self) -> str:
+        """Generate a new document ID (local, no round trip)"""
+        return uuid.uuid4().hex[:20]
+    
+    async def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Get a document as a dict, or None if it does not exist"""
+        await self._client.simulate_latency("get")
+        doc = self._docs.get(doc_id)
+        return copy.deepcopy(doc) if doc is not None else None
+    
+    async def exists(self, doc_id: str) -> bool:
+        """Check if a document exists"""
+        await self._client.simulate_latency("get")
+        return doc_id in self._docs
+    
+    async def set(self, doc_id: str, data: Dict[str, Any]) -> None:
+        """Create or overwrite a document"""
+        await self._client.simulate_latency("set")
+        self._docs[doc_id] = copy.deepcopy(data)
+        self._client.dirty = True
+    
+    async def create(self, doc_id: str, data: Dict[str, Any]) -> bool:
+        """Create a document unless it exists; False if it already did"""
+        await self._client.simulate_latency("set")
+        if doc_id in self._docs:
+            return False
+        self._docs[doc_id] = copy.deepcopy(data)
+        self._client.dirty = True
+        return True
+    
+    async def update(self, doc_id: str, fields: Dict[str, Any]) -> None:
+        """Update fields of an existing document"""
+        await self._client.simulate_latency("update")
+        if doc_id not in self._docs:
+            raise KeyError(f"No document to update: {self.name}/{doc_id}")
+        self._docs[doc_id].update(copy.deepcopy(fields))
+        self._client.dirty = True
+    
+    async def delete(self, doc_id: str) -> None:
+        """Delete a document"""
+        await self._client.simulate_latency("delete")
+        if self._docs.pop(doc_id, None) is not None:
+            self._client.dirty = True
+    
+    async def find_one(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        """Get the first document where `field == value`"""
+        await self._client.simulate_latency("query")
+        for doc in self._docs.values():
+            if doc.get(field) == value:
+                return copy.deepcopy(doc)
+        return None
+    
+    async def stream_ids(self) -> AsyncIterator[str]:
+        """Iterate over all document IDs"""
+        await self._client.simulate_latency("query")
+        for doc_id in list(self._docs):
+            yield doc_id
+
+
+class MemoryClient(StorageBackend):
+    """In-memory storage backend for local development and load testing.
+    
+    Every operation can be delayed by a configurable latency plus random
+    jitter, so the service hot paths can be benchmarked offline against
+    different storage round-trip times. Optionally the whole store is loaded
+    from and periodically snapshotted to a JSON file.
+    """
+    
+    def __init__(
+        self,
+        latency_ms: Optional[float] = None,
+        jitter_ms: Optional[float] = None,
+        op_latency_ms: Optional[Dict[str, float]] = None,
+        snapshot_path: Optional[str] = None,
+    ):
+        self.latency_ms = settings.memory_latency_ms if latency_ms is None else latency_ms
+        self.jitter_ms = settings.memory_jitter_ms if jitter_ms is None else jitter_ms
+        self.op_latency_ms = dict(
+            settings.memory_op_latency_ms if op_latency_ms is None else op_latency_ms
+        )
+        self.snapshot_path = snapshot_path or settings.memory_snapshot_path
+        self.dirty = False
+        self._data: Dict[str, Dict[str, dict]] = {}
+        self._random = random.Random(settings.memory_latency_seed)
+        self._snapshot_task: Optional[asyncio.Task] = None
+        
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            self.load_snapshot()
+    
+    def collection(self, name: str) -> MemoryCollection:
+        """Get a collection by name"""
+        return MemoryCollection(self, name, self._data.setdefault(name, {}))
+    
+    async def batch_write(self, writes: List[Write]) -> None:
+        """Apply writes together after a single simulated round trip"""
+        await self.simulate_latency("batch")
+        for write in writes:
+            docs = self._data.setdefault(write.collection, {})
+            if write.data is None:
+                docs.pop(write.doc_id, None)
+            elif write.merge and write.doc_id in docs:
+                _merge(docs[write.doc_id], write.data)
+            else:
+                docs[write.doc_id] = copy.deepcopy(write.data)
+        if writes:
+            self.dirty = True
+    
+    async def simulate_latency(self, op: str):
+        """Sleep for the configured latency of an operation (get, set, update, delete, query, batch)"""
+        delay = self.op_latency_ms.get(op, self.latency_ms)
+        if self.jitter_ms:
+            delay += self._random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+    
+    def load_snapshot(self):
+        """Replace the store with the contents of the snapshot file"""
+        with open(self.snapshot_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        # Update in place: services hold on to their collection objects
+        for docs in self._data.values():
+            docs.clear()
+        for name, docs in data.items():
+            self._data.setdefault(name, {}).update(docs)
+        self.dirty = False
+        print(f"Loaded memory storage snapshot from {self.snapshot_path}")
+    
+    def save_snapshot(self):
+        """Atomically write the store to the snapshot file"""
+        if not self.snapshot_path:
+            return
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, default=str)
+        os.replace(tmp_path, self.snapshot_path)
+        self.dirty = False
+    
+    async def _snapshot_loop(self):
+        """Periodically snapshot the store while it has unsaved changes"""
+        while True:
+            await asyncio.sleep(settings.memory_snapshot_interval_s)
+            if self.dirty:
+                try:
+                    self.save_snapshot()
+                except OSError as e:
+                    print(f"Error saving memory storage snapshot: {e}")
+    
+    async def start(self):
+        """Start periodic snapshots if a snapshot file is configured"""
+        if self.snapshot_path and self._snapshot_task is None:
+            self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+    
+    async def stop(self):
+        """Stop periodic snapshots and write a final one"""
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+            self._snapshot_task = None
+        if self.dirty:
+            self.save_snapshot()
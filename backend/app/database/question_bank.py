@@ -0,0 +1,259 @@
+import asyncio
+import json
+import random
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from app.config import settings
+from app.models.question import QuizQuestion
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    question TEXT NOT NULL UNIQUE,
+    options TEXT NOT NULL,
+    correct_answer INTEGER NOT NULL,
+    difficulty TEXT NOT NULL,
+    category TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_questions_difficulty_category
+    ON questions (difficulty, category);
+CREATE TABLE IF NOT EXISTS seen_questions (
+    seen_by TEXT NOT NULL,
+    question_id INTEGER NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (seen_by, question_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_seen_questions_seen_at
+    ON seen_questions (seen_by, seen_at);
+"""
+
+
+def _row_to_question(row: tuple) -> QuizQuestion:
+    """Build a question from an (id, question, options, correct_answer, difficulty, category) row"""
+    return QuizQuestion(
+        id=str(row[0]),
+        question=row[1],
+        options=json.loads(row[2]),
+        correct_answer=row[3],
+        difficulty=row[4],
+        category=row[5]
+    )
+
+
+class QuestionBank:
+    """Persistent local question bank backed by SQLite.
+    
+    Questions are indexed by difficulty and category. The IDs of each
+    (difficulty, category) selection are cached in memory, so a game's
+    questions are drawn with `random.sample` (no replacement) and one
+    lookup by primary key instead of an `ORDER BY RANDOM()` scan. The
+    cache is dropped when this process inserts questions, and when SQLite's
+    data_version shows another process (e.g. manage_questions.py) committed.
+    
+    The bank also remembers which questions each player (or room) has seen
+    recently and prefers unseen ones. SQLite is blocking, so every call runs
+    on the bank's single worker thread, which also serialises access to the
+    connection.
+    """
+    
+    def __init__(self, path: str, history_size: int = 200):
+        self.path = path
+        self.history_size = history_size
+        self._conn: Optional[sqlite3.Connection] = None
+        self._ids: Dict[Tuple[str, Optional[str]], List[int]] = {}
+        self._data_version: Optional[int] = None  # Of the cached IDs (changes on other processes' commits)
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """The worker thread, created on first use (and again after `stop`)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="question-bank")
+        return self._executor
+    
+    async def run(self, func, *args):
+        """Run a blocking bank call on the worker thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open the database on first use (worker thread only)"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+    
+    # Blocking implementations (worker thread)
+    
+    def insert_batch(self, questions: Iterable[QuizQuestion]) -> int:
+        """Insert questions in one transaction, skipping duplicates (worker thread only)"""
+        now = time.time()
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT OR IGNORE INTO questions "
+                "(question, options, correct_answer, difficulty, category, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (q.question, json.dumps(q.options), q.correct_answer, q.difficulty, q.category, now)
+                    for q in questions
+                ),
+            )
+        added = cursor.rowcount
+        if added:
+            self._ids.clear()
+        return added
+    
+    def _select_ids(self, difficulty: str, category: Optional[str]) -> List[int]:
+        # Another process (e.g. manage_questions.py) committed since the IDs were cached
+        data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            self._ids.clear()
+            self._data_version = data_version
+        key = (difficulty, category)
+        ids = self._ids.get(key)
+        if ids is None:
+            if category is None:
+                rows = self.conn.execute(
+                    "SELECT id FROM questions WHERE difficulty = ?", (difficulty,)
+                )
+            else:
+                rows = self.conn.execute(
+                    "SELECT id FROM questions WHERE difficulty = ? AND category = ?",
+                    (difficulty, category)
+                )
+            ids = self._ids[key] = [row[0] for row in rows]
+        return ids
+    
+    def _seen(self, seen_by: Sequence[str]) -> set:
+        if not seen_by:
+            return set()
+        placeholders = ",".join("?" * len(seen_by))
+        rows = self.conn.execute(
+            f"SELECT question_id FROM seen_questions WHERE seen_by IN ({placeholders})",
+            tuple(seen_by)
+        )
+        return {row[0] for row in rows}
+    
+    def _record_seen(self, seen_by: Sequence[str], question_ids: List[int]):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO seen_questions (seen_by, question_id, seen_at) VALUES (?, ?, ?)",
+                ((key, qid, now) for key in seen_by for qid in question_ids),
+            )
+            # Keep only the most recent history per player/room
+            for key in seen_by:
+                self.conn.execute(
+                    "DELETE FROM seen_questions WHERE seen_by = ? AND question_id NOT IN ("
+                    "SELECT question_id FROM seen_questions WHERE seen_by = ? "
+                    "ORDER BY seen_at DESC LIMIT ?)",
+                    (key, key, self.history_size)
+                )
+    
+    def _load(self, question_ids: List[int]) -> List[QuizQuestion]:
+        placeholders = ",".join("?" * len(question_ids))
+        rows = self.conn.execute(
+            "SELECT id, question, options, correct_answer, difficulty, category "
+            f"FROM questions WHERE id IN ({placeholders})",
+            question_ids
+        )
+        by_id = {row[0]: _row_to_question(row) for row in rows}
+        return [by_id[qid] for qid in question_ids if qid in by_id]
+    
+    def _sample(
+        self,
+        difficulty: str,
+        count: int,
+        seen_by: Sequence[str],
+        category: Optional[str]
+    ) -> List[QuizQuestion]:
+        ids = self._select_ids(difficulty, category)
+        if not ids:
+            return []
+        
+        seen = self._seen(seen_by)
+        # Oversample by the history size so enough unseen IDs survive the filter
+        drawn = random.sample(ids, min(len(ids), count + len(seen)))
+        chosen = [qid for qid in drawn if qid not in seen][:count]
+        if len(chosen) < count:
+            # Not enough unseen questions: allow repeats
+            chosen += [qid for qid in drawn if qid in seen][:count - len(chosen)]
+        
+        if seen_by:
+            self._record_seen(seen_by, chosen)
+        return self._load(chosen)
+    
+    def _page(self, after_id: int, limit: int) -> List[QuizQuestion]:
+        rows = self.conn.execute(
+            "SELECT id, question, options, correct_answer, difficulty, category "
+            "FROM questions WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit)
+        )
+        return [_row_to_question(row) for row in rows]
+    
+    def iter_all(self, page_size: int = 500) -> Iterator[QuizQuestion]:
+        """Stream every question in ID order, one page in memory at a time (worker thread only)"""
+        after_id = 0
+        while True:
+            page = self._page(after_id, page_size)
+            if not page:
+                return
+            yield from page
+            after_id = int(page[-1].id)
+    
+    def _counts(self) -> Dict[str, int]:
+        rows = self.conn.execute("SELECT difficulty, COUNT(*) FROM questions GROUP BY difficulty")
+        return dict(rows.fetchall())
+    
+    # Async API
+    
+    async def add_many(self, questions: Iterable[QuizQuestion]) -> int:
+        """Insert questions, skipping ones already in the bank; returns the number added"""
+        return await self.run(self.insert_batch, list(questions))
+    
+    async def sample(
+        self,
+        difficulty: str,
+        count: int,
+        seen_by: Sequence[str] = (),
+        category: Optional[str] = None
+    ) -> List[QuizQuestion]:
+        """Draw up to `count` distinct questions, preferring ones nobody in `seen_by` has seen"""
+        return await self.run(self._sample, difficulty, count, tuple(seen_by), category)
+    
+    async def page(self, after_id: int = 0, limit: int = 500) -> List[QuizQuestion]:
+        """Questions with an ID above `after_id`, in ID order (keyset pagination)"""
+        return await self.run(self._page, after_id, limit)
+    
+    async def counts(self) -> Dict[str, int]:
+        """Number of questions per difficulty"""
+        return await self.run(self._counts)
+    
+    async def start(self):
+        """Open the database and create the schema"""
+        await self.run(lambda: self.conn)
+    
+    async def stop(self):
+        """Close the database"""
+        if self._conn is not None:
+            await self.run(self._conn.close)
+            self._conn = None
+            self._ids.clear()
+            self._data_version = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Singleton instance
+question_bank = QuestionBank(
+    path=settings.question_bank_path,
+    history_size=settings.question_history_size,
+)
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from app.config import settings
+
+
+class RedisClient:
+    """Shared Redis connection used to coordinate several workers.
+    
+    Disabled (every worker keeps its own state) unless `redis_url` is set.
+    The `redis` package is only imported when it is.
+    """
+    
+    def __init__(self, url: Optional[str], prefix: str):
+        self.url = url
+        self.prefix = prefix
+        # Unique per process, also across restarts of the same PID
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._client = None
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url)
+    
+    @property
+    def client(self):
+        """`redis.asyncio.Redis` connection pool (created on first use)"""
+        if self._client is None:
+            import redis.asyncio as redis
+            self._client = redis.Redis.from_url(self.url, decode_responses=True)
+        return self._client
+    
+    def key(self, *parts: str) -> str:
+        """Namespaced key, e.g. key("room", "ABC123") -> "codequest:room:ABC123" """
+        return ":".join((self.prefix, *parts))
+    
+    @asynccontextmanager
+    async def lock(self, name: str, ttl_s: float = 5.0, wait_s: float = 10.0) -> AsyncIterator[None]:
+        """Hold a short cross-worker lock (`SET NX PX`), waiting up to `wait_s` for it.
+        
+        The lock expires after `ttl_s` if its holder dies, and is only
+        released by the holder that set it.
+        """
+        key = self.key("lock", name)
+        token = uuid.uuid4().hex
+        give_up = time.monotonic() + wait_s
+        delay = 0.005
+        while not await self.client.set(key, token, nx=True, px=int(ttl_s * 1000)):
+            if time.monotonic() > give_up:
+                raise TimeoutError(f"Timed out waiting for lock {name}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.1)
+        try:
+            yield
+        finally:
+            await self._delete_if_equal(key, token)
+    
+    async def _delete_if_equal(self, key: str, value: str) -> bool:
+        """Delete a key only if it still holds `value` (WATCH/MULTI check-and-delete)"""
+        from redis.exceptions import WatchError
+        
+        async with self.client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                if await pipe.get(key) != value:
+                    await pipe.unwatch()
+                    return False
+                pipe.multi()
+                pipe.delete(key)
+                await pipe.execute()
+                return True
+            except WatchError:
+                return False
+    
+    async def stop(self):
+        """Close the connection pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Singleton instance
+redis_client = RedisClient(settings.redis_url, settings.redis_prefix)
@@ -0,0 +1,96 @@
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional
+
+
+class Write(NamedTuple):
+    """One document write in a batch (`data=None` deletes the document)"""
+    collection: str
+    doc_id: str
+    data: Optional[Dict[str, Any]]
+    merge: bool = True  # Merge nested fields into an existing document instead of replacing it
+
+
+class Repository(ABC):
+    """Async document collection interface implemented by every storage backend"""
+    
+    name: str
+    
+    @abstractmethod
+    def new_id(self) -> str:
+        """Generate a new document ID (local, no round trip)"""
+    
+    @abstractmethod
+    async def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Get a document as a dict, or None if it does not exist"""
+    
+    @abstractmethod
+    async def exists(self, doc_id: str) -> bool:
+        """Check if a document exists"""
+    
+    @abstractmethod
+    async def set(self, doc_id: str, data: Dict[str, Any]) -> None:
+        """Create or overwrite a document"""
+    
+    @abstractmethod
+    async def create(self, doc_id: str, data: Dict[str, Any]) -> bool:
+        """Create a document unless it exists; False if it already did"""
+    
+    @abstractmethod
+    async def update(self, doc_id: str, fields: Dict[str, Any]) -> None:
+        """Update fields of an existing document"""
+    
+    @abstractmethod
+    async def delete(self, doc_id: str) -> None:
+        """Delete a document"""
+    
+    @abstractmethod
+    async def find_one(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        """Get the first document where `field == value`"""
+    
+    @abstractmethod
+    def stream_ids(self) -> AsyncIterator[str]:
+        """Iterate over all document IDs without reading the documents"""
+
+
+class StorageBackend(ABC):
+    """A set of named collections"""
+    
+    @abstractmethod
+    def collection(self, name: str) -> Repository:
+        """Get a collection by name"""
+    
+    @abstractmethod
+    async def batch_write(self, writes: List[Write]) -> None:
+        """Apply writes atomically, in as few round trips as the backend allows"""
+    
+    async def start(self) -> None:
+        """Start background work (called on app startup)"""
+    
+    async def stop(self) -> None:
+        """Stop background work and flush state (called on app shutdown)"""
+    
+    # Collection references
+    @property
+    def users(self) -> Repository:
+        """Users collection"""
+        return self.collection('users')
+    
+    @property
+    def rooms(self) -> Repository:
+        """Rooms collection"""
+        return self.collection('rooms')
+    
+    @property
+    def games(self) -> Repository:
+        """Games collection"""
+        return self.collection('games')
+    
+    @property
+    def answers(self) -> Repository:
+        """Player answers collection (one document per game, question and player)"""
+        return self.collection('answers')
+    
+    @property
+    def checkpoints(self) -> Repository:
+        """Checkpoints of running games (one document per game)"""
+        return self.collection('checkpoints')
@@ -2,12 +2,16 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import socketio
 from app.config import settings
+from app.database.firestore import firestore_client
+from app.utils import fast_json
+from app.utils.fast_json import FastJSONResponse
 
 # Create FastAPI app
 app = FastAPI(
     title="CodeQuest Multiplayer API",
     description="Real-time multiplayer quiz game backend",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 # Configure CORS
@@ -19,16 +23,63 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# With several workers, rooms and broadcasts are shared through Redis pub/sub
+client_manager = None
+if settings.redis_url:
+    client_manager = socketio.AsyncRedisManager(
+        settings.redis_url,
+        channel=f"{settings.redis_prefix}:socketio",
+    )
+
+# Mobile clients on poor networks can use a MessagePack build (see /protocol)
+serializer = "default"
+if settings.socketio_serializer == "msgpack":
+    from app.sockets.serializer import CompactMsgPackPacket
+    serializer = CompactMsgPackPacket
+
 # Create Socket.IO server
 sio = socketio.AsyncServer(
     async_mode="asgi",
     cors_allowed_origins=settings.cors_origins,
+    client_manager=client_manager,
+    json=fast_json,
+    serializer=serializer,
 )
 
 # Wrap with ASGI app
 socket_app = socketio.ASGIApp(sio, app)
 
 
+@app.on_event("startup")
+async def startup():
+    """Start background services"""
+    await firestore_client.start()
+    await connections.start()
+    await ownership.start()
+    await token_service.start()
+    await password_hasher.start()
+    await room_service.start()
+    await quiz_service.start()
+    await game_writes.start()
+    await game_checkpoints.start()
+    await game_events.resume_games()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background services"""
+    await game_clock.stop()
+    await quiz_service.stop()
+    await game_checkpoints.stop()
+    await game_writes.stop()
+    await ownership.stop()
+    await token_service.stop()
+    await password_hasher.stop()
+    await connections.stop()
+    await redis_client.stop()
+    await firestore_client.stop()
+
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -45,6 +96,7 @@ async def health_check():
     return {
         "status": "healthy",
         "environment": settings.environment,
+        "storage": settings.storage_backend,
         "features": {
             "authentication": True,
             "rooms": True,
@@ -54,11 +106,51 @@ async def health_check():
     }
 
 
+@app.get("/protocol")
+async def protocol():
+    """Socket.IO wire format: serializer and the integer keys of compact (MessagePack) events"""
+    return {
+        "serializer": settings.socketio_serializer,
+        "event_schemas": EVENT_SCHEMAS if settings.socketio_serializer == "msgpack" else {},
+    }
+
+
+@app.get("/stats")
+async def stats():
+    """Runtime cache and queue metrics"""
+    return {
+        "token_cache": token_service.stats(),
+        "signing_keys": token_service.key_store.stats(),
+        "user_cache": auth_service.user_cache.stats(),
+        "password_hashing": password_hasher.stats(),
+        "room_codes": room_service.code_allocator.stats(),
+        "game_clock": game_clock.stats(),
+        "answer_broadcasts": answer_broadcaster.stats(),
+        "questions": quiz_service.stats(),
+        "persistence": game_writes.stats(),
+        "games": game_service.active_games.stats(),
+        "checkpoints": game_checkpoints.stats(),
+        "connections": connections.stats(),
+        "rooms": ownership.stats(),
+    }
+
+
 # Import routers
-from app.routers import auth, rooms, rooms_test
+from app.database.redis_client import redis_client
+from app.routers import auth, questions, rooms, rooms_test
+from app.services.auth_service import auth_service
+from app.services.checkpoints import game_checkpoints
+from app.services.game_clock import game_clock
+from app.services.game_service import game_service
+from app.services.password_hasher import password_hasher
+from app.services.persistence import game_writes
+from app.services.quiz_service import quiz_service
+from app.services.room_service import room_service
+from app.services.token_service import token_service
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(rooms.router, prefix="/api/rooms", tags=["rooms"])
 app.include_router(rooms_test.router, prefix="/api/test/rooms", tags=["test-rooms"])
+app.include_router(questions.router, prefix="/api/admin/questions", tags=["admin"])
 
 # Quiz router will be added in next phase
 # from app.routers import quiz
@@ -66,3 +158,7 @@ app.include_router(rooms_test.router, prefix="/api/test/rooms", tags=["test-room
 
 # Import socket handlers
 from app.sockets import game_events
+from app.sockets.broadcast import answer_broadcaster
+from app.sockets.connections import connections
+from app.sockets.ownership import ownership
+from app.sockets.schemas import EVENT_SCHEMAS
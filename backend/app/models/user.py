@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, EmailStr, Field
 
 
@@ -32,9 +33,12 @@ class Token(BaseModel):
     """JWT token model"""
     access_token: str
     token_type: str = "bearer"
+    expires_in: Optional[int] = None  # Seconds
 
 
 class TokenData(BaseModel):
     """Token payload data"""
     user_id: str
     username: str
+    email: Optional[str] = None
+    firebase: bool = False  # Verified from a Firebase ID token rather than our own JWT
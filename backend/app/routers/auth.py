@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.models.user import UserCreate, UserLogin, User, Token
+from app.models.user import UserCreate, UserLogin, User, Token, TokenData
 from app.services.auth_service import auth_service
-from app.utils.security import decode_access_token
+from app.services.password_hasher import PasswordPoolFull
+from app.services.token_service import token_service
+from app.utils.security import is_access_token, session_tokens_enabled
 import firebase_admin
-from firebase_admin import auth as firebase_auth, credentials
+from firebase_admin import credentials
 from app.config import settings
 import os
 
@@ -34,34 +36,38 @@ except ValueError:
 
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
-    """Get current authenticated user from Firebase ID token"""
+    """Get current authenticated user from a session token or Firebase ID token"""
     token = credentials.credentials
     
-    if not firebase_initialized:
+    # Our own tokens are checked locally; only Firebase ID tokens need the SDK
+    if not firebase_initialized and not is_access_token(token):
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Firebase authentication is not configured. Please contact administrator.",
         )
     
     try:
-        # Verify Firebase ID token
-        decoded_token = firebase_auth.verify_id_token(token)
-        user_id = decoded_token['uid']
-        email = decoded_token.get('email', 'user@codequest.com')
-        name = decoded_token.get('name') or decoded_token.get('email', 'Player').split('@')[0]
+        token_data = await token_service.authenticate(token)
+        
+        if not token_data.firebase:
+            user = await auth_service.get_user_by_id(token_data.user_id)
+            if user is None:
+                raise ValueError("User not found")
+            return user
         
         # Get or create user in Firestore
         user = await auth_service.get_or_create_firebase_user(
-            user_id=user_id,
-            email=email,
-            username=name
+            user_id=token_data.user_id,
+            email=token_data.email or "user@codequest.com",
+            username=token_data.username
         )
+        
         return user
         
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Invalid Firebase token: {str(e)}",
+            detail=f"Invalid token: {str(e)}",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
@@ -83,6 +89,12 @@ async def register(user_data: UserCreate):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except PasswordPoolFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
 
 
 @router.post("/login", response_model=dict)
@@ -105,6 +117,35 @@ async def login(credentials: UserLogin):
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=str(e)
         )
+    except PasswordPoolFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
+
+
+@router.post("/session", response_model=Token)
+async def create_session(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Exchange a Firebase ID token for a short-lived session token (verified without Firebase)"""
+    token = credentials.credentials
+    if is_access_token(token):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected a Firebase ID token",
+        )
+    if not session_tokens_enabled():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Session tokens are disabled until JWT_SECRET_KEY is set",
+        )
+    
+    user = await get_current_user(credentials)
+    token_data = TokenData(user_id=user.user_id, username=user.username, email=user.email)
+    return Token(
+        access_token=token_service.issue_session_token(token_data),
+        expires_in=settings.session_token_ttl_s,
+    )
 
 
 @router.get("/me", response_model=User)
@@ -0,0 +1,50 @@
+import io
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.database.question_bank import question_bank
+from app.services.question_io import export_questions_async, import_questions_async
+
+router = APIRouter()
+
+MEDIA_TYPES = {"jsonl": "application/x-ndjson", "csv": "text/csv"}
+
+
+async def require_admin(x_admin_key: Optional[str] = Header(None)):
+    """Allow the request only with the configured admin key"""
+    if not settings.admin_api_key:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints are disabled (ADMIN_API_KEY is not set)"
+        )
+    if not x_admin_key or not secrets.compare_digest(x_admin_key, settings.admin_api_key):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin key"
+        )
+
+
+@router.post("/import", dependencies=[Depends(require_admin)])
+async def import_question_file(
+    file: UploadFile = File(...),
+    format: str = Query("jsonl", pattern="^(jsonl|csv)$")
+):
+    """Import a JSONL/CSV question file into the question bank"""
+    # The upload is spooled to disk, so this streams it line by line
+    lines = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        return await import_questions_async(question_bank, lines, format)
+    finally:
+        lines.detach()
+
+
+@router.get("/export", dependencies=[Depends(require_admin)])
+async def export_question_bank(format: str = Query("jsonl", pattern="^(jsonl|csv)$")):
+    """Download the whole question bank as JSONL/CSV"""
+    return StreamingResponse(
+        export_questions_async(question_bank, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="questions.{format}"'}
+    )
@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from app.models.room import Room
 from app.models.user import User
 from app.services.room_service import room_service
+from app.utils.fast_json import FastJSONResponse
 from app.routers.auth import get_current_user
 
 router = APIRouter()
@@ -32,7 +33,7 @@ async def create_room(
             mode=request.mode,
             max_players=request.max_players
         )
-        return room
+        return FastJSONResponse(room, status_code=status.HTTP_201_CREATED)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -52,7 +53,7 @@ async def join_room(
             player_id=current_user.user_id,
             player_name=current_user.username
         )
-        return room
+        return FastJSONResponse(room)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -68,7 +69,7 @@ async def leave_room(
     """Leave a room"""
     try:
         room = await room_service.leave_room(room_code, current_user.user_id)
-        return {"message": "Left room successfully", "room": room}
+        return FastJSONResponse({"message": "Left room successfully", "room": room})
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -84,11 +85,14 @@ async def start_game(
     """Start the game (host only)"""
     try:
         room = await room_service.start_game(room_code, current_user.user_id)
-        return {
+        # Imported here: the socket handlers import app.main, which imports this router
+        from app.sockets import game_events
+        await game_events.start_game(room_code, room.mode, [player.id for player in room.players])
+        return FastJSONResponse({
             "message": "Game started",
             "room": room,
             "game_id": f"game_{room_code}"
-        }
+        })
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -110,4 +114,4 @@ async def get_room(
             detail="Room not found"
         )
     
-    return room
+    return FastJSONResponse(room)
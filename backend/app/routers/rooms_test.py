@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel
 from app.models.room import Room
 from app.services.room_service import room_service
+from app.utils.fast_json import FastJSONResponse
 
 router = APIRouter()
 
@@ -33,7 +34,7 @@ async def create_room_test(request: CreateRoomRequest):
             mode=request.mode,
             max_players=request.max_players
         )
-        return room
+        return FastJSONResponse(room, status_code=status.HTTP_201_CREATED)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -54,7 +55,7 @@ async def join_room_test(request: JoinRoomRequest):
             player_id=user_id,
             player_name=request.username
         )
-        return room
+        return FastJSONResponse(room)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -67,7 +68,7 @@ async def leave_room_test(room_code: str, user_id: str):
     """Leave a room (TEST - NO AUTH)"""
     try:
         room = await room_service.leave_room(room_code, user_id)
-        return {"message": "Left room successfully", "room": room}
+        return FastJSONResponse({"message": "Left room successfully", "room": room})
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -80,11 +81,14 @@ async def start_game_test(room_code: str, user_id: str):
     """Start the game (TEST - NO AUTH)"""
     try:
         room = await room_service.start_game(room_code, user_id)
-        return {
+        # Imported here: the socket handlers import app.main, which imports this router
+        from app.sockets import game_events
+        await game_events.start_game(room_code, room.mode, [player.id for player in room.players])
+        return FastJSONResponse({
             "message": "Game started",
             "room": room,
             "game_id": f"game_{room_code}"
-        }
+        })
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,166 @@
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+NO_ANSWER = -1
+
+
+class AnswerMatrix:
+    """Compact per-game answer store.
+    
+    Answers live in four typed columns (answer index, time, correctness,
+    points) laid out question-major: the cell of a player's answer to a
+    question is `question * capacity + slot`, where `slot` is the player's
+    index in the game. A whole question is one contiguous slice, so
+    per-question and per-player statistics are computed over array slices
+    instead of walking nested dicts.
+    """
+    
+    __slots__ = (
+        "question_ids", "_question_index", "player_ids", "_slots", "capacity",
+        "answers", "times", "correct", "points",
+    )
+    
+    def __init__(self, question_ids: List[str], capacity: int = 6):
+        self.question_ids = list(question_ids)
+        self._question_index = {qid: i for i, qid in enumerate(self.question_ids)}
+        self.player_ids: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self.capacity = max(capacity, 1)
+        cells = self.capacity * len(self.question_ids)
+        self.answers = array("b", [NO_ANSWER]) * cells
+        self.times = array("f", [0.0]) * cells
+        self.correct = array("B", [0]) * cells
+        self.points = array("H", [0]) * cells
+    
+    def _grow(self):
+        """Double the player capacity, keeping existing answers"""
+        old, new = self.capacity, self.capacity * 2
+        for name, fill in (("answers", NO_ANSWER), ("times", 0.0), ("correct", 0), ("points", 0)):
+            column = getattr(self, name)
+            grown = array(column.typecode, [fill]) * (new * len(self.question_ids))
+            for q in range(len(self.question_ids)):
+                grown[q * new:q * new + old] = column[q * old:(q + 1) * old]
+            setattr(self, name, grown)
+        self.capacity = new
+    
+    def slot(self, player_id: str) -> int:
+        """Slot index of a player, assigning the next free one on first use"""
+        slot = self._slots.get(player_id)
+        if slot is None:
+            if len(self.player_ids) == self.capacity:
+                self._grow()
+            slot = self._slots[player_id] = len(self.player_ids)
+            self.player_ids.append(player_id)
+        return slot
+    
+    def _cell(self, player_id: str, question_id: str) -> int:
+        question = self._question_index.get(question_id)
+        if question is None:
+            raise ValueError("Invalid question")
+        slot = self.slot(player_id)  # May grow the capacity, so before using it
+        return question * self.capacity + slot
+    
+    def get(self, player_id: str, question_id: str) -> Optional[Dict[str, Any]]:
+        """A player's answer to a question, or None"""
+        if player_id not in self._slots or question_id not in self._question_index:
+            return None
+        cell = self._cell(player_id, question_id)
+        if self.answers[cell] == NO_ANSWER:
+            return None
+        return {
+            "answer": self.answers[cell],
+            "time_taken": self.times[cell],
+            "is_correct": bool(self.correct[cell]),
+            "points": self.points[cell],
+        }
+    
+    def record(
+        self,
+        player_id: str,
+        question_id: str,
+        answer: int,
+        time_taken: float,
+        is_correct: bool,
+        points: int
+    ):
+        """Store a player's answer (replacing any previous one)"""
+        cell = self._cell(player_id, question_id)
+        self.answers[cell] = answer
+        self.times[cell] = time_taken
+        self.correct[cell] = 1 if is_correct else 0
+        self.points[cell] = points
+    
+    def answered_count(self, question_id: str) -> int:
+        """Number of players who answered a question"""
+        start = self._question_index[question_id] * self.capacity
+        column = self.answers[start:start + len(self.player_ids)]
+        return len(column) - column.count(NO_ANSWER)
+    
+    def question_stats(self, question_id: str) -> Dict[str, Any]:
+        """Answer count, accuracy and average time of one question"""
+        start = self._question_index[question_id] * self.capacity
+        end = start + len(self.player_ids)
+        answered = (end - start) - self.answers[start:end].count(NO_ANSWER)
+        correct = sum(self.correct[start:end])
+        # Unanswered cells hold 0.0, so the plain sum is the answered time
+        total_time = sum(self.times[start:end])
+        return {
+            "answered": answered,
+            "correct": correct,
+            "accuracy": round(correct / answered, 4) if answered else 0.0,
+            "average_time": round(total_time / answered, 3) if answered else 0.0,
+        }
+    
+    def player_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Score, accuracy and average time of every player"""
+        stats = {}
+        for player_id, slot in self._slots.items():
+            answers = self.answers[slot::self.capacity]
+            answered = len(answers) - answers.count(NO_ANSWER)
+            correct = sum(self.correct[slot::self.capacity])
+            total_time = sum(self.times[slot::self.capacity])
+            stats[player_id] = {
+                "score": sum(self.points[slot::self.capacity]),
+                "answered": answered,
+                "correct": correct,
+                "accuracy": round(correct / answered, 4) if answered else 0.0,
+                "average_time": round(total_time / answered, 3) if answered else 0.0,
+            }
+        return stats
+    
+    def totals(self) -> Dict[str, Tuple[int, float]]:
+        """Total points and answer time of every player"""
+        return {
+            player_id: (sum(self.points[slot::self.capacity]), sum(self.times[slot::self.capacity]))
+            for player_id, slot in self._slots.items()
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact JSON-safe form (columns as plain lists)"""
+        return {
+            "question_ids": self.question_ids,
+            "player_ids": self.player_ids,
+            "capacity": self.capacity,
+            "answers": self.answers.tolist(),
+            "times": self.times.tolist(),
+            "correct": self.correct.tolist(),
+            "points": self.points.tolist(),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AnswerMatrix":
+        """Rebuild a matrix saved with `to_dict`"""
+        matrix = cls(data["question_ids"], data["capacity"])
+        for player_id in data["player_ids"]:
+            matrix.slot(player_id)
+        for name in ("answers", "times", "correct", "points"):
+            setattr(matrix, name, array(getattr(matrix, name).typecode, data[name]))
+        return matrix
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the answer columns"""
+        return sum(
+            column.itemsize * len(column)
+            for column in (self.answers, self.times, self.correct, self.points)
+        )
@@ -1,38 +1,79 @@
-from typing import Optional
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
 from datetime import datetime
+from app.config import settings
 from app.database.firestore import firestore_client
 from app.models.user import UserCreate, User
-from app.utils.security import get_password_hash, verify_password, create_access_token
+from app.services.password_hasher import password_hasher
+from app.utils.cache import TTLCache
+from app.utils.security import create_access_token
 
 
 class AuthService:
     """Authentication service"""
     
     def __init__(self):
-        self.db = firestore_client.db
         self.users_ref = firestore_client.users
+        # Read-through cache of user profiles, invalidated on profile/stats writes
+        self.user_cache = TTLCache(
+            max_size=settings.user_cache_size,
+            default_ttl=settings.user_cache_ttl_s,
+        )
+        # In-flight loads, so concurrent misses for one user share a single read
+        self._pending: Dict[str, asyncio.Task] = {}
+    
+    async def _cached(self, user_id: str, loader: Callable[[], Awaitable[Optional[User]]]) -> Optional[User]:
+        """Get a user from the cache, or load it once for all concurrent callers"""
+        user = self.user_cache.get(user_id)
+        if user is not None:
+            return user
+        
+        task = self._pending.get(user_id)
+        if task is None:
+            async def load() -> Optional[User]:
+                loaded = await loader()
+                # Don't cache a result that was invalidated while loading
+                if loaded is not None and self._pending.get(user_id) is asyncio.current_task():
+                    self.user_cache.set(user_id, loaded)
+                return loaded
+            
+            task = asyncio.ensure_future(load())
+            self._pending[user_id] = task
+            task.add_done_callback(
+                lambda t: self._pending.pop(user_id) if self._pending.get(user_id) is t else None
+            )
+        
+        return await asyncio.shield(task)
+    
+    def invalidate_user(self, user_id: str):
+        """Drop a cached profile (call after any write to the user document)"""
+        self.user_cache.pop(user_id)
+        self._pending.pop(user_id, None)
+    
+    async def update_user(self, user_id: str, fields: Dict[str, Any]):
+        """Update profile or stats fields of a user"""
+        await self.users_ref.update(user_id, fields)
+        self.invalidate_user(user_id)
     
     async def register_user(self, user_data: UserCreate) -> tuple[User, str]:
         """Register a new user"""
         # Check if username exists
-        username_query = self.users_ref.where("username", "==", user_data.username).limit(1).get()
-        if len(list(username_query)) > 0:
+        if await self.users_ref.find_one("username", user_data.username) is not None:
             raise ValueError("Username already exists")
         
         # Check if email exists
-        email_query = self.users_ref.where("email", "==", user_data.email).limit(1).get()
-        if len(list(email_query)) > 0:
+        if await self.users_ref.find_one("email", user_data.email) is not None:
             raise ValueError("Email already exists")
         
         # Create user document
-        user_ref = self.users_ref.document()
-        user_id = user_ref.id
+        user_id = self.users_ref.new_id()
+        password_hash = await password_hasher.hash(user_data.password)
         
         user_doc = {
             "user_id": user_id,
             "username": user_data.username,
             "email": user_data.email,
-            "password_hash": get_password_hash(user_data.password),
+            "password_hash": password_hash,
             "created_at": datetime.utcnow().isoformat(),
             "stats": {
                 "games_played": 0,
@@ -42,7 +83,7 @@ class AuthService:
             }
         }
         
-        user_ref.set(user_doc)
+        await self.users_ref.set(user_id, user_doc)
         
         # Create user object (without password hash)
         user = User(
@@ -52,6 +93,7 @@ class AuthService:
             created_at=user_doc["created_at"],
             stats=user_doc["stats"]
         )
+        self.user_cache.set(user_id, user)
         
         # Generate JWT token
         token = create_access_token(
@@ -63,18 +105,23 @@ class AuthService:
     async def login_user(self, email: str, password: str) -> tuple[User, str]:
         """Login a user"""
         # Find user by email
-        email_query = self.users_ref.where("email", "==", email).limit(1).get()
-        users = list(email_query)
+        user_doc = await self.users_ref.find_one("email", email)
         
-        if len(users) == 0:
+        if user_doc is None:
             raise ValueError("Invalid email or password")
         
-        user_doc = users[0].to_dict()
-        
         # Verify password
-        if not verify_password(password, user_doc["password_hash"]):
+        ok, new_hash = await password_hasher.verify_and_update(password, user_doc["password_hash"])
+        if not ok:
             raise ValueError("Invalid email or password")
         
+        # Upgrade a hash made at an older cost while the plain password is at hand
+        if new_hash is not None:
+            try:
+                await self.update_user(user_doc["user_id"], {"password_hash": new_hash})
+            except Exception as e:
+                print(f"Failed to upgrade password hash of {user_doc['user_id']}: {e}")
+        
         # Create user object
         user = User(
             user_id=user_doc["user_id"],
@@ -93,13 +140,15 @@ class AuthService:
     
     async def get_user_by_id(self, user_id: str) -> Optional[User]:
         """Get user by ID"""
-        user_ref = self.users_ref.document(user_id)
-        user_doc = user_ref.get()
+        return await self._cached(user_id, lambda: self._fetch_user(user_id))
+    
+    async def _fetch_user(self, user_id: str) -> Optional[User]:
+        """Read a user from storage"""
+        user_data = await self.users_ref.get(user_id)
         
-        if not user_doc.exists:
+        if user_data is None:
             return None
         
-        user_data = user_doc.to_dict()
         return User(
             user_id=user_data["user_id"],
             username=user_data["username"],
@@ -115,8 +164,20 @@ class AuthService:
         username: str
     ) -> User:
         """Get existing user or create from Firebase auth data"""
+        return await self._cached(
+            user_id,
+            lambda: self._fetch_or_create_firebase_user(user_id, email, username)
+        )
+    
+    async def _fetch_or_create_firebase_user(
+        self,
+        user_id: str,
+        email: str,
+        username: str
+    ) -> User:
+        """Read a user from storage, creating it on first sign-in"""
         # Try to get existing user
-        user = await self.get_user_by_id(user_id)
+        user = await self._fetch_user(user_id)
         
         if user is None:
             # Create new user from Firebase data
@@ -134,7 +195,7 @@ class AuthService:
             }
             
             # Save to Firestore
-            self.users_ref.document(user_id).set(user_doc)
+            await self.users_ref.set(user_id, user_doc)
             
             # Create user object
             user = User(
@@ -0,0 +1,128 @@
+import asyncio
+import time
+from typing import AsyncIterator, Dict, Optional
+from app.config import settings
+from app.database.firestore import firestore_client
+from app.database.repository import Repository
+from app.services.game_registry import ACTIVE, CREATED, GameRecord, GameRegistry
+from app.services.game_service import game_service
+from app.services.persistence import WriteBehindQueue, game_writes
+
+CHECKPOINTS = "checkpoints"
+
+
+class GameCheckpointer:
+    """Crash-safe checkpoints of running games.
+    
+    Every `interval_s`, each running game that changed since its last
+    checkpoint is saved as one compact document (question index, phase,
+    deadline, roster and answers) through the write-behind queue; the
+    questions never change during a game, so they are only stored once, in
+    the game's `games` doc. Checkpoints of finished or abandoned games are
+    deleted; the same loop drives the registry's TTL sweep. `load_game`
+    brings a checkpointed game back (on startup or when adopting a room) so
+    its timer can resume at the remaining time.
+    """
+    
+    def __init__(
+        self,
+        checkpoints_ref: Repository,
+        registry: GameRegistry,
+        writes: WriteBehindQueue,
+        interval_s: float = 1.0
+    ):
+        self.checkpoints_ref = checkpoints_ref
+        self.registry = registry
+        self.writes = writes
+        self.interval_s = interval_s
+        self._task: Optional[asyncio.Task] = None
+        self.saved = 0
+        self.deleted = 0
+        self.resumed = 0
+        self.last_checkpoint_ms = 0.0
+    
+    def checkpoint(self) -> int:
+        """Queue checkpoints of changed running games; returns how many"""
+        start = time.perf_counter()
+        count = 0
+        for record in self.registry.records():
+            if record.dirty and record.state in (CREATED, ACTIVE):
+                self.writes.enqueue(CHECKPOINTS, record.game_id, record.to_doc(), merge=False)
+                record.dirty = False
+                count += 1
+        
+        retired, self.registry.retired = self.registry.retired, []
+        for game_id in retired:
+            self.writes.delete(CHECKPOINTS, game_id)
+        
+        if count or retired:
+            self.writes.flush()
+        self.saved += count
+        self.deleted += len(retired)
+        self.last_checkpoint_ms = (time.perf_counter() - start) * 1000
+        return count
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_s)
+            try:
+                # Expire idle games even while no new game is added (at most every sweep_interval_s)
+                self.registry.sweep()
+                self.checkpoint()
+            except Exception as e:
+                print(f"Error checkpointing games: {e}")
+    
+    def game_ids(self) -> AsyncIterator[str]:
+        """IDs of all checkpointed games"""
+        return self.checkpoints_ref.stream_ids()
+    
+    async def load_game(self, game_id: str) -> Optional[GameRecord]:
+        """Make a checkpointed game resident again (None if there is no usable checkpoint)"""
+        if game_id in self.registry:
+            return self.registry.get(game_id)
+        doc = await self.checkpoints_ref.get(game_id)
+        if not doc:
+            return None
+        game_doc = await self.registry.games_ref.get(game_id)
+        if not game_doc:
+            print(f"Skipping checkpoint {game_id}: its game is gone")
+            return None
+        try:
+            record = GameRecord.from_doc(doc, game_doc)
+        except Exception as e:
+            print(f"Skipping unreadable checkpoint {game_id}: {e}")
+            return None
+        record.dirty = False
+        self.registry.add(record)
+        self.resumed += 1
+        return record
+    
+    async def start(self):
+        """Start periodic checkpoints"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop and take a final checkpoint (before the write-behind queue drains)"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.checkpoint()
+    
+    def stats(self) -> Dict[str, float]:
+        """Checkpoint metrics"""
+        return {
+            "saved": self.saved,
+            "deleted": self.deleted,
+            "resumed": self.resumed,
+            "last_checkpoint_ms": round(self.last_checkpoint_ms, 3),
+        }
+
+
+# Singleton instance
+game_checkpoints = GameCheckpointer(
+    firestore_client.checkpoints,
+    game_service.active_games,
+    game_writes,
+    interval_s=settings.checkpoint_interval_s,
+)
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import re
+import time
+from typing import Dict, Optional
+import httpx
+from app.config import settings
+
+# Public x509 certificates used to sign Firebase ID tokens
+FIREBASE_CERTS_URL = (
+    "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+)
+
+
+class FirebaseKeyStore:
+    """Keeps Google's Firebase token signing certificates warm.
+    
+    A background task re-fetches the certificates shortly before the
+    Cache-Control max-age of the last response runs out, so token verification
+    never has to fetch them inline. With `firebase_certs_file` set, the
+    certificates are read from that JSON file instead (same format as the
+    Google endpoint), which lets tests and offline setups sign their own tokens.
+    """
+    
+    def __init__(self, certs_file: Optional[str] = None):
+        self.certs_file = certs_file or settings.firebase_certs_file
+        self.certs: Dict[str, str] = {}
+        self.expires_at = 0.0
+        self.refreshes = 0
+        self.failures = 0
+        self.throttled = 0
+        self._last_attempt = float("-inf")  # Monotonic time of the last fetch
+        self._loaded = asyncio.Event()
+        self._refresh_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+    
+    async def _fetch(self) -> tuple[Dict[str, str], float]:
+        """Fetch the certificates and how long they may be cached (seconds)"""
+        if self.certs_file:
+            certs = await asyncio.to_thread(self._read_certs_file)
+            return certs, settings.firebase_keys_refresh_s
+        
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            response = await client.get(FIREBASE_CERTS_URL)
+            response.raise_for_status()
+        
+        match = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+        max_age = float(match.group(1)) if match else settings.firebase_keys_refresh_s
+        return response.json(), max_age
+    
+    def _read_certs_file(self) -> Dict[str, str]:
+        with open(self.certs_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    
+    async def refresh(self, min_interval_s: float = 0.0) -> bool:
+        """Re-fetch the certificates; returns True on success.
+        
+        With `min_interval_s`, nothing is fetched (False) if the last fetch
+        started more recently than that, e.g. by a concurrent caller.
+        """
+        async with self._refresh_lock:
+            if time.monotonic() - self._last_attempt < min_interval_s:
+                self.throttled += 1
+                return False
+            self._last_attempt = time.monotonic()
+            try:
+                certs, max_age = await self._fetch()
+            except Exception as e:
+                self.failures += 1
+                print(f"Error refreshing Firebase signing keys: {e}")
+                return False
+            
+            self.certs = certs
+            self.expires_at = time.time() + max_age
+            self.refreshes += 1
+            self._loaded.set()
+            return True
+    
+    async def get_certs(self) -> Dict[str, str]:
+        """Get the current certificates, waiting for the first fetch if needed"""
+        if not self._loaded.is_set():
+            if self._task is None:
+                await self.refresh()
+            else:
+                try:
+                    await asyncio.wait_for(self._loaded.wait(), timeout=10.0)
+                except asyncio.TimeoutError:
+                    pass
+        if not self.certs:
+            raise ValueError("Firebase signing keys are unavailable")
+        return self.certs
+    
+    async def _refresh_loop(self):
+        """Refresh ahead of expiry; retry quickly after failures"""
+        while True:
+            if await self.refresh():
+                delay = self.expires_at - time.time() - settings.firebase_keys_refresh_margin_s
+                delay = max(delay, settings.firebase_keys_min_refresh_s)
+            else:
+                delay = settings.firebase_keys_retry_s
+            await asyncio.sleep(delay)
+    
+    async def start(self):
+        """Start the background refresher"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self):
+        """Stop the background refresher"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+    
+    def stats(self) -> Dict[str, float]:
+        """Key store metrics"""
+        return {
+            "keys": len(self.certs),
+            "expires_in_s": round(max(self.expires_at - time.time(), 0), 1),
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "throttled": self.throttled,
+        }
@@ -0,0 +1,117 @@
+import asyncio
+import inspect
+import math
+from typing import Any, Callable, Dict, List, Optional, Set
+from app.config import settings
+
+
+class TimerHandle:
+    """A scheduled callback; pass it to `GameClock.cancel` to cancel it"""
+    
+    __slots__ = ("target_tick", "callback", "args", "done")
+    
+    def __init__(self, target_tick: int, callback: Callable, args: tuple):
+        self.target_tick = target_tick
+        self.callback = callback
+        self.args = args
+        self.done = False  # Fired or cancelled
+
+
+class GameClock:
+    """One hashed timing wheel driving the timers of all running games.
+    
+    Timers are hashed into `slots` buckets by the tick they are due on; a
+    single task advances one bucket per tick and fires what is due, so the
+    cost is O(timers that fire) rather than one sleeping coroutine per game.
+    Coroutine callbacks run as their own tasks so a slow one never delays
+    the wheel.
+    """
+    
+    def __init__(self, tick_s: float = 0.1, slots: int = 1024):
+        self.tick_s = tick_s
+        self._wheel: List[List[TimerHandle]] = [[] for _ in range(slots)]
+        self._tick = 0
+        self._start: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+        self.pending = 0
+        self.fired = 0
+    
+    def _ensure_started(self):
+        if self._task is None:
+            loop = asyncio.get_running_loop()
+            self._start = loop.time() - self._tick * self.tick_s
+            self._task = loop.create_task(self._run())
+    
+    def schedule(self, delay: float, callback: Callable, *args: Any) -> TimerHandle:
+        """Call `callback(*args)` after `delay` seconds (rounded up to a tick)"""
+        self._ensure_started()
+        elapsed = asyncio.get_running_loop().time() - self._start
+        target_tick = max(math.ceil((elapsed + delay) / self.tick_s), self._tick + 1)
+        handle = TimerHandle(target_tick, callback, args)
+        self._wheel[target_tick % len(self._wheel)].append(handle)
+        self.pending += 1
+        return handle
+    
+    def cancel(self, handle: Optional[TimerHandle]):
+        """Cancel a timer (no-op if it already fired or was cancelled)"""
+        if handle is not None and not handle.done:
+            handle.done = True
+            self.pending -= 1
+    
+    def _fire(self, handle: TimerHandle):
+        handle.done = True
+        self.pending -= 1
+        self.fired += 1
+        try:
+            result = handle.callback(*handle.args)
+            if inspect.isawaitable(result):
+                task = asyncio.ensure_future(result)
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+        except Exception as e:
+            print(f"Error in game clock callback: {e}")
+    
+    def _advance(self):
+        """Fire everything due on the next tick"""
+        self._tick += 1
+        bucket = self._wheel[self._tick % len(self._wheel)]
+        if not bucket:
+            return
+        
+        due = [h for h in bucket if h.target_tick <= self._tick or h.done]
+        if not due:
+            return
+        bucket[:] = [h for h in bucket if h.target_tick > self._tick and not h.done]
+        for handle in due:
+            if not handle.done:
+                self._fire(handle)
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Sleep until the next tick boundary; catch up if the loop was busy
+            await asyncio.sleep(max(self._start + (self._tick + 1) * self.tick_s - loop.time(), 0))
+            now_tick = int((loop.time() - self._start) / self.tick_s)
+            while self._tick < now_tick:
+                self._advance()
+    
+    async def stop(self):
+        """Stop the wheel (pending timers are dropped)"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+    
+    def stats(self) -> Dict[str, int]:
+        """Timer metrics"""
+        return {
+            "pending": self.pending,
+            "fired": self.fired,
+        }
+
+
+# Singleton instance
+game_clock = GameClock(
+    tick_s=settings.game_clock_tick_ms / 1000,
+    slots=settings.game_clock_slots,
+)
@@ -0,0 +1,284 @@
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+from app.database.repository import Repository
+from app.models.question import QuizQuestion
+from app.services.answer_matrix import AnswerMatrix
+from app.services.persistence import WriteBehindQueue
+from app.services.scoreboard import Scoreboard
+from app.utils.fast_json import RawJSON, dumps_bytes
+
+# Game lifecycle states
+CREATED = "created"  # Questions drawn, waiting for the first question
+ACTIVE = "active"  # Questions are being played
+FINISHED = "finished"  # Results computed and persisted
+ABANDONED = "abandoned"  # Evicted after no activity
+
+# Game flow phases (what the current deadline is for)
+QUESTION = "question"  # Current question is open until the deadline
+PAUSE = "pause"  # Next question is sent at the deadline
+
+# Rough per-player cost of roster/answered/scoreboard entries
+PLAYER_OVERHEAD_BYTES = 400
+
+
+def public_question(question: QuizQuestion) -> RawJSON:
+    """Client view of a question, encoded once: no correct answer (text is decoded at ingest)"""
+    return RawJSON(dumps_bytes({
+        "id": question.id,
+        "question": question.question,
+        "options": question.options,
+        "difficulty": question.difficulty,
+        "category": question.category,
+    }))
+
+
+class GameRecord:
+    """In-memory state of one game"""
+    
+    __slots__ = (
+        "game_id", "room_id", "questions", "payloads", "current_question_index",
+        "player_answers", "scoreboard", "roster", "disconnected", "answered",
+        "final_scores", "winner", "player_stats", "created_at",
+        "state", "phase", "deadline", "dirty", "last_used", "_question_bytes",
+    )
+    
+    def __init__(
+        self,
+        game_id: str,
+        room_id: str,
+        questions: List[QuizQuestion],
+        player_answers: AnswerMatrix,
+        created_at: str
+    ):
+        self.game_id = game_id
+        self.room_id = room_id
+        self.questions = questions
+        self.payloads = tuple(public_question(q) for q in questions)  # What clients are sent
+        self.current_question_index = 0
+        self.player_answers = player_answers
+        self.scoreboard = Scoreboard()
+        self.roster: Set[str] = set()  # Players expected to answer
+        self.disconnected: Set[str] = set()  # Roster players not waited for until they rejoin (not checkpointed)
+        self.answered: Set[str] = set()  # Players who answered the current question
+        self.final_scores: Dict[str, int] = {}
+        self.winner: Optional[str] = None
+        self.player_stats: Dict[str, Dict[str, Any]] = {}
+        self.created_at = created_at
+        self.state = CREATED
+        self.phase: Optional[str] = None
+        self.deadline: Optional[float] = None  # Epoch seconds
+        self.dirty = True  # Changed since the last checkpoint
+        self.last_used = time.monotonic()
+        self._question_bytes = sum(
+            sys.getsizeof(q.question) + sum(sys.getsizeof(o) for o in q.options) + 256
+            for q in questions
+        ) + sum(sys.getsizeof(p.json) for p in self.payloads)
+    
+    @property
+    def nbytes(self) -> int:
+        """Estimated memory held by this game"""
+        players = len(self.player_answers.player_ids)
+        return (
+            self._question_bytes
+            + self.player_answers.nbytes
+            + players * PLAYER_OVERHEAD_BYTES
+        )
+    
+    def to_doc(self) -> Dict[str, Any]:
+        """Compact JSON-safe snapshot of the game's progress (questions live in the `games` doc)"""
+        return {
+            "game_id": self.game_id,
+            "room_id": self.room_id,
+            "current_question_index": self.current_question_index,
+            "player_answers": self.player_answers.to_dict(),
+            "roster": sorted(self.roster),
+            "answered": sorted(self.answered),
+            "created_at": self.created_at,
+            "state": self.state,
+            "phase": self.phase,
+            "deadline": self.deadline,
+        }
+    
+    @classmethod
+    def from_doc(cls, doc: Dict[str, Any], game_doc: Dict[str, Any]) -> "GameRecord":
+        """Rebuild a game saved with `to_doc`, taking its questions from the game's `games` doc
+        
+        Totals are recomputed from the answers.
+        """
+        if game_doc.get("created_at") != doc["created_at"]:
+            # The room has started another game since
+            raise ValueError("Snapshot does not belong to the stored game")
+        record = cls(
+            doc["game_id"],
+            doc["room_id"],
+            [QuizQuestion(**q) for q in game_doc["questions"]],
+            AnswerMatrix.from_dict(doc["player_answers"]),
+            doc["created_at"]
+        )
+        record.current_question_index = doc["current_question_index"]
+        record.roster = set(doc.get("roster", []))
+        record.answered = set(doc.get("answered", []))
+        record.state = doc.get("state", ACTIVE)
+        record.phase = doc.get("phase")
+        record.deadline = doc.get("deadline")
+        for player_id, (points, time_taken) in record.player_answers.totals().items():
+            record.scoreboard.record(player_id, points, time_taken)
+        return record
+
+
+class GameRegistry:
+    """Resident games with lifecycle-based eviction.
+    
+    Games are kept in LRU order. Finished games are dropped `finished_ttl_s`
+    after their last use (their results are already persisted), and games
+    with no activity for `abandoned_ttl_s` are marked abandoned and dropped.
+    When more than `max_games` games or `max_bytes` bytes are resident, the
+    least recently used games are evicted: finished ones first, then running
+    ones, which are spilled to storage and restored on demand.
+    """
+    
+    def __init__(
+        self,
+        games_ref: Repository,
+        writes: WriteBehindQueue,
+        max_games: int = 10000,
+        max_bytes: int = 256 * 1024 * 1024,
+        finished_ttl_s: float = 300.0,
+        abandoned_ttl_s: float = 1800.0,
+        sweep_interval_s: float = 30.0
+    ):
+        self.games_ref = games_ref
+        self.writes = writes
+        self.max_games = max_games
+        self.max_bytes = max_bytes
+        self.finished_ttl_s = finished_ttl_s
+        self.abandoned_ttl_s = abandoned_ttl_s
+        self.sweep_interval_s = sweep_interval_s
+        self._games: "OrderedDict[str, GameRecord]" = OrderedDict()
+        self._last_sweep = time.monotonic()
+        self.expired = 0
+        self.abandoned = 0
+        self.spilled = 0
+        self.restored = 0
+        self.retired: List[str] = []  # Finished/abandoned since last collected (see GameCheckpointer)
+    
+    def __len__(self) -> int:
+        return len(self._games)
+    
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self._games
+    
+    def records(self) -> List[GameRecord]:
+        """All resident games"""
+        return list(self._games.values())
+    
+    def get(self, game_id: str) -> Optional[GameRecord]:
+        """A resident game, marked as just used"""
+        record = self._games.get(game_id)
+        if record is not None:
+            record.last_used = time.monotonic()
+            self._games.move_to_end(game_id)
+        return record
+    
+    def add(self, record: GameRecord):
+        """Make a game resident, evicting others if over the caps"""
+        self._games[record.game_id] = record
+        self._games.move_to_end(record.game_id)
+        self.sweep()
+        self._enforce_caps()
+    
+    def finish(self, record: GameRecord):
+        """Mark a game finished; it is dropped once its TTL passes"""
+        record.state = FINISHED
+        record.last_used = time.monotonic()
+        self.retired.append(record.game_id)
+    
+    def _drop(self, record: GameRecord):
+        self._games.pop(record.game_id, None)
+    
+    def discard(self, game_id: str):
+        """Forget a game without persisting anything (another worker took it over)"""
+        self._games.pop(game_id, None)
+    
+    def _spill(self, record: GameRecord):
+        """Evict a running game, keeping its snapshot in storage"""
+        self.writes.enqueue("games", record.game_id, {"snapshot": record.to_doc()})
+        self.writes.flush()
+        self._drop(record)
+        self.spilled += 1
+    
+    def sweep(self, force: bool = False):
+        """Drop expired finished games and abandoned ones (at most every `sweep_interval_s`)"""
+        now = time.monotonic()
+        if not force and now - self._last_sweep < self.sweep_interval_s:
+            return
+        self._last_sweep = now
+        
+        for record in list(self._games.values()):
+            idle = now - record.last_used
+            if record.state == FINISHED and idle > self.finished_ttl_s:
+                self._drop(record)
+                self.expired += 1
+            elif record.state != FINISHED and idle > self.abandoned_ttl_s:
+                record.state = ABANDONED
+                self.writes.enqueue("games", record.game_id, {"state": ABANDONED})
+                self._drop(record)
+                self.retired.append(record.game_id)
+                self.abandoned += 1
+    
+    def _enforce_caps(self):
+        """Evict least recently used games while over the count or byte cap"""
+        over_bytes = self.nbytes - self.max_bytes
+        while len(self._games) > 1 and (len(self._games) > self.max_games or over_bytes > 0):
+            # Oldest finished game if any, else the oldest game (never the newest)
+            candidates = list(self._games.values())[:-1]
+            victim = next((r for r in candidates if r.state == FINISHED), candidates[0])
+            over_bytes -= victim.nbytes
+            if victim.state == FINISHED:
+                self._drop(victim)
+                self.expired += 1
+            else:
+                self._spill(victim)
+    
+    async def restore(self, game_id: str) -> Optional[GameRecord]:
+        """Get a game, reloading it from storage if it was spilled"""
+        record = self.get(game_id)
+        if record is not None:
+            return record
+        
+        doc = await self.games_ref.get(game_id) or {}
+        # The spill (or a later state change) may still be in the write-behind queue
+        write = self.writes.pending("games", game_id)
+        if write is not None and write.data is not None:
+            doc = {**doc, **write.data}
+        if not doc.get("snapshot") or doc.get("state") in (FINISHED, ABANDONED):
+            return None
+        
+        record = self._games.get(game_id)  # Restored by someone else meanwhile
+        if record is None:
+            record = GameRecord.from_doc(doc["snapshot"], doc)
+            self.add(record)
+            self.restored += 1
+        return record
+    
+    @property
+    def nbytes(self) -> int:
+        """Estimated memory held by resident games"""
+        return sum(record.nbytes for record in self._games.values())
+    
+    def stats(self) -> Dict[str, int]:
+        """Resident game count, byte estimate and eviction metrics"""
+        states: Dict[str, int] = {}
+        for record in self._games.values():
+            states[record.state] = states.get(record.state, 0) + 1
+        return {
+            "resident": len(self._games),
+            "bytes": self.nbytes,
+            **{f"resident_{state}": count for state, count in states.items()},
+            "expired": self.expired,
+            "abandoned": self.abandoned,
+            "spilled": self.spilled,
+            "restored": self.restored,
+        }
@@ -1,22 +1,41 @@
-from typing import Dict, List, Optional
+import math
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
+from app.config import settings
 from app.database.firestore import firestore_client
 from app.models.question import QuizQuestion
+from app.services.answer_matrix import AnswerMatrix
+from app.services.game_registry import ACTIVE, CREATED, FINISHED, GameRecord, GameRegistry
+from app.services.persistence import game_writes
 from app.services.quiz_service import quiz_service
+from app.utils.fast_json import RawJSON
 
 
 class GameService:
     """Game logic service"""
     
     def __init__(self):
-        self.db = firestore_client.db
         self.games_ref = firestore_client.games
-        self.active_games: Dict[str, dict] = {}
+        self.active_games = GameRegistry(
+            self.games_ref,
+            game_writes,
+            max_games=settings.game_max_resident,
+            max_bytes=settings.game_max_resident_mb * 1024 * 1024,
+            finished_ttl_s=settings.game_finished_ttl_s,
+            abandoned_ttl_s=settings.game_abandoned_ttl_s,
+        )
     
-    async def create_game(self, room_id: str, mode: str) -> dict:
+    async def create_game(
+        self,
+        room_id: str,
+        mode: str,
+        max_players: int = 6,
+        player_ids: Optional[List[str]] = None
+    ) -> dict:
         """Create a new game"""
-        # Fetch questions
-        questions = await quiz_service.fetch_questions(mode, count=10)
+        # Fetch questions the players (and this room) have not seen recently
+        seen_by = [f"room:{room_id}", *(player_ids or [])]
+        questions = await quiz_service.fetch_questions(mode, count=10, seen_by=seen_by)
         
         game_id = f"game_{room_id}"
         game_data = {
@@ -27,31 +46,112 @@ class GameService:
             "player_answers": {},
             "final_scores": {},
             "winner": None,
+            "state": CREATED,
             "created_at": datetime.utcnow().isoformat()
         }
         
         # Save to Firestore
-        self.games_ref.document(game_id).set(game_data)
+        await self.games_ref.set(game_id, game_data)
         
         # Store in memory for quick access
-        self.active_games[game_id] = {
-            **game_data,
-            "questions": questions  # Keep as objects in memory
-        }
+        self.active_games.add(GameRecord(
+            game_id,
+            room_id,
+            questions,
+            AnswerMatrix([q.id for q in questions], max_players),
+            game_data["created_at"]
+        ))
         
         return game_data
     
+    async def load_game(self, game_id: str) -> Optional[GameRecord]:
+        """Get a game, restoring it from storage if it was evicted while running"""
+        return await self.active_games.restore(game_id)
+    
     def get_current_question(self, game_id: str) -> Optional[QuizQuestion]:
         """Get current question for a game"""
         game = self.active_games.get(game_id)
         if not game:
             return None
         
-        idx = game["current_question_index"]
-        if idx >= len(game["questions"]):
+        idx = game.current_question_index
+        if idx >= len(game.questions):
+            return None
+        
+        return game.questions[idx]
+    
+    def get_question_payload(self, game_id: str) -> Optional[RawJSON]:
+        """Pre-rendered client payload of the current question (no correct answer)"""
+        game = self.active_games.get(game_id)
+        if not game or game.current_question_index >= len(game.payloads):
+            return None
+        
+        return game.payloads[game.current_question_index]
+    
+    def get_question_index(self, game_id: str) -> Optional[int]:
+        """Get the index of the current question"""
+        game = self.active_games.get(game_id)
+        if not game:
             return None
         
-        return game["questions"][idx]
+        return game.current_question_index
+    
+    def set_roster(self, game_id: str, player_ids: List[str]):
+        """Set the players expected to answer each question"""
+        game = self.active_games.get(game_id)
+        if game:
+            game.roster = set(player_ids)
+            game.state = ACTIVE
+            game.dirty = True
+    
+    def set_deadline(self, game_id: str, phase: str, deadline: float):
+        """Record what the game flow is waiting for and until when (epoch seconds)"""
+        game = self.active_games.get(game_id)
+        if game:
+            game.phase = phase
+            game.deadline = deadline
+            game.dirty = True
+    
+    def get_deadline(self, game_id: str) -> Tuple[Optional[str], Optional[float]]:
+        """Current game flow phase and its deadline"""
+        game = self.active_games.get(game_id)
+        if not game:
+            return None, None
+        
+        return game.phase, game.deadline
+    
+    def add_player(self, game_id: str, player_id: str):
+        """Expect answers from a (re)connected player"""
+        game = self.active_games.get(game_id)
+        if not game:
+            return
+        game.disconnected.discard(player_id)
+        if player_id not in game.roster:
+            game.roster.add(player_id)
+            game.dirty = True
+    
+    def mark_disconnected(self, game_id: str, player_id: str):
+        """Stop waiting for answers from a disconnected player (they stay on the roster and can rejoin)"""
+        game = self.active_games.get(game_id)
+        if game and player_id in game.roster:
+            game.disconnected.add(player_id)
+    
+    def remove_player(self, game_id: str, player_id: str):
+        """Stop waiting for answers from a player who left the game"""
+        game = self.active_games.get(game_id)
+        if game and player_id in game.roster:
+            game.roster.discard(player_id)
+            game.disconnected.discard(player_id)
+            game.dirty = True
+    
+    def all_answered(self, game_id: str) -> bool:
+        """Check if every connected player answered the current question"""
+        game = self.active_games.get(game_id)
+        if not game:
+            return False
+        
+        expected = game.roster - game.disconnected
+        return bool(expected) and expected <= game.answered
     
     def submit_answer(
         self,
@@ -70,6 +170,23 @@ class GameService:
         if not question or question.id != question_id:
             raise ValueError("Invalid question")
         
+        # The first answer is final (the result reveals the correct answer)
+        answers = game.player_answers
+        if answers.get(player_id, question_id):
+            raise ValueError("Already answered")
+        
+        # Reject malformed input before touching any state
+        if type(answer_index) is not int or not 0 <= answer_index < len(question.options):
+            raise ValueError("Invalid answer")
+        if (
+            type(time_taken) not in (int, float)
+            or not math.isfinite(time_taken)
+            or time_taken < 0
+        ):
+            raise ValueError("Invalid time taken")
+        # Time past the question's limit scores like the limit
+        time_taken = min(float(time_taken), float(settings.question_time_s))
+        
         is_correct = question.is_correct(answer_index)
         
         # Calculate score based on time
@@ -82,18 +199,23 @@ class GameService:
             else:
                 points = 40
         
-        # Store answer
-        if game_id not in game["player_answers"]:
-            game["player_answers"][game_id] = {}
-        if player_id not in game["player_answers"][game_id]:
-            game["player_answers"][game_id][player_id] = {}
+        # Store answer first, so a failed write leaves the scoreboard untouched
+        answers.record(player_id, question_id, answer_index, time_taken, is_correct, points)
+        game.scoreboard.record(player_id, points, answers.get(player_id, question_id)["time_taken"])
         
-        game["player_answers"][game_id][player_id][question_id] = {
+        game.answered.add(player_id)
+        game.dirty = True
+        
+        # Persisted in the background with the rest of the question's answers
+        game_writes.enqueue("answers", f"{game_id}_{question_id}_{player_id}", {
+            "game_id": game_id,
+            "question_id": question_id,
+            "player_id": player_id,
             "answer": answer_index,
             "time_taken": time_taken,
             "is_correct": is_correct,
             "points": points
-        }
+        })
         
         return {
             "is_correct": is_correct,
@@ -102,15 +224,22 @@ class GameService:
         }
     
     def next_question(self, game_id: str) -> bool:
-        """Move to next question. Returns True if more questions, False if game ended"""
+        """Move to next question. Returns True if more questions, False if game ended.
+        
+        Synchronous, so a caller that checked the index can advance it
+        before any other trigger runs.
+        """
         game = self.active_games.get(game_id)
         if not game:
             return False
         
-        game["current_question_index"] += 1
+        game.current_question_index += 1
+        game.answered = set()
+        game.dirty = True
+        game_writes.flush()  # Question boundary: write its answers
         
         # Check if game ended
-        if game["current_question_index"] >= len(game["questions"]):
+        if game.current_question_index >= len(game.questions):
             self._end_game(game_id)
             return False
         
@@ -122,23 +251,24 @@ class GameService:
         if not game:
             return
         
-        # Calculate final scores
-        final_scores = {}
-        for player_id, answers in game.get("player_answers", {}).get(game_id, {}).items():
-            total_score = sum(a["points"] for a in answers.values())
-            final_scores[player_id] = total_score
-        
-        # Find winner
-        winner = max(final_scores, key=final_scores.get) if final_scores else None
+        # Final scores and winner come straight from the running scoreboard
+        final_scores = game.scoreboard.scores()
+        winner = game.scoreboard.winner()
+        player_stats = game.player_answers.player_stats()
         
-        game["final_scores"] = final_scores
-        game["winner"] = winner
+        game.final_scores = final_scores
+        game.winner = winner
+        game.player_stats = player_stats
+        self.active_games.finish(game)
         
-        # Update Firestore
-        self.games_ref.document(game_id).update({
+        # Written behind, so finishing never waits on Firestore
+        game_writes.enqueue("games", game_id, {
+            "state": FINISHED,
             "final_scores": final_scores,
-            "winner": winner
+            "winner": winner,
+            "player_stats": player_stats
         })
+        game_writes.flush()
     
     def get_scores(self, game_id: str) -> Dict[str, int]:
         """Get current scores for all players"""
@@ -146,11 +276,47 @@ class GameService:
         if not game:
             return {}
         
-        scores = {}
-        for player_id, answers in game.get("player_answers", {}).get(game_id, {}).items():
-            scores[player_id] = sum(a["points"] for a in answers.values())
+        return game.scoreboard.scores()
+    
+    def get_player_score(self, game_id: str, player_id: str) -> int:
+        """Get one player's current score"""
+        game = self.active_games.get(game_id)
+        if not game:
+            return 0
+        
+        return game.scoreboard.totals.get(player_id, 0)
+    
+    def get_question_stats(self, game_id: str, question_id: str) -> Dict[str, Any]:
+        """Get answer count, accuracy and average time of a question"""
+        game = self.active_games.get(game_id)
+        if not game:
+            return {}
+        
+        return game.player_answers.question_stats(question_id)
+    
+    def get_player_stats(self, game_id: str) -> Dict[str, Dict[str, Any]]:
+        """Get score, accuracy and average time of every player"""
+        game = self.active_games.get(game_id)
+        if not game:
+            return {}
+        
+        return game.player_answers.player_stats()
+    
+    def get_top_players(self, game_id: str, k: int = 3) -> List[Tuple[str, int]]:
+        """Get the k best players as (player_id, score), best first"""
+        game = self.active_games.get(game_id)
+        if not game:
+            return []
+        
+        return game.scoreboard.top(k)
+    
+    def get_winner(self, game_id: str) -> Optional[str]:
+        """Get the current leader (ties go to the faster player)"""
+        game = self.active_games.get(game_id)
+        if not game:
+            return None
         
-        return scores
+        return game.scoreboard.winner()
 
 
 # Singleton instance
@@ -0,0 +1,104 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.config import settings
+from app.utils.security import get_password_hash, verify_and_update_password
+
+
+class PasswordPoolFull(Exception):
+    """Too many password hashes are already in flight"""
+
+
+class PasswordHasher:
+    """Bcrypt hashing and verification on a bounded process pool.
+    
+    A bcrypt hash takes a few hundred milliseconds of CPU and holds the GIL,
+    so even a thread pool would stall the event loop. Work runs in separate
+    processes instead; once `max_queue` calls are in flight new ones fail
+    fast with PasswordPoolFull rather than queueing behind a login storm.
+    """
+    
+    def __init__(self, workers: int = 2, max_queue: int = 64):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        # Metrics
+        self.hashed = 0
+        self.verified = 0
+        self.rehashed = 0
+        self.rejected = 0
+    
+    def _pool(self) -> ProcessPoolExecutor:
+        """The worker pool, created on first use"""
+        if self._executor is None:
+            # Spawned, not forked: the server process already runs threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+    
+    async def _run(self, func: Callable, *args) -> Any:
+        """Run a hashing function in the pool (or inline without workers)"""
+        if self.workers <= 0:
+            return func(*args)
+        if self._in_flight >= self.max_queue:
+            self.rejected += 1
+            raise PasswordPoolFull("Too many logins in progress, try again shortly")
+        
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool(), func, *args)
+        finally:
+            self._in_flight -= 1
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password at the configured cost"""
+        hashed = await self._run(get_password_hash, password)
+        self.hashed += 1
+        return hashed
+    
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; the second value is a replacement hash when the stored one is outdated"""
+        ok, new_hash = await self._run(verify_and_update_password, password, hashed)
+        self.verified += 1
+        if new_hash is not None:
+            self.rehashed += 1
+        return ok, new_hash
+    
+    async def start(self):
+        """Spawn the workers ahead of the first login"""
+        if self.workers <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        pool = self._pool()
+        await asyncio.gather(*(loop.run_in_executor(pool, os.getpid) for _ in range(self.workers)))
+    
+    async def stop(self):
+        """Shut down the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Pool metrics"""
+        return {
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "max_queue": self.max_queue,
+            "hashed": self.hashed,
+            "verified": self.verified,
+            "rehashed": self.rehashed,
+            "rejected": self.rejected,
+        }
+
+
+# Singleton instance
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+)
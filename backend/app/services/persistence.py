@@ -0,0 +1,186 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.database.firestore import firestore_client
+from app.database.repository import StorageBackend, Write
+
+
+class WriteBehindQueue:
+    """Write-behind persistence for game data.
+    
+    The game loop only enqueues writes; a background task commits them in
+    batches (Firestore WriteBatches) when asked to flush, e.g. at question
+    boundaries and at game end, and at a fixed interval as a safety net.
+    Pending writes to the same document are merged, so a resubmitted answer
+    costs one write. Failed batches stay queued and are retried with
+    exponential backoff.
+    """
+    
+    def __init__(
+        self,
+        backend: StorageBackend,
+        batch_size: int = 500,
+        flush_interval_s: float = 5.0,
+        retry_base_s: float = 0.5,
+        retry_max_s: float = 30.0,
+        max_queue: int = 100000,
+    ):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.retry_base_s = retry_base_s
+        self.retry_max_s = retry_max_s
+        self.max_queue = max_queue
+        self._pending: Dict[Tuple[str, str], Write] = {}
+        self._inflight: Dict[Tuple[str, str], Write] = {}  # Batch being committed
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        # Metrics
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+    
+    def enqueue(self, collection: str, doc_id: str, data: dict, merge: bool = True):
+        """Queue a document write (never blocks)"""
+        key = (collection, doc_id)
+        previous = self._pending.pop(key, None)
+        if previous is not None and merge:
+            if previous.data is None:
+                # Recreating a document queued for deletion
+                merge = False
+            elif previous.merge:
+                data = {**previous.data, **data}
+            else:
+                # Merging into a full overwrite is still a full overwrite
+                data, merge = {**previous.data, **data}, False
+        elif len(self._pending) >= self.max_queue:
+            # Storage has been unreachable for a long time: shed the oldest write
+            self._pending.pop(next(iter(self._pending)))
+            self.dropped += 1
+        self._pending[key] = Write(collection, doc_id, data, merge)
+        self._idle.clear()
+    
+    def delete(self, collection: str, doc_id: str):
+        """Queue a document delete (replaces any queued write to it)"""
+        self._pending.pop((collection, doc_id), None)
+        self._pending[(collection, doc_id)] = Write(collection, doc_id, None, False)
+        self._idle.clear()
+    
+    def pending(self, collection: str, doc_id: str) -> Optional[Write]:
+        """The queued or in-flight write to a document (read-your-writes)"""
+        key = (collection, doc_id)
+        return self._pending.get(key) or self._inflight.get(key)
+    
+    def flush(self):
+        """Ask the background task to commit everything queued so far (never blocks)"""
+        self._wakeup.set()
+    
+    def _take_batch(self) -> List[Write]:
+        keys = list(self._pending)[:self.batch_size]
+        return [self._pending.pop(key) for key in keys]
+    
+    def _requeue(self, batch: List[Write]):
+        """Put a failed batch back in front of anything queued since"""
+        newer = self._pending
+        self._pending = {(w.collection, w.doc_id): w for w in batch}
+        for key, write in newer.items():
+            previous = self._pending.get(key)
+            if previous is not None and write.merge and write.data is not None:
+                if previous.data is None:
+                    write = write._replace(merge=False)
+                else:
+                    write = write._replace(data={**previous.data, **write.data}, merge=previous.merge)
+            self._pending[key] = write
+    
+    async def _commit(self, batch: List[Write]):
+        start = time.perf_counter()
+        await self.backend.batch_write(batch)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.written += len(batch)
+        self.batches += 1
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self._total_flush_ms += elapsed_ms
+    
+    async def _drain(self):
+        """Commit queued writes, backing off while storage keeps failing"""
+        delay = self.retry_base_s
+        while self._pending:
+            batch = self._take_batch()
+            self._inflight = {(w.collection, w.doc_id): w for w in batch}
+            try:
+                await self._commit(batch)
+                delay = self.retry_base_s
+            except Exception as e:
+                self.failures += 1
+                self._requeue(batch)
+                print(f"Error persisting game data (retrying in {delay:g}s): {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.retry_max_s)
+            finally:
+                self._inflight = {}
+        self._idle.set()
+    
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._drain()
+    
+    async def start(self):
+        """Start the background writer"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def wait_idle(self):
+        """Wait until everything queued so far has been written"""
+        self.flush()
+        await self._idle.wait()
+    
+    async def stop(self, timeout: float = 10.0):
+        """Write what is left (bounded by `timeout`) and stop"""
+        if self._task is not None:
+            # Let the writer finish its last drain rather than cancelling it mid-batch
+            self._stopping = True
+            self.flush()
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), timeout)
+            except asyncio.TimeoutError:
+                print(f"Shutting down with {len(self._pending)} unsaved game writes")
+                self._task.cancel()
+            self._task = None
+    
+    def stats(self) -> Dict[str, float]:
+        """Queue depth and flush metrics"""
+        return {
+            "queue_depth": len(self._pending),
+            "written": self.written,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.batches, 2) if self.batches else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 2),
+        }
+
+
+# Singleton instance
+game_writes = WriteBehindQueue(
+    firestore_client,
+    batch_size=settings.persist_batch_size,
+    flush_interval_s=settings.persist_flush_interval_s,
+    retry_base_s=settings.persist_retry_base_s,
+    retry_max_s=settings.persist_retry_max_s,
+    max_queue=settings.persist_max_queue,
+)
@@ -0,0 +1,210 @@
+import asyncio
+import csv
+import html
+import io
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Tuple
+from app.database.question_bank import QuestionBank
+from app.models.question import QuizQuestion
+
+FORMATS = ("jsonl", "csv")
+CSV_FIELDS = ["question", "options", "correct_answer", "difficulty", "category"]
+OPTION_SEPARATOR = "|"  # Hand-written CSV options; exports write a JSON array instead
+MAX_REPORTED_ERRORS = 20
+
+
+def clean_text(text: Any) -> str:
+    """HTML-unescape and trim a text field (OpenTDB ships entities like &quot;)"""
+    return html.unescape(str(text)).strip()
+
+
+def _strip(text: Any) -> str:
+    """Trim a text field that is already plain text (the bank's own rows)"""
+    return str(text).strip()
+
+
+def _iter_rows(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """Yield (line number, raw row); JSONL rows are decoded later so one bad line is just one error"""
+    if fmt == "jsonl":
+        for line_no, line in enumerate(lines, start=1):
+            if line.strip():
+                yield line_no, line
+    else:
+        # Header is line 1, so data rows start at line 2
+        yield from enumerate(csv.DictReader(lines), start=2)
+
+
+def row_to_question(row: Dict[str, Any]) -> QuizQuestion:
+    """Validate one import row.
+    
+    Accepts the bank's own shape (`options` as a list, or in CSV a JSON
+    array or a `|`-separated string, plus a `correct_answer` index) and
+    OpenTDB's shape (`correct_answer` text plus `incorrect_answers`). Only
+    OpenTDB rows are HTML-unescaped, so exports re-import unchanged.
+    """
+    if "incorrect_answers" in row:
+        clean = clean_text
+        options = [clean_text(o) for o in row["incorrect_answers"]] + [clean_text(row["correct_answer"])]
+        correct_answer = len(options) - 1
+    else:
+        clean = _strip
+        options = row.get("options") or []
+        if isinstance(options, str):
+            if options.lstrip().startswith("["):
+                options = json.loads(options)
+            else:
+                options = options.split(OPTION_SEPARATOR)
+        if not isinstance(options, list):
+            raise ValueError("options must be a list")
+        options = [_strip(o) for o in options]
+        correct_answer = int(row.get("correct_answer", -1))
+    
+    question = QuizQuestion(
+        id=str(row.get("id") or "0"),
+        question=clean(row.get("question", "")),
+        options=options,
+        correct_answer=correct_answer,
+        difficulty=clean(row.get("difficulty", "medium")).lower(),
+        category=clean(row.get("category", "General"))
+    )
+    if not question.question:
+        raise ValueError("Empty question text")
+    if not all(question.options):
+        # E.g. an option containing "|" in a |-separated list
+        raise ValueError("Empty option")
+    if question.correct_answer >= len(question.options):
+        raise ValueError("correct_answer is out of range")
+    return question
+
+
+def _new_report() -> Dict[str, Any]:
+    return {"read": 0, "imported": 0, "duplicates": 0, "invalid": 0, "errors": []}
+
+
+def parse_batches(
+    lines: Iterable[str],
+    fmt: str,
+    report: Dict[str, Any],
+    batch_size: int = 500
+) -> Iterator[List[QuizQuestion]]:
+    """Validate JSONL/CSV lines into batches of questions, counting read and invalid rows in `report`"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    
+    batch: List[QuizQuestion] = []
+    for line_no, raw in _iter_rows(lines, fmt):
+        report["read"] += 1
+        try:
+            row = json.loads(raw) if isinstance(raw, str) else raw
+            batch.append(row_to_question(row))
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            # ValidationError and JSONDecodeError are ValueErrors
+            report["invalid"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append({"line": line_no, "error": str(e)})
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    
+    if batch:
+        yield batch
+
+
+def _count_inserted(report: Dict[str, Any], batch: List[QuizQuestion], added: int):
+    report["imported"] += added
+    report["duplicates"] += len(batch) - added
+
+
+def import_questions(
+    bank: QuestionBank,
+    lines: Iterable[str],
+    fmt: str = "jsonl",
+    batch_size: int = 500
+) -> Dict[str, Any]:
+    """Stream questions from JSONL/CSV lines into the bank.
+    
+    Rows are validated and inserted one batch (one transaction) at a time,
+    so memory stays constant regardless of file size. Duplicates (within
+    the file or against the bank) are detected by the bank's unique index on
+    the question text rather than an in-memory set. Blocking: run it on the
+    bank's worker thread (or use `import_questions_async`).
+    """
+    report = _new_report()
+    for batch in parse_batches(lines, fmt, report, batch_size):
+        _count_inserted(report, batch, bank.insert_batch(batch))
+    return report
+
+
+async def import_questions_async(
+    bank: QuestionBank,
+    lines: Iterable[str],
+    fmt: str = "jsonl",
+    batch_size: int = 500
+) -> Dict[str, Any]:
+    """`import_questions` for the event loop.
+    
+    Rows are parsed on a separate thread and each batch is its own call on
+    the bank's worker thread, so games can still draw questions between
+    batches of a large import.
+    """
+    report = _new_report()
+    batches = parse_batches(lines, fmt, report, batch_size)
+    while True:
+        batch = await asyncio.to_thread(next, batches, None)
+        if batch is None:
+            return report
+        _count_inserted(report, batch, await bank.run(bank.insert_batch, batch))
+
+
+def format_header(fmt: str) -> str:
+    """First line of an export ("" for JSONL)"""
+    return _csv_row(CSV_FIELDS) if fmt == "csv" else ""
+
+
+def _csv_row(values: List[Any]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(values)
+    return buffer.getvalue()
+
+
+def format_question(question: QuizQuestion, fmt: str) -> str:
+    """One export line for a question, in the same shape the importer reads"""
+    if fmt == "csv":
+        return _csv_row([
+            question.question,
+            json.dumps(question.options, ensure_ascii=False),
+            question.correct_answer,
+            question.difficulty,
+            question.category,
+        ])
+    return json.dumps(question.model_dump(exclude={"id"}), ensure_ascii=False) + "\n"
+
+
+def export_questions(bank: QuestionBank, fmt: str = "jsonl") -> Iterator[str]:
+    """Stream the bank as JSONL/CSV lines, one page in memory at a time.
+    
+    Blocking: run it on the bank's worker thread.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    header = format_header(fmt)
+    if header:
+        yield header
+    for question in bank.iter_all():
+        yield format_question(question, fmt)
+
+
+async def export_questions_async(bank: QuestionBank, fmt: str = "jsonl") -> AsyncIterator[str]:
+    """`export_questions` for the event loop: each page is read on the bank's worker thread"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format: {fmt}")
+    header = format_header(fmt)
+    if header:
+        yield header
+    after_id = 0
+    while True:
+        page = await bank.page(after_id)
+        if not page:
+            return
+        yield "".join(format_question(question, fmt) for question in page)
+        after_id = int(page[-1].id)
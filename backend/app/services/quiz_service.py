@@ -1,181 +1,303 @@
+import asyncio
+import time
 import httpx
-from typing import List
+from typing import Dict, List, Optional, Sequence, Set
+from app.database.question_bank import question_bank
 from app.models.question import QuizQuestion
+from app.services.question_io import clean_text
 from app.config import settings
 
+DIFFICULTIES = ("easy", "medium", "hard")
+
+# OpenTDB response codes
+RESPONSE_OK = 0
+RESPONSE_RATE_LIMIT = 5
+
+# Built-in questions, used only while the question bank is empty
+FALLBACK_QUESTIONS = (
+    QuizQuestion(
+        id="q1",
+        question="What is the output of print(2 ** 3) in Python?",
+        options=["6", "8", "9", "12"],
+        correct_answer=1,
+        difficulty="medium",
+        category="Python"
+    ),
+    QuizQuestion(
+        id="q2",
+        question="Which data structure uses LIFO (Last In First Out)?",
+        options=["Queue", "Stack", "Array", "Tree"],
+        correct_answer=1,
+        difficulty="medium",
+        category="Data Structures"
+    ),
+    QuizQuestion(
+        id="q3",
+        question="What does HTML stand for?",
+        options=[
+            "Hyper Text Markup Language",
+            "High Tech Modern Language",
+            "Home Tool Markup Language",
+            "Hyperlinks and Text Markup Language"
+        ],
+        correct_answer=0,
+        difficulty="medium",
+        category="Web Development"
+    ),
+    QuizQuestion(
+        id="q4",
+        question="Which sorting algorithm has O(n log n) average time complexity?",
+        options=["Bubble Sort", "Selection Sort", "Merge Sort", "Insertion Sort"],
+        correct_answer=2,
+        difficulty="medium",
+        category="Algorithms"
+    ),
+    QuizQuestion(
+        id="q5",
+        question="What is the default port for HTTP?",
+        options=["21", "22", "80", "443"],
+        correct_answer=2,
+        difficulty="medium",
+        category="Networking"
+    ),
+    QuizQuestion(
+        id="q6",
+        question="In object-oriented programming, what is encapsulation?",
+        options=[
+            "Hiding implementation details",
+            "Creating multiple instances",
+            "Inheriting from parent class",
+            "Overriding methods"
+        ],
+        correct_answer=0,
+        difficulty="medium",
+        category="OOP"
+    ),
+    QuizQuestion(
+        id="q7",
+        question="Which of these is NOT a JavaScript framework?",
+        options=["React", "Vue", "Angular", "Django"],
+        correct_answer=3,
+        difficulty="medium",
+        category="Web Development"
+    ),
+    QuizQuestion(
+        id="q8",
+        question="What does SQL stand for?",
+        options=[
+            "Structured Query Language",
+            "Simple Question Language",
+            "Standard Query Logic",
+            "System Query Language"
+        ],
+        correct_answer=0,
+        difficulty="medium",
+        category="Databases"
+    ),
+    QuizQuestion(
+        id="q9",
+        question="Which of these is a NoSQL database?",
+        options=["MySQL", "PostgreSQL", "MongoDB", "Oracle"],
+        correct_answer=2,
+        difficulty="medium",
+        category="Databases"
+    ),
+    QuizQuestion(
+        id="q10",
+        question="What is the time complexity of binary search?",
+        options=["O(1)", "O(log n)", "O(n)", "O(n log n)"],
+        correct_answer=1,
+        difficulty="medium",
+        category="Algorithms"
+    ),
+)
+
 
 class QuizService:
-    """Quiz question service"""
+    """Quiz question service
+    
+    Games draw their questions from the local question bank, so creating a
+    game never waits on the network. A background refiller grows the bank
+    from OpenTDB through one long-lived pooled HTTP client, spacing requests
+    to respect the upstream rate limit.
+    """
     
     def __init__(self):
         self.api_url = settings.quiz_api_url
-        self.cache = {}
+        self.bank = question_bank
+        self.bank_counts: Dict[str, int] = {}
+        self._exhausted: Set[str] = set()  # Difficulties where OpenTDB returned nothing new
+        self._client: Optional[httpx.AsyncClient] = None
+        self._refill_task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._last_request = 0.0
+        self._backoff_until = 0.0
+        self.fetched = 0
+        self.fetch_errors = 0
+        self.fallbacks_served = 0
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client (keeps connections to the quiz API alive)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=settings.quiz_api_timeout_s,
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+            )
+        return self._client
+    
+    @staticmethod
+    def _difficulty(mode: str) -> str:
+        """Map a room mode to an OpenTDB difficulty"""
+        return mode if mode in DIFFICULTIES else "medium"
     
     async def fetch_questions(
         self,
         mode: str,
-        count: int = 10
+        count: int = 10,
+        seen_by: Sequence[str] = ()
     ) -> List[QuizQuestion]:
-        """Fetch quiz questions from OpenTDB API"""
+        """Draw quiz questions from the bank (never waits on the network)
         
-        # Map difficulty
-        difficulty_map = {
-            "easy": "easy",
-            "medium": "medium",
-            "hard": "hard"
-        }
-        difficulty = difficulty_map.get(mode, "medium")
+        `seen_by` lists the players (and/or room) the questions are for;
+        questions they saw recently are avoided.
+        """
+        difficulty = self._difficulty(mode)
+        questions = await self.bank.sample(difficulty, count, seen_by)
         
-        # Check cache
-        cache_key = f"{difficulty}_{count}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        if len(questions) < count:
+            # Bank is (nearly) empty: top up with built-in questions
+            known = {q.question for q in questions}
+            for question in FALLBACK_QUESTIONS:
+                if len(questions) >= count:
+                    break
+                if question.question not in known:
+                    questions.append(question.model_copy(update={"difficulty": difficulty}))
+            self.fallbacks_served += 1
         
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    self.api_url,
-                    params={
-                        "amount": count,
-                        "difficulty": difficulty,
-                        "type": "multiple",
-                        "category": 18  # Computer Science category
-                    },
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                data = response.json()
-            
-            if data.get("response_code") != 0:
-                # Fallback to default questions
-                return self._get_fallback_questions(mode, count)
-            
-            questions = []
-            for idx, item in enumerate(data.get("results", [])):
-                # Combine correct and incorrect answers
-                options = item["incorrect_answers"] + [item["correct_answer"]]
-                # Shuffle would happen here, but for consistency we'll keep order
-                # In production, shuffle on client side or here
-                
-                question = QuizQuestion(
-                    id=f"q{idx + 1}",
-                    question=item["question"],
-                    options=options,
-                    correct_answer=len(options) - 1,  # Last item is correct
-                    difficulty=difficulty,
-                    category=item.get("category", "Computer Science")
-                )
-                questions.append(question)
-            
-            # Cache the questions
-            self.cache[cache_key] = questions
-            return questions
+        if self.bank_counts.get(difficulty, 0) < settings.question_bank_target:
+            self._wakeup.set()
+        
+        # IDs only need to be unique within a game
+        return [q.model_copy(update={"id": f"q{idx + 1}"}) for idx, q in enumerate(questions)]
+    
+    async def _request_questions(self, difficulty: str, amount: int) -> List[QuizQuestion]:
+        """Fetch one batch of questions from OpenTDB"""
+        # Space requests out to stay under the upstream rate limit
+        wait = max(
+            self._last_request + settings.quiz_api_min_interval_s,
+            self._backoff_until,
+        ) - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        response = await self.client.get(
+            self.api_url,
+            params={
+                "amount": amount,
+                "difficulty": difficulty,
+                "type": "multiple",
+                "category": 18  # Computer Science category
+            },
+        )
+        # Measured from the response so slow requests never bunch up upstream
+        self._last_request = time.monotonic()
+        if response.status_code == 429:
+            self._backoff_until = time.monotonic() + settings.quiz_api_backoff_s
+            return []
+        response.raise_for_status()
+        data = response.json()
+        
+        if data.get("response_code") == RESPONSE_RATE_LIMIT:
+            self._backoff_until = time.monotonic() + settings.quiz_api_backoff_s
+            return []
+        if data.get("response_code") != RESPONSE_OK:
+            return []
+        
+        questions = []
+        for idx, item in enumerate(data.get("results", [])):
+            # Combine correct and incorrect answers, decoding OpenTDB's HTML entities once here
+            options = [clean_text(o) for o in item["incorrect_answers"]] + [clean_text(item["correct_answer"])]
+            # Shuffle would happen here, but for consistency we'll keep order
+            # In production, shuffle on client side or here
             
-        except Exception as e:
-            print(f"Error fetching questions: {e}")
-            return self._get_fallback_questions(mode, count)
+            question = QuizQuestion(
+                id=f"q{idx + 1}",
+                question=clean_text(item["question"]),
+                options=options,
+                correct_answer=len(options) - 1,  # Last item is correct
+                difficulty=difficulty,
+                category=clean_text(item.get("category", "Computer Science"))
+            )
+            questions.append(question)
+        
+        return questions
     
-    def _get_fallback_questions(self, mode: str, count: int) -> List[QuizQuestion]:
-        """Fallback questions if API fails"""
-        fallback = [
-            QuizQuestion(
-                id="q1",
-                question="What is the output of print(2 ** 3) in Python?",
-                options=["6", "8", "9", "12"],
-                correct_answer=1,
-                difficulty=mode,
-                category="Python"
-            ),
-            QuizQuestion(
-                id="q2",
-                question="Which data structure uses LIFO (Last In First Out)?",
-                options=["Queue", "Stack", "Array", "Tree"],
-                correct_answer=1,
-                difficulty=mode,
-                category="Data Structures"
-            ),
-            QuizQuestion(
-                id="q3",
-                question="What does HTML stand for?",
-                options=[
-                    "Hyper Text Markup Language",
-                    "High Tech Modern Language",
-                    "Home Tool Markup Language",
-                    "Hyperlinks and Text Markup Language"
-                ],
-                correct_answer=0,
-                difficulty=mode,
-                category="Web Development"
-            ),
-            QuizQuestion(
-                id="q4",
-                question="Which sorting algorithm has O(n log n) average time complexity?",
-                options=["Bubble Sort", "Selection Sort", "Merge Sort", "Insertion Sort"],
-                correct_answer=2,
-                difficulty=mode,
-                category="Algorithms"
-            ),
-            QuizQuestion(
-                id="q5",
-                question="What is the default port for HTTP?",
-                options=["21", "22", "80", "443"],
-                correct_answer=2,
-                difficulty=mode,
-                category="Networking"
-            ),
-            QuizQuestion(
-                id="q6",
-                question="In object-oriented programming, what is encapsulation?",
-                options=[
-                    "Hiding implementation details",
-                    "Creating multiple instances",
-                    "Inheriting from parent class",
-                    "Overriding methods"
-                ],
-                correct_answer=0,
-                difficulty=mode,
-                category="OOP"
-            ),
-            QuizQuestion(
-                id="q7",
-                question="Which of these is NOT a JavaScript framework?",
-                options=["React", "Vue", "Angular", "Django"],
-                correct_answer=3,
-                difficulty=mode,
-                category="Web Development"
-            ),
-            QuizQuestion(
-                id="q8",
-                question="What does SQL stand for?",
-                options=[
-                    "Structured Query Language",
-                    "Simple Question Language",
-                    "Standard Query Logic",
-                    "System Query Language"
-                ],
-                correct_answer=0,
-                difficulty=mode,
-                category="Databases"
-            ),
-            QuizQuestion(
-                id="q9",
-                question="Which of these is a NoSQL database?",
-                options=["MySQL", "PostgreSQL", "MongoDB", "Oracle"],
-                correct_answer=2,
-                difficulty=mode,
-                category="Databases"
-            ),
-            QuizQuestion(
-                id="q10",
-                question="What is the time complexity of binary search?",
-                options=["O(1)", "O(log n)", "O(n)", "O(n log n)"],
-                correct_answer=1,
-                difficulty=mode,
-                category="Algorithms"
-            ),
-        ]
+    async def refill(self) -> int:
+        """Grow every difficulty below its target by one batch; returns questions added"""
+        self.bank_counts = await self.bank.counts()
+        added = 0
+        for difficulty in DIFFICULTIES:
+            if difficulty in self._exhausted:
+                continue
+            if self.bank_counts.get(difficulty, 0) >= settings.question_bank_target:
+                continue
+            try:
+                questions = await self._request_questions(difficulty, 50)  # OpenTDB max per request
+            except Exception as e:
+                self.fetch_errors += 1
+                print(f"Error fetching questions: {e}")
+                continue
+            
+            new = await self.bank.add_many(questions)
+            if questions and not new:
+                # Upstream has nothing we do not already have
+                self._exhausted.add(difficulty)
+            self.bank_counts[difficulty] = self.bank_counts.get(difficulty, 0) + new
+            self.fetched += new
+            added += new
         
-        return fallback[:count]
+        return added
+    
+    async def _refill_loop(self):
+        """Grow the bank whenever it runs low, and periodically"""
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.refill()
+            except Exception as e:
+                # E.g. the bank's storage failing; keep the refiller alive
+                self.fetch_errors += 1
+                print(f"Error refilling question bank: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.question_bank_refill_s)
+            except asyncio.TimeoutError:
+                # Periodic pass: retry difficulties that looked exhausted
+                self._exhausted.clear()
+    
+    async def start(self):
+        """Open the question bank and start the background refiller"""
+        await self.bank.start()
+        if self._refill_task is None:
+            self._refill_task = asyncio.create_task(self._refill_loop())
+    
+    async def stop(self):
+        """Stop the refiller and close the HTTP client and the bank"""
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            self._refill_task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        await self.bank.stop()
+    
+    def stats(self) -> Dict[str, int]:
+        """Question supply metrics"""
+        return {
+            **{f"bank_{d}": self.bank_counts.get(d, 0) for d in DIFFICULTIES},
+            "fetched": self.fetched,
+            "fetch_errors": self.fetch_errors,
+            "fallbacks_served": self.fallbacks_served,
+        }
 
 
 # Singleton instance
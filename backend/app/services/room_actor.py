@@ -0,0 +1,65 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional, Tuple, TypeVar
+from app.models.room import Room
+
+T = TypeVar("T")
+
+RoomOp = Callable[[Room], Awaitable[Tuple[Optional[Room], T]]]
+
+
+class RoomActor:
+    """Owns the in-memory state of one room and applies operations one at a time.
+    
+    Operations are queued in a mailbox and run sequentially, so concurrent
+    joins/leaves never race on a read-modify-write. Each operation receives a
+    copy of the current room and returns `(new_room, result)`; the new room only
+    replaces the current state once the operation (including its storage
+    write) succeeded. Returning `None` as the new room closes the actor.
+    """
+    
+    def __init__(self, room: Room):
+        self.room: Optional[Room] = room
+        self.last_used = time.monotonic()
+        self._mailbox: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+    
+    @property
+    def closed(self) -> bool:
+        """True once the room was deleted"""
+        return self.room is None
+    
+    @property
+    def idle(self) -> bool:
+        """True if no operation is queued or running"""
+        return self._worker is None and self._mailbox.empty()
+    
+    async def submit(self, op: RoomOp) -> T:
+        """Queue an operation and wait for its result"""
+        future = asyncio.get_running_loop().create_future()
+        self._mailbox.put_nowait((op, future))
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._drain())
+        return await future
+    
+    async def _drain(self):
+        """Run queued operations until the mailbox is empty"""
+        try:
+            while not self._mailbox.empty():
+                op, future = self._mailbox.get_nowait()
+                if self.room is None:
+                    if not future.cancelled():
+                        future.set_exception(ValueError("Room not found"))
+                    continue
+                try:
+                    new_room, result = await op(self.room.model_copy(deep=True))
+                except Exception as e:
+                    if not future.cancelled():
+                        future.set_exception(e)
+                else:
+                    self.room = new_room
+                    if not future.cancelled():
+                        future.set_result(result)
+                self.last_used = time.monotonic()
+        finally:
+            self._worker = None
@@ -0,0 +1,67 @@
+import random
+import string
+from collections import deque
+from typing import Deque, Dict, Set
+from app.database.repository import Repository
+
+ROOM_CODE_ALPHABET = string.ascii_uppercase + string.digits
+ROOM_CODE_LENGTH = 6
+
+
+class RoomCodeAllocator:
+    """Hands out unique room codes without touching storage.
+    
+    The set of live codes is rebuilt once at startup from a streaming scan of
+    the rooms collection, then kept up to date as rooms are created and
+    deleted. Codes are drawn from a pre-reserved batch of random codes that
+    are already known to be free, so allocation is O(1) and never collides.
+    """
+    
+    def __init__(self, batch_size: int = 256):
+        self.batch_size = batch_size
+        self.live: Set[str] = set()
+        self._reserved: Deque[str] = deque()
+        self._reserved_set: Set[str] = set()
+        self._random = random.SystemRandom()
+        self.ready = False
+    
+    async def rebuild(self, rooms_ref: Repository):
+        """Load the codes of all existing rooms"""
+        live = set()
+        async for code in rooms_ref.stream_ids():
+            live.add(code)
+        self.live |= live
+        self._reserved = deque(code for code in self._reserved if code not in self.live)
+        self._reserved_set = set(self._reserved)
+        self.ready = True
+    
+    def _random_code(self) -> str:
+        return ''.join(self._random.choices(ROOM_CODE_ALPHABET, k=ROOM_CODE_LENGTH))
+    
+    def _reserve_batch(self):
+        """Pre-reserve a batch of free codes"""
+        while len(self._reserved) < self.batch_size:
+            code = self._random_code()
+            if code not in self.live and code not in self._reserved_set:
+                self._reserved.append(code)
+                self._reserved_set.add(code)
+    
+    def allocate(self) -> str:
+        """Take a free code and mark it live"""
+        if not self._reserved:
+            self._reserve_batch()
+        code = self._reserved.popleft()
+        self._reserved_set.discard(code)
+        self.live.add(code)
+        return code
+    
+    def release(self, code: str):
+        """Mark a code free again (its room was deleted)"""
+        self.live.discard(code)
+    
+    def stats(self) -> Dict[str, int]:
+        """Allocator metrics"""
+        return {
+            "live": len(self.live),
+            "reserved": len(self._reserved),
+        }
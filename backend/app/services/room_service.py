@@ -1,26 +1,130 @@
-import random
-import string
-from typing import List, Optional
+import asyncio
+import time
+from typing import Dict, List, Optional
 from datetime import datetime
+from app.config import settings
 from app.database.firestore import firestore_client
+from app.database.redis_client import redis_client
 from app.models.room import Room, Player
+from app.services.room_actor import RoomActor
+from app.services.room_codes import RoomCodeAllocator
+
+# Codes tried before giving up when other workers keep taking them
+ROOM_CODE_ATTEMPTS = 10
 
 
 class RoomService:
-    """Room management service"""
+    """Room management service
+    
+    Each room loaded on this worker is owned by a RoomActor holding the
+    authoritative in-memory state, so lobby operations cost no storage read
+    and only write the fields they change.
+    
+    With several workers (`redis_url` set) other workers change rooms too, so
+    each operation instead holds the room's Redis lock and starts from the
+    stored room, and `get_room` reads storage.
+    """
     
     def __init__(self):
-        self.db = firestore_client.db
         self.rooms_ref = firestore_client.rooms
+        self._actors: Dict[str, RoomActor] = {}
+        self._loading: Dict[str, asyncio.Task] = {}
+        self._last_sweep = time.monotonic()
+        self.code_allocator = RoomCodeAllocator(batch_size=settings.room_code_batch_size)
+        self._codes_lock = asyncio.Lock()
+    
+    async def start(self):
+        """Load the codes of existing rooms (called on app startup)"""
+        await self._ensure_codes_loaded()
     
-    def _generate_room_code(self) -> str:
+    async def _ensure_codes_loaded(self):
+        """Rebuild the live room code set once"""
+        if self.code_allocator.ready:
+            return
+        async with self._codes_lock:
+            if not self.code_allocator.ready:
+                await self.code_allocator.rebuild(self.rooms_ref)
+    
+    async def _generate_room_code(self) -> str:
         """Generate a unique 6-character room code"""
-        while True:
-            code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-            # Check if code already exists
-            existing = self.rooms_ref.document(code).get()
-            if not existing.exists:
-                return code
+        await self._ensure_codes_loaded()
+        return self.code_allocator.allocate()
+    
+    @staticmethod
+    def _room_from_doc(room_data: dict) -> Room:
+        """Build a Room from its stored document"""
+        # Convert datetime strings back to datetime objects
+        room_data['created_at'] = datetime.fromisoformat(room_data['created_at'])
+        if room_data.get('started_at'):
+            room_data['started_at'] = datetime.fromisoformat(room_data['started_at'])
+        if room_data.get('finished_at'):
+            room_data['finished_at'] = datetime.fromisoformat(room_data['finished_at'])
+        
+        return Room(**room_data)
+    
+    def _sweep_idle_actors(self):
+        """Forget actors of rooms nobody touched for a while (state is in storage)"""
+        now = time.monotonic()
+        if now - self._last_sweep < settings.room_actor_idle_s:
+            return
+        self._last_sweep = now
+        
+        cutoff = now - settings.room_actor_idle_s
+        for code, actor in list(self._actors.items()):
+            if actor.idle and actor.last_used < cutoff:
+                del self._actors[code]
+    
+    async def _load_actor(self, room_code: str) -> Optional[RoomActor]:
+        """Read a room from storage and start its actor"""
+        room_data = await self.rooms_ref.get(room_code)
+        if room_data is None:
+            return None
+        
+        # Another caller may have created the room while we were reading
+        actor = self._actors.get(room_code)
+        if actor is None:
+            actor = self._actors[room_code] = RoomActor(self._room_from_doc(room_data))
+        return actor
+    
+    async def _get_actor(self, room_code: str) -> Optional[RoomActor]:
+        """Get the actor of a room, loading the room once if needed"""
+        actor = self._actors.get(room_code)
+        if actor is not None:
+            return actor
+        
+        self._sweep_idle_actors()
+        
+        task = self._loading.get(room_code)
+        if task is None:
+            task = asyncio.ensure_future(self._load_actor(room_code))
+            self._loading[room_code] = task
+            task.add_done_callback(lambda t: self._loading.pop(room_code, None))
+        return await asyncio.shield(task)
+    
+    def _shared(self, room_code: str, op):
+        """Wrap an operation to run on the stored room under its cross-worker lock"""
+        async def locked(room: Room):
+            async with redis_client.lock(f"room:{room_code}", ttl_s=settings.room_lock_ttl_s):
+                room_data = await self.rooms_ref.get(room_code)
+                if room_data is None:
+                    # Deleted on another worker
+                    self._actors.pop(room_code, None)
+                    raise ValueError("Room not found")
+                return await op(self._room_from_doc(room_data))
+        return locked
+    
+    async def _submit(self, room_code: str, op):
+        """Run an operation on a room's actor"""
+        actor = await self._get_actor(room_code)
+        if actor is None:
+            raise ValueError("Room not found")
+        
+        if redis_client.enabled:
+            op = self._shared(room_code, op)
+        result = await actor.submit(op)
+        if actor.closed and self._actors.get(room_code) is actor:
+            del self._actors[room_code]
+        return result
     
     async def create_room(
         self,
@@ -30,8 +134,6 @@ class RoomService:
         max_players: int = 6
     ) -> Room:
         """Create a new game room"""
-        room_code = self._generate_room_code()
-        
         host_player = Player(
             id=host_id,
             name=host_name,
@@ -40,40 +142,44 @@ class RoomService:
             is_host=True
         )
         
-        room = Room(
-            id=room_code,
-            host_id=host_id,
-            mode=mode,
-            status="waiting",
-            players=[host_player],
-            max_players=max_players,
-            created_at=datetime.utcnow()
-        )
+        # Create-if-absent: another worker may have taken a code this one thinks is free
+        for _ in range(ROOM_CODE_ATTEMPTS):
+            room_code = await self._generate_room_code()
+            
+            room = Room(
+                id=room_code,
+                host_id=host_id,
+                mode=mode,
+                status="waiting",
+                players=[host_player],
+                max_players=max_players,
+                created_at=datetime.utcnow()
+            )
+            
+            # Save to Firestore
+            room_dict = room.model_dump(mode='json')
+            room_dict['created_at'] = room.created_at.isoformat()
+            if await self.rooms_ref.create(room_code, room_dict):
+                break
+        else:
+            raise ValueError("Could not allocate a room code")
         
-        # Save to Firestore
-        room_dict = room.model_dump(mode='json')
-        room_dict['created_at'] = room.created_at.isoformat()
-        self.rooms_ref.document(room_code).set(room_dict)
+        self._actors[room_code] = RoomActor(room.model_copy(deep=True))
         
         return room
     
     async def get_room(self, room_code: str) -> Optional[Room]:
         """Get room by code"""
-        room_ref = self.rooms_ref.document(room_code)
-        room_doc = room_ref.get()
+        if redis_client.enabled:
+            room_data = await self.rooms_ref.get(room_code)
+            return self._room_from_doc(room_data) if room_data is not None else None
         
-        if not room_doc.exists:
-            return None
+        actor = await self._get_actor(room_code)
         
-        room_data = room_doc.to_dict()
-        # Convert datetime strings back to datetime objects
-        room_data['created_at'] = datetime.fromisoformat(room_data['created_at'])
-        if room_data.get('started_at'):
-            room_data['started_at'] = datetime.fromisoformat(room_data['started_at'])
-        if room_data.get('finished_at'):
-            room_data['finished_at'] = datetime.fromisoformat(room_data['finished_at'])
+        if actor is None or actor.closed:
+            return None
         
-        return Room(**room_data)
+        return actor.room.model_copy(deep=True)
     
     async def join_room(
         self,
@@ -82,91 +188,84 @@ class RoomService:
         player_name: str
     ) -> Room:
         """Join an existing room"""
-        room = await self.get_room(room_code)
-        
-        if room is None:
-            raise ValueError("Room not found")
-        
-        if room.status != "waiting":
-            raise ValueError("Room is not accepting players")
+        async def op(room: Room):
+            if room.status != "waiting":
+                raise ValueError("Room is not accepting players")
+            
+            if len(room.players) >= room.max_players:
+                raise ValueError("Room is full")
+            
+            # Check if player already in room
+            if any(p.id == player_id for p in room.players):
+                raise ValueError("Player already in room")
+            
+            # Add player
+            new_player = Player(
+                id=player_id,
+                name=player_name,
+                score=0,
+                is_ready=False,
+                is_host=False
+            )
+            room.players.append(new_player)
+            
+            # Update Firestore
+            await self.rooms_ref.update(room_code, {
+                "players": [p.model_dump(mode='json') for p in room.players]
+            })
+            
+            return room, room.model_copy(deep=True)
         
-        if len(room.players) >= room.max_players:
-            raise ValueError("Room is full")
-        
-        # Check if player already in room
-        if any(p.id == player_id for p in room.players):
-            raise ValueError("Player already in room")
-        
-        # Add player
-        new_player = Player(
-            id=player_id,
-            name=player_name,
-            score=0,
-            is_ready=False,
-            is_host=False
-        )
-        room.players.append(new_player)
-        
-        # Update Firestore
-        room_dict = room.model_dump(mode='json')
-        room_dict['created_at'] = room.created_at.isoformat()
-        self.rooms_ref.document(room_code).update({"players": room_dict['players']})
-        
-        return room
+        return await self._submit(room_code, op)
     
     async def leave_room(self, room_code: str, player_id: str) -> Optional[Room]:
         """Leave a room"""
-        room = await self.get_room(room_code)
+        async def op(room: Room):
+            # Remove player
+            room.players = [p for p in room.players if p.id != player_id]
+            
+            # If room is empty, delete it
+            if len(room.players) == 0:
+                await self.rooms_ref.delete(room_code)
+                self.code_allocator.release(room_code)
+                return None, None
+            
+            # If host left, assign new host
+            if not any(p.is_host for p in room.players):
+                room.players[0].is_host = True
+                room.host_id = room.players[0].id
+            
+            # Update Firestore
+            await self.rooms_ref.update(room_code, {
+                "players": [p.model_dump(mode='json') for p in room.players],
+                "host_id": room.host_id
+            })
+            
+            return room, room.model_copy(deep=True)
         
-        if room is None:
-            raise ValueError("Room not found")
-        
-        # Remove player
-        room.players = [p for p in room.players if p.id != player_id]
-        
-        # If room is empty, delete it
-        if len(room.players) == 0:
-            self.rooms_ref.document(room_code).delete()
-            return None
-        
-        # If host left, assign new host
-        if not any(p.is_host for p in room.players):
-            room.players[0].is_host = True
-            room.host_id = room.players[0].id
-        
-        # Update Firestore
-        room_dict = room.model_dump(mode='json')
-        room_dict['created_at'] = room.created_at.isoformat()
-        self.rooms_ref.document(room_code).set(room_dict)
-        
-        return room
+        return await self._submit(room_code, op)
     
     async def start_game(self, room_code: str, host_id: str) -> Room:
         """Start the game (host only)"""
-        room = await self.get_room(room_code)
+        async def op(room: Room):
+            if room.host_id != host_id:
+                raise ValueError("Only the host can start the game")
+            
+            if not room.can_start:
+                raise ValueError("Cannot start game (need at least 2 players)")
+            
+            room.status = "active"
+            room.started_at = datetime.utcnow()
+            
+            # Update Firestore
+            await self.rooms_ref.update(room_code, {
+                "status": "active",
+                "started_at": room.started_at.isoformat()
+            })
+            
+            return room, room.model_copy(deep=True)
         
-        if room is None:
-            raise ValueError("Room not found")
-        
-        if room.host_id != host_id:
-            raise ValueError("Only the host can start the game")
-        
-        if not room.can_start:
-            raise ValueError("Cannot start game (need at least 2 players)")
-        
-        room.status = "active"
-        room.started_at = datetime.utcnow()
-        
-        # Update Firestore
-        room_dict = room.model_dump(mode='json')
-        room_dict['created_at'] = room.created_at.isoformat()
-        room_dict['started_at'] = room.started_at.isoformat()
-        self.rooms_ref.document(room_code).update({
-            "status": "active",
-            "started_at": room_dict['started_at']
-        })
-        
-        return room
+        return await self._submit(room_code, op)
 
 
 # Singleton instance
@@ -0,0 +1,50 @@
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+
+class Scoreboard:
+    """Running per-player totals with a live ranking.
+    
+    The ranking is a sorted list of `(-score, total_time, player_id)` keys,
+    so higher scores come first and ties go to the player who spent less
+    time answering. Each answer moves one key with a binary search, and
+    scores, top-k and the winner are read without rescanning answers.
+    """
+    
+    def __init__(self):
+        self.totals: Dict[str, int] = {}
+        self.times: Dict[str, float] = {}
+        self._ranking: List[Tuple[int, float, str]] = []
+    
+    def _key(self, player_id: str) -> Tuple[int, float, str]:
+        return (-self.totals[player_id], self.times[player_id], player_id)
+    
+    def record(self, player_id: str, points: int, time_taken: float):
+        """Add an answer's points and time to a player's totals"""
+        if player_id in self.totals:
+            index = bisect_left(self._ranking, self._key(player_id))
+            del self._ranking[index]
+            self.totals[player_id] += points
+            self.times[player_id] += time_taken
+        else:
+            self.totals[player_id] = points
+            self.times[player_id] = time_taken
+        insort(self._ranking, self._key(player_id))
+    
+    def scores(self) -> Dict[str, int]:
+        """Current score of every player who answered"""
+        return dict(self.totals)
+    
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """The k best players as (player_id, score), best first"""
+        return [(player_id, -neg_score) for neg_score, _, player_id in self._ranking[:k]]
+    
+    def rank(self, player_id: str) -> Optional[int]:
+        """1-based rank of a player, or None if they have not answered"""
+        if player_id not in self.totals:
+            return None
+        return bisect_left(self._ranking, self._key(player_id)) + 1
+    
+    def winner(self) -> Optional[str]:
+        """Best ranked player, or None if nobody answered"""
+        return self._ranking[0][2] if self._ranking else None
@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Dict, Optional
+import firebase_admin
+from google.auth import jwt as google_jwt
+from app.config import settings
+from app.models.user import TokenData
+from app.services.firebase_keys import FirebaseKeyStore
+from app.utils.cache import TTLCache
+from app.utils.security import create_access_token, decode_access_token, is_access_token, session_tokens_enabled
+
+FIREBASE_ISSUER_PREFIX = "https://securetoken.google.com/"
+
+
+class TokenService:
+    """Bearer token verification for REST and Socket.IO.
+    
+    Our own HS256 tokens (legacy logins and the session tokens issued by
+    `issue_session_token`) are verified locally with the JWT secret. Anything
+    else is treated as a Firebase ID token.
+    
+    Verifying an ID token is an RSA signature check, so verified claims are
+    cached by token hash until the token's own `exp`. Signatures are checked
+    against certificates kept warm by a FirebaseKeyStore, on a small worker
+    pool, so verification never does network I/O or heavy crypto on the
+    event loop.
+    """
+    
+    def __init__(self):
+        self.cache = TTLCache(
+            max_size=settings.token_cache_size,
+            default_ttl=settings.token_cache_max_ttl_s,
+        )
+        self.key_store = FirebaseKeyStore()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if settings.token_verify_workers > 0:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.token_verify_workers,
+                thread_name_prefix="token-verify",
+            )
+        self._project_id = settings.firebase_project_id
+        # Metrics
+        self.session_verified = 0
+        self.firebase_verified = 0
+    
+    @staticmethod
+    def _key(token: str) -> str:
+        """Cache key for a token"""
+        return hashlib.sha256(token.encode()).hexdigest()
+    
+    @property
+    def project_id(self) -> str:
+        """Firebase project ID the tokens must be issued for"""
+        if not self._project_id:
+            try:
+                self._project_id = firebase_admin.get_app().project_id
+            except ValueError:
+                pass
+        if not self._project_id:
+            self._project_id = os.environ.get("GOOGLE_CLOUD_PROJECT")
+        if not self._project_id:
+            raise ValueError("Firebase project ID is not configured")
+        return self._project_id
+    
+    def _decode(self, token: str, certs: Dict[str, str]) -> Dict[str, Any]:
+        """Check signature and claims the same way firebase_admin.auth.verify_id_token does"""
+        project_id = self.project_id
+        claims = google_jwt.decode(
+            token,
+            certs=certs,
+            audience=project_id,
+            clock_skew_in_seconds=settings.token_clock_skew_s,
+        )
+        
+        if claims.get("iss") != FIREBASE_ISSUER_PREFIX + project_id:
+            raise ValueError("Firebase ID token has incorrect issuer")
+        subject = claims.get("sub")
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise ValueError("Firebase ID token has invalid subject")
+        
+        claims["uid"] = subject
+        return claims
+    
+    async def _verify_signature(self, token: str) -> Dict[str, Any]:
+        """Verify a token against the cached signing keys"""
+        certs = await self.key_store.get_certs()
+        kid = google_jwt.decode_header(token).get("kid")
+        if kid and kid not in certs:
+            # Keys may have rotated since the last refresh. Re-fetch at most once
+            # per min refresh interval, so tokens with made-up key IDs cannot
+            # make us fetch on every request.
+            await self.key_store.refresh(min_interval_s=settings.firebase_keys_min_refresh_s)
+            certs = self.key_store.certs
+            if kid not in certs:
+                raise ValueError("Firebase ID token has an unknown key ID")
+        
+        if self._executor is None:
+            return self._decode(token, certs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._decode, token, certs)
+    
+    async def verify_firebase_token(self, token: str) -> Dict[str, Any]:
+        """Verify a Firebase ID token and return its claims"""
+        key = self._key(token)
+        claims = self.cache.get(key)
+        if claims is not None:
+            return claims
+        
+        claims = await self._verify_signature(token)
+        self.cache.set(key, claims, expires_at=claims.get("exp"))
+        return claims
+    
+    async def authenticate(self, token: str) -> TokenData:
+        """Verify a session or Firebase token and return who it belongs to"""
+        if is_access_token(token):
+            if not session_tokens_enabled():
+                raise ValueError("Session tokens are disabled: JWT_SECRET_KEY is a public default")
+            token_data = decode_access_token(token)
+            if token_data is None:
+                raise ValueError("Invalid or expired session token")
+            self.session_verified += 1
+            return token_data
+        
+        claims = await self.verify_firebase_token(token)
+        self.firebase_verified += 1
+        email = claims.get("email")
+        return TokenData(
+            user_id=claims["uid"],
+            username=claims.get("name") or (email or "Player").split("@")[0],
+            email=email,
+            firebase=True,
+        )
+    
+    def issue_session_token(self, token_data: TokenData) -> str:
+        """A short-lived local token for a verified identity (exchanged for a Firebase ID token)"""
+        if not session_tokens_enabled():
+            raise ValueError("Session tokens are disabled: JWT_SECRET_KEY is a public default")
+        return create_access_token(
+            data={"sub": token_data.user_id, "username": token_data.username, "email": token_data.email},
+            expires_delta=timedelta(seconds=settings.session_token_ttl_s),
+        )
+    
+    def revoke_token(self, token: str) -> bool:
+        """Drop a single token from the cache; returns True if it was cached"""
+        return self.cache.pop(self._key(token)) is not None
+    
+    def revoke_user(self, user_id: str) -> int:
+        """Drop every cached token of a user (e.g. after disabling the account).
+        
+        Session tokens already issued stay valid until they expire
+        (`session_token_ttl_s`).
+        """
+        return self.cache.discard_where(lambda claims: claims.get("uid") == user_id)
+    
+    async def start(self):
+        """Start keeping the signing keys warm"""
+        if not session_tokens_enabled():
+            print("⚠️  JWT_SECRET_KEY is a public default: session and login tokens are refused (set a secret)")
+        await self.key_store.start()
+    
+    async def stop(self):
+        """Stop the key refresher and the worker pool"""
+        await self.key_store.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Token cache and verification metrics"""
+        return {
+            **self.cache.stats(),
+            "session_verified": self.session_verified,
+            "firebase_verified": self.firebase_verified,
+        }
+
+
+# Singleton instance
+token_service = TokenService()
@@ -0,0 +1,73 @@
+import asyncio
+from typing import Dict, Set
+from app.config import settings
+from app.main import sio
+
+
+class AnswerBroadcaster:
+    """Coalesces answer notifications and score changes per room.
+    
+    Instead of an `answer_received` and a full `score_update` broadcast for
+    every answer, answers arriving within a short window are merged into one
+    `answers_update` event carrying the answers and only the scores that
+    changed:
+        
+        {"answers": [{"player_id": ..., "is_correct": ...}, ...],
+         "scores": {player_id: new_total, ...}}
+    """
+    
+    def __init__(self, window_s: float):
+        self.window_s = window_s
+        self._pending: Dict[str, dict] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._flushing: Set[asyncio.Task] = set()
+        self.events_in = 0  # Room broadcasts that would have been sent one by one
+        self.events_out = 0  # Combined broadcasts actually sent
+    
+    async def add_answer(self, room_code: str, player_id: str, is_correct: bool, score: int):
+        """Queue an answer and the player's new total score"""
+        batch = self._pending.setdefault(room_code, {"answers": [], "scores": {}})
+        batch["answers"].append({"player_id": player_id, "is_correct": is_correct})
+        batch["scores"][player_id] = score
+        self.events_in += 2
+        
+        if self.window_s <= 0:
+            await self.flush(room_code)
+        elif room_code not in self._timers:
+            loop = asyncio.get_running_loop()
+            self._timers[room_code] = loop.call_later(self.window_s, self._flush_later, room_code)
+    
+    def _flush_later(self, room_code: str):
+        """Timer callback: flush a room in a task we keep a reference to"""
+        task = asyncio.ensure_future(self.flush(room_code))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+    
+    async def flush(self, room_code: str):
+        """Send a room's pending answers now (e.g. before the question closes)"""
+        timer = self._timers.pop(room_code, None)
+        if timer is not None:
+            timer.cancel()
+        
+        batch = self._pending.pop(room_code, None)
+        if not batch:
+            return
+        
+        self.events_out += 1
+        try:
+            await sio.emit("answers_update", batch, room=room_code)
+        except Exception as e:
+            print(f"Error broadcasting answers: {e}")
+    
+    def stats(self) -> Dict[str, int]:
+        """Broadcast coalescing metrics"""
+        return {
+            "pending_rooms": len(self._pending),
+            "events_in": self.events_in,
+            "events_out": self.events_out,
+            "saved": self.events_in - self.events_out,
+        }
+
+
+# Singleton instance
+answer_broadcaster = AnswerBroadcaster(window_s=settings.broadcast_window_ms / 1000)
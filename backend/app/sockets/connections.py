@@ -0,0 +1,180 @@
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional
+from app.config import settings
+from app.database.redis_client import RedisClient, redis_client
+
+
+class ConnectionRegistry:
+    """Socket connections joined to rooms, shared between workers.
+    
+    A socket's events are always handled by the worker holding it, so each
+    worker looks up its own sockets in a local dict. With Redis enabled the
+    registry is also mirrored to one hash per room (sid -> player and
+    worker), so a room's players can be listed whichever worker they are
+    connected to. Workers send heartbeats to a sorted set; entries of a
+    worker that stops sending them are ignored and then reaped by the
+    others.
+    
+    Keys:
+        {prefix}:workers                  worker_id -> last heartbeat (epoch s)
+        {prefix}:room:{room_code}:conns   sid -> {"player_id", "username", "worker"}
+        {prefix}:worker:{worker_id}:sids  sid -> room_code (for reaping)
+    """
+    
+    def __init__(self, redis: RedisClient, heartbeat_s: float = 5.0, worker_ttl_s: float = 15.0):
+        self.redis = redis
+        self.heartbeat_s = heartbeat_s
+        self.worker_ttl_s = worker_ttl_s
+        self._local: Dict[str, dict] = {}
+        self._live: List[str] = [redis.worker_id]
+        self._task: Optional[asyncio.Task] = None
+        self.reaped = 0
+        self.redis_errors = 0
+    
+    @property
+    def worker_id(self) -> str:
+        return self.redis.worker_id
+    
+    def __contains__(self, sid: str) -> bool:
+        return sid in self._local
+    
+    def get(self, sid: str) -> Optional[dict]:
+        """Connection info of a socket on this worker"""
+        return self._local.get(sid)
+    
+    def _room_key(self, room_code: str) -> str:
+        return self.redis.key("room", room_code, "conns")
+    
+    def _sids_key(self, worker_id: str) -> str:
+        return self.redis.key("worker", worker_id, "sids")
+    
+    async def add(self, sid: str, room_code: str, player_id: str, username: str):
+        """Register a socket that joined a room"""
+        conn = {"room_code": room_code, "player_id": player_id, "username": username}
+        self._local[sid] = conn
+        if not self.redis.enabled:
+            return
+        try:
+            entry = json.dumps({"player_id": player_id, "username": username, "worker": self.worker_id})
+            async with self.redis.client.pipeline(transaction=False) as pipe:
+                pipe.hset(self._room_key(room_code), sid, entry)
+                pipe.hset(self._sids_key(self.worker_id), sid, room_code)
+                await pipe.execute()
+        except Exception as e:
+            self.redis_errors += 1
+            print(f"Error registering connection {sid}: {e}")
+    
+    async def remove(self, sid: str) -> Optional[dict]:
+        """Unregister a socket; returns its connection info if it was registered"""
+        conn = self._local.pop(sid, None)
+        if conn is None or not self.redis.enabled:
+            return conn
+        try:
+            async with self.redis.client.pipeline(transaction=False) as pipe:
+                pipe.hdel(self._room_key(conn["room_code"]), sid)
+                pipe.hdel(self._sids_key(self.worker_id), sid)
+                await pipe.execute()
+        except Exception as e:
+            self.redis_errors += 1
+            print(f"Error unregistering connection {sid}: {e}")
+        return conn
+    
+    def _local_players(self, room_code: str) -> List[str]:
+        return [conn["player_id"] for conn in self._local.values() if conn["room_code"] == room_code]
+    
+    async def room_players(self, room_code: str) -> List[str]:
+        """IDs of the players connected to a room on any live worker"""
+        if not self.redis.enabled:
+            return list(dict.fromkeys(self._local_players(room_code)))
+        try:
+            entries = await self.redis.client.hgetall(self._room_key(room_code))
+        except Exception as e:
+            self.redis_errors += 1
+            print(f"Error listing connections of room {room_code}: {e}")
+            return list(dict.fromkeys(self._local_players(room_code)))
+        
+        live = set(self._live)
+        players = []
+        for raw in entries.values():
+            entry = json.loads(raw)
+            if entry["worker"] in live:
+                players.append(entry["player_id"])
+        return list(dict.fromkeys(players))
+    
+    def live_workers(self) -> List[str]:
+        """Workers that sent a heartbeat within `worker_ttl_s` (as of the last heartbeat)"""
+        return list(self._live)
+    
+    async def heartbeat(self):
+        """Announce this worker, refresh the live workers and reap dead ones"""
+        client = self.redis.client
+        workers_key = self.redis.key("workers")
+        now = time.time()
+        await client.zadd(workers_key, {self.worker_id: now})
+        
+        dead = await client.zrangebyscore(workers_key, "-inf", now - self.worker_ttl_s)
+        for worker_id in dead:
+            await self._reap(worker_id)
+        
+        live = await client.zrangebyscore(workers_key, now - self.worker_ttl_s, "+inf")
+        self._live = sorted(set(live) | {self.worker_id})
+    
+    async def _reap(self, worker_id: str):
+        """Drop the connections of a dead worker (idempotent, any worker may do it)"""
+        client = self.redis.client
+        sids = await client.hgetall(self._sids_key(worker_id))
+        async with client.pipeline(transaction=False) as pipe:
+            for sid, room_code in sids.items():
+                pipe.hdel(self._room_key(room_code), sid)
+            pipe.delete(self._sids_key(worker_id))
+            pipe.zrem(self.redis.key("workers"), worker_id)
+            await pipe.execute()
+        self.reaped += len(sids)
+        print(f"Removed {len(sids)} connections of worker {worker_id}")
+    
+    async def _run(self):
+        while True:
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                self.redis_errors += 1
+                print(f"Error sending worker heartbeat: {e}")
+            await asyncio.sleep(self.heartbeat_s)
+    
+    async def start(self):
+        """Join the worker set and start sending heartbeats"""
+        if self.redis.enabled and self._task is None:
+            await self.heartbeat()
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop heartbeats and remove this worker's connections"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+            try:
+                await self._reap(self.worker_id)
+            except Exception as e:
+                print(f"Error leaving the worker set: {e}")
+        self._local.clear()
+    
+    def stats(self) -> Dict[str, object]:
+        """Local connections and worker membership"""
+        return {
+            "worker_id": self.worker_id,
+            "local_connections": len(self._local),
+            "shared": self.redis.enabled,
+            "live_workers": len(self._live),
+            "reaped": self.reaped,
+            "redis_errors": self.redis_errors,
+        }
+
+
+# Singleton instance
+connections = ConnectionRegistry(
+    redis_client,
+    heartbeat_s=settings.worker_heartbeat_s,
+    worker_ttl_s=settings.worker_ttl_s,
+)
@@ -1,11 +1,23 @@
-import asyncio
+import time
+from typing import Dict, List, Tuple
+from app.config import settings
 from app.main import sio
+from app.sockets.broadcast import answer_broadcaster
+from app.sockets.connections import connections
+from app.sockets.ownership import ADOPT, LOST, ownership
 from app.services.room_service import room_service
+from app.services.checkpoints import game_checkpoints
+from app.services.game_clock import TimerHandle, game_clock
+from app.services.game_registry import PAUSE, QUESTION
 from app.services.game_service import game_service
-from app.utils.security import decode_access_token
+from app.services.token_service import token_service
+from app.utils.fast_json import RawJSON
 
-# Store active connections
-active_connections = {}
+# Pending timer (question end or next question) of each game run by this worker
+game_timers: Dict[str, TimerHandle] = {}
+
+# Deferred lobby leaves of disconnected players, by (room_code, player_id)
+pending_leaves: Dict[Tuple[str, str], TimerHandle] = {}
 
 
 @sio.event
@@ -20,20 +32,44 @@ async def disconnect(sid):
     print(f"Client disconnected: {sid}")
     
     # Remove from active connections
-    if sid in active_connections:
-        room_code = active_connections[sid].get("room_code")
-        player_id = active_connections[sid].get("player_id")
+    conn = await connections.remove(sid)
+    if conn:
+        room_code = conn.get("room_code")
+        player_id = conn.get("player_id")
         
         if room_code and player_id:
+            # Don't keep the question open waiting for them (they stay in the game)
             try:
-                # Leave room
-                await room_service.leave_room(room_code, player_id)
-                # Notify others
-                await sio.emit("player_left", {"player_id": player_id}, room=room_code)
+                await ownership.run(room_code, "player_disconnected", player_id=player_id)
             except Exception as e:
                 print(f"Error handling disconnect: {e}")
+            
+            # Leave the lobby only if they don't come back. A restart closes
+            # every socket, and the game clock (with these timers) is stopped
+            # first on shutdown, so rooms survive it.
+            key = (room_code, player_id)
+            game_clock.cancel(pending_leaves.pop(key, None))
+            pending_leaves[key] = game_clock.schedule(
+                settings.disconnect_grace_s, leave_after_disconnect, room_code, player_id
+            )
+
+
+async def leave_after_disconnect(room_code: str, player_id: str):
+    """Remove a player who disconnected and did not come back from a lobby"""
+    pending_leaves.pop((room_code, player_id), None)
+    try:
+        # Reconnected, possibly to another worker
+        if player_id in await connections.room_players(room_code):
+            return
+        # Players of a running game keep their place so they can rejoin
+        room = await room_service.get_room(room_code)
+        if room is None or room.status != "waiting":
+            return
         
-        del active_connections[sid]
+        await room_service.leave_room(room_code, player_id)
+        await sio.emit("player_left", {"player_id": player_id}, room=room_code)
+    except Exception as e:
+        print(f"Error handling disconnect: {e}")
 
 
 @sio.event
@@ -43,12 +79,11 @@ async def join_room(sid, data):
         room_code = data.get("room_id")
         token = data.get("token")
         
-        # Verify Firebase token
+        # Verify session or Firebase token
         try:
-            from firebase_admin import auth as firebase_auth
-            decoded_token = firebase_auth.verify_id_token(token)
-            user_id = decoded_token['uid']
-            username = decoded_token.get('name') or decoded_token.get('email', 'Player').split('@')[0]
+            token_data = await token_service.authenticate(token)
+            user_id = token_data.user_id
+            username = token_data.username
         except Exception as e:
             print(f"Token verification failed: {e}")
             await sio.emit("error", {"message": f"Invalid token: {str(e)}"}, room=sid)
@@ -60,15 +95,14 @@ async def join_room(sid, data):
             await sio.emit("error", {"message": "Room not found"}, room=sid)
             return
         
+        # Back within the disconnect grace period
+        game_clock.cancel(pending_leaves.pop((room_code, user_id), None))
+        
         # Join Socket.IO room
         sio.enter_room(sid, room_code)
         
         # Store connection
-        active_connections[sid] = {
-            "room_code": room_code,
-            "player_id": user_id,
-            "username": username
-        }
+        await connections.add(sid, room_code, user_id, username)
         
         # Find player in room
         player = next((p for p in room.players if p.id == user_id), None)
@@ -77,12 +111,16 @@ async def join_room(sid, data):
             # Notify others
             await sio.emit(
                 "player_joined",
-                {"player": player.model_dump()},
+                {"player": player},
                 room=room_code,
                 skip_sid=sid
             )
         
-        await sio.emit("join_success", {"room": room.model_dump()}, room=sid)
+        await sio.emit("join_success", {"room": room}, room=sid)
+        
+        # Rejoining a running game (handled by the worker that runs it); lobbies have none to restore
+        if room.status != "waiting":
+            await ownership.run(room_code, "rejoin", player_id=user_id, sid=sid, is_player=player is not None)
         
     except Exception as e:
         print(f"Error in join_room: {e}")
@@ -93,11 +131,12 @@ async def join_room(sid, data):
 async def leave_room(sid, data):
     """Handle player leaving a room"""
     try:
-        if sid not in active_connections:
+        conn = connections.get(sid)
+        if not conn:
             return
         
-        room_code = active_connections[sid].get("room_code")
-        player_id = active_connections[sid].get("player_id")
+        room_code = conn.get("room_code")
+        player_id = conn.get("player_id")
         
         if room_code and player_id:
             # Leave room
@@ -109,7 +148,9 @@ async def leave_room(sid, data):
             # Notify others
             await sio.emit("player_left", {"player_id": player_id}, room=room_code)
             
-            del active_connections[sid]
+            await connections.remove(sid)
+            
+            await ownership.run(room_code, "remove_player", player_id=player_id)
         
     except Exception as e:
         print(f"Error in leave_room: {e}")
@@ -117,18 +158,38 @@ async def leave_room(sid, data):
 
 @sio.event
 async def submit_answer(sid, data):
-    """Handle answer submission"""
+    """Handle answer submission (scored by the worker that runs the game)"""
     try:
-        game_id = data.get("game_id")
+        conn = connections.get(sid)
+        if not conn:
+            return
+        
+        await ownership.run(
+            conn.get("room_code"),
+            "submit_answer",
+            sid=sid,
+            player_id=conn.get("player_id"),
+            data=data
+        )
+        
+    except Exception as e:
+        print(f"Error in submit_answer: {e}")
+        await sio.emit("error", {"message": str(e)}, room=sid)
+
+
+@ownership.handler("submit_answer")
+async def process_answer(room_code: str, sid: str, player_id: str, data: dict):
+    """Score an answer; `sid` may be connected to another worker"""
+    try:
+        # The game is the one of the room the player is connected to, never the client's choice
+        game_id = f"game_{room_code}"
+        if data.get("game_id") not in (None, game_id):
+            raise ValueError("Not a game in this room")
         question_id = data.get("question_id")
         answer_index = data.get("answer")
         time_taken = data.get("time_taken", 15.0)
         
-        if sid not in active_connections:
-            return
-        
-        player_id = active_connections[sid].get("player_id")
-        room_code = active_connections[sid].get("room_code")
+        await game_service.load_game(game_id)
         
         # Submit answer
         result = game_service.submit_answer(
@@ -142,76 +203,236 @@ async def submit_answer(sid, data):
         # Notify player
         await sio.emit("answer_result", result, room=sid)
         
-        # Notify room
-        await sio.emit(
-            "answer_received",
-            {
-                "player_id": player_id,
-                "is_correct": result["is_correct"]
-            },
-            room=room_code
+        # Notify room (answers and score changes are batched per room)
+        await answer_broadcaster.add_answer(
+            room_code,
+            player_id,
+            result["is_correct"],
+            game_service.get_player_score(game_id, player_id)
         )
         
-        # Update scores
-        scores = game_service.get_scores(game_id)
-        await sio.emit("score_update", {"scores": scores}, room=room_code)
+        # Everyone answered: no need to wait for the deadline
+        if game_service.all_answered(game_id):
+            await end_question(room_code, game_id, game_service.get_question_index(game_id))
         
     except Exception as e:
         print(f"Error in submit_answer: {e}")
         await sio.emit("error", {"message": str(e)}, room=sid)
 
 
+@ownership.handler("rejoin")
+async def rejoin_game(room_code: str, player_id: str, sid: str, is_player: bool = True):
+    """Expect answers from a (re)joining player again and catch them up on the open question
+    
+    Spectators (connected but not among the room's players) see the question
+    but are never waited for.
+    """
+    game_id = f"game_{room_code}"
+    await game_service.load_game(game_id)
+    if is_player:
+        game_service.add_player(game_id, player_id)
+    
+    # E.g. after reconnecting to a restarted server
+    phase, deadline = game_service.get_deadline(game_id)
+    question = game_service.get_question_payload(game_id)
+    if phase == QUESTION and question:
+        await sio.emit(
+            "question_sent",
+            question_payload(game_service.get_question_index(game_id), question, deadline),
+            room=sid
+        )
+
+
+async def start_game(room_code: str, mode: str, player_ids: List[str]):
+    """Create and run a room's game on the worker the hash ring assigns the room to (here if it is unreachable)"""
+    owner = ownership.preferred_owner(room_code)
+    if not await ownership.send(owner, "start_game", room_code, mode=mode, player_ids=player_ids):
+        await ownership.send(ownership.worker_id, "start_game", room_code, mode=mode, player_ids=player_ids)
+
+
+@ownership.handler("start_game")
+async def create_and_start_game(room_code: str, mode: str, player_ids: List[str]):
+    """Create a game and start its flow, unless another worker already runs the room"""
+    if not await ownership.acquire(room_code):
+        print(f"Game in room {room_code} is already running on another worker")
+        return
+    game = await game_service.create_game(room_code, mode, player_ids=player_ids)
+    await start_game_flow(room_code, game["game_id"])
+
+
 async def start_game_flow(room_code: str, game_id: str):
-    """Start the game flow with questions and timers"""
+    """Start the game flow; question timers run on the shared game clock"""
     try:
+        # Only one worker may run a room's game, and only once
+        if game_id in game_timers:
+            return
+        if not await ownership.acquire(room_code):
+            print(f"Game {game_id} is already running on another worker")
+            return
+        
+        game = await game_service.load_game(game_id)
+        total_questions = len(game.questions) if game else 0
+        
+        # Expect answers from the room's players connected to it (on any worker), not from spectators
+        room = await room_service.get_room(room_code)
+        members = {player.id for player in room.players} if room else set()
+        connected = await connections.room_players(room_code)
+        game_service.set_roster(game_id, [player_id for player_id in connected if player_id in members])
+        
         # Notify game started
-        await sio.emit("game_started", {"game_id": game_id, "total_questions": 10}, room=room_code)
+        await sio.emit("game_started", {"game_id": game_id, "total_questions": total_questions}, room=room_code)
         
-        # Send questions one by one
-        for i in range(10):
-            question = game_service.get_current_question(game_id)
-            if not question:
-                break
-            
-            # Send question (without correct answer)
-            question_data = question.model_dump()
-            del question_data["correct_answer"]  # Don't send correct answer to clients
-            
-            await sio.emit(
-                "question_sent",
-                {
-                    "question_index": i,
-                    "question": question_data,
-                    "time_limit": 15
-                },
-                room=room_code
+        await send_question(room_code, game_id, 0)
+        
+    except Exception as e:
+        print(f"Error in game flow: {e}")
+
+
+def question_payload(index: int, question: RawJSON, deadline: float) -> dict:
+    """`question_sent` event data; the question itself was rendered (without the answer) at game creation"""
+    return {
+        "question_index": index,
+        "question": question,
+        "time_limit": settings.question_time_s,
+        "deadline": int(deadline * 1000)
+    }
+
+
+async def send_question(room_code: str, game_id: str, index: int):
+    """Send the current question and schedule its end"""
+    try:
+        if not ownership.is_local(room_code):
+            return  # Taken over by another worker
+        await game_service.load_game(game_id)
+        question = game_service.get_question_payload(game_id)
+        if not question:
+            await finish_game(room_code, game_id)
+            return
+        
+        # Clients count down to the server deadline themselves, so there
+        # are no per-second timer events.
+        time_limit = settings.question_time_s
+        deadline = time.time() + time_limit
+        game_service.set_deadline(game_id, QUESTION, deadline)
+        await sio.emit("question_sent", question_payload(index, question, deadline), room=room_code)
+        
+        game_timers[game_id] = game_clock.schedule(time_limit, end_question, room_code, game_id, index)
+        
+    except Exception as e:
+        print(f"Error in game flow: {e}")
+
+
+async def end_question(room_code: str, game_id: str, index: int):
+    """Close a question (at its deadline or once everyone answered) and schedule the next one"""
+    try:
+        if not ownership.is_local(room_code):
+            return  # Taken over by another worker
+        await game_service.load_game(game_id)
+        
+        # Claim the transition without awaiting in between: a concurrent
+        # trigger (deadline, last answer, disconnect) then sees the question
+        # already closed
+        if game_service.get_question_index(game_id) != index:
+            return
+        game_clock.cancel(game_timers.pop(game_id, None))
+        has_more = game_service.next_question(game_id)
+        if has_more:
+            game_service.set_deadline(game_id, PAUSE, time.time() + settings.question_pause_s)
+            game_timers[game_id] = game_clock.schedule(
+                settings.question_pause_s, send_question, room_code, game_id, index + 1
             )
-            
-            # Timer countdown
-            for remaining in range(15, 0, -1):
-                await asyncio.sleep(1)
-                await sio.emit("timer_update", {"time_remaining": remaining}, room=room_code)
-            
-            # Move to next question
-            has_more = game_service.next_question(game_id)
-            if not has_more:
-                break
-            
-            # Brief pause between questions
-            await asyncio.sleep(2)
         
-        # Game finished
-        scores = game_service.get_scores(game_id)
-        winner = max(scores, key=scores.get) if scores else None
+        # Deliver pending answer notifications of the closed question
+        await answer_broadcaster.flush(room_code)
         
-        await sio.emit(
-            "game_finished",
-            {
-                "final_scores": scores,
-                "winner": winner
-            },
-            room=room_code
-        )
+        if not has_more:
+            await finish_game(room_code, game_id)
         
     except Exception as e:
         print(f"Error in game flow: {e}")
+
+
+def resume_game(record) -> bool:
+    """Restart the timer of a checkpointed game at its remaining time"""
+    room_code = record.room_id
+    index = record.current_question_index
+    remaining = max((record.deadline or 0) - time.time(), 0)
+    game_clock.cancel(game_timers.pop(record.game_id, None))
+    if record.phase == QUESTION:
+        game_timers[record.game_id] = game_clock.schedule(
+            remaining, end_question, room_code, record.game_id, index
+        )
+    elif record.phase == PAUSE:
+        game_timers[record.game_id] = game_clock.schedule(
+            remaining, send_question, room_code, record.game_id, index
+        )
+    else:
+        return False  # Created but never started
+    print(f"Resumed game {record.game_id} at question {index + 1} ({remaining:.1f}s left)")
+    return True
+
+
+async def resume_games():
+    """Resume checkpointed games no live worker owns (called on startup)"""
+    async for game_id in game_checkpoints.game_ids():
+        room_code = game_id[len("game_"):]
+        if game_id in game_timers or not await ownership.acquire(room_code):
+            continue
+        record = await game_checkpoints.load_game(game_id)
+        if record is None or not resume_game(record):
+            await ownership.release(room_code)
+
+
+@ownership.handler(ADOPT)
+async def adopt_game(room_code: str):
+    """Take over the game of a room whose worker died, from its checkpoint"""
+    game_id = f"game_{room_code}"
+    if game_id in game_timers:
+        return
+    record = await game_checkpoints.load_game(game_id)
+    if record is None or not resume_game(record):
+        await ownership.release(room_code)
+
+
+@ownership.handler(LOST)
+async def drop_game(room_code: str):
+    """Stop running a game this worker no longer owns (its state lives on with the new owner)"""
+    game_id = f"game_{room_code}"
+    game_clock.cancel(game_timers.pop(game_id, None))
+    game_service.active_games.discard(game_id)
+
+
+@ownership.handler("player_disconnected")
+async def mark_player_disconnected(room_code: str, player_id: str):
+    """Stop waiting for a disconnected player's answers, closing the question if they were the last one pending"""
+    game_id = f"game_{room_code}"
+    game_service.mark_disconnected(game_id, player_id)
+    if game_service.all_answered(game_id):
+        await end_question(room_code, game_id, game_service.get_question_index(game_id))
+
+
+@ownership.handler("remove_player")
+async def remove_player_from_game(room_code: str, player_id: str):
+    """Drop a player from a running game's roster, closing the question if they were the last one pending"""
+    game_id = f"game_{room_code}"
+    game_service.remove_player(game_id, player_id)
+    if game_service.all_answered(game_id):
+        await end_question(room_code, game_id, game_service.get_question_index(game_id))
+
+
+async def finish_game(room_code: str, game_id: str):
+    """Send final scores"""
+    scores = game_service.get_scores(game_id)
+    winner = game_service.get_winner(game_id)
+    
+    await sio.emit(
+        "game_finished",
+        {
+            "final_scores": scores,
+            "winner": winner,
+            "player_stats": game_service.get_player_stats(game_id)
+        },
+        room=room_code
+    )
+    game_timers.pop(game_id, None)
+    await ownership.release(room_code)
@@ -0,0 +1,279 @@
+import asyncio
+import bisect
+import hashlib
+import json
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from app.config import settings
+from app.database.redis_client import RedisClient, redis_client
+from app.sockets.connections import ConnectionRegistry, connections
+
+# Ownership events dispatched to registered handlers
+ADOPT = "adopt"  # This worker took over an orphaned room
+LOST = "lost"  # This worker's lease on a room expired and someone else may own it
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent hash ring: adding or removing a worker only moves ~1/N of the rooms"""
+    
+    def __init__(self, workers: List[str], vnodes: int = 64):
+        self.workers = sorted(workers)
+        points = sorted((_hash(f"{worker}#{i}"), worker) for worker in self.workers for i in range(vnodes))
+        self._hashes = [h for h, _ in points]
+        self._workers = [w for _, w in points]
+    
+    def owner(self, key: str) -> Optional[str]:
+        """Worker responsible for a key"""
+        if not self._hashes:
+            return None
+        i = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._workers[i]
+
+
+class RoomOwnership:
+    """Exactly one worker runs each room's game.
+    
+    Ownership is a lease in Redis (`SET NX PX`) that the owner renews every
+    third of its TTL with a WATCH/MULTI/EXEC check-and-extend, so a stalled
+    or crashed worker loses it after `lease_ttl_s`. New games are started on
+    the room's worker on a consistent hash ring of the live workers; when an
+    owner dies, the worker the ring now assigns its rooms to adopts them from
+    their checkpoints. Leases are not moved when workers join, so running
+    games never migrate.
+    
+    Events for a room (answers, players leaving) are routed with `run`:
+    handled in place on the owner, otherwise published to the owner's inbox
+    channel. Without Redis every room is local.
+    
+    Keys:
+        {prefix}:lease:{room_code}      owner worker_id, expires after lease_ttl_s
+        {prefix}:leases                 room_code -> owner (rooms to check for orphans)
+        {prefix}:worker:{id}:inbox      channel for events forwarded to that worker
+    """
+    
+    def __init__(
+        self,
+        redis: RedisClient,
+        membership: ConnectionRegistry,
+        lease_ttl_s: float = 10.0,
+        vnodes: int = 64
+    ):
+        self.redis = redis
+        self.membership = membership
+        self.lease_ttl_s = lease_ttl_s
+        self.vnodes = vnodes
+        self.ring = HashRing([redis.worker_id], vnodes)
+        self._owned: Set[str] = set()
+        self._handlers: Dict[str, Callable[..., Awaitable]] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._pubsub = None
+        # Metrics
+        self.acquired = 0
+        self.lost = 0
+        self.adopted = 0
+        self.forwarded = 0
+        self.received = 0
+        self.undelivered = 0
+    
+    @property
+    def worker_id(self) -> str:
+        return self.redis.worker_id
+    
+    def _lease_key(self, room_code: str) -> str:
+        return self.redis.key("lease", room_code)
+    
+    def _inbox(self, worker_id: str) -> str:
+        return self.redis.key("worker", worker_id, "inbox")
+    
+    def handler(self, kind: str):
+        """Register the handler for an event kind: `handler(room_code, **payload)`"""
+        def register(func):
+            self._handlers[kind] = func
+            return func
+        return register
+    
+    def is_local(self, room_code: str) -> bool:
+        """Whether this worker owns the room (always, without Redis)"""
+        return not self.redis.enabled or room_code in self._owned
+    
+    def preferred_owner(self, room_code: str) -> str:
+        """Worker the hash ring assigns a room to"""
+        return self.ring.owner(room_code) or self.worker_id
+    
+    async def owner(self, room_code: str) -> Optional[str]:
+        """Current lease holder of a room (None if nobody runs it)"""
+        if self.is_local(room_code):
+            return self.worker_id
+        return await self.redis.client.get(self._lease_key(room_code))
+    
+    async def acquire(self, room_code: str) -> bool:
+        """Take the room's lease; True if this worker now owns the room"""
+        if not self.redis.enabled or room_code in self._owned:
+            return True
+        client = self.redis.client
+        ttl_ms = int(self.lease_ttl_s * 1000)
+        if not await client.set(self._lease_key(room_code), self.worker_id, nx=True, px=ttl_ms):
+            # Held already: still ours if an earlier release failed
+            if await client.get(self._lease_key(room_code)) != self.worker_id:
+                return False
+        await client.hset(self.redis.key("leases"), room_code, self.worker_id)
+        self._owned.add(room_code)
+        self.acquired += 1
+        return True
+    
+    async def _extend(self, room_code: str, ttl_ms: Optional[int]) -> bool:
+        """Extend (or with `ttl_ms=None`, delete) the lease if this worker still holds it"""
+        from redis.exceptions import WatchError
+        
+        key = self._lease_key(room_code)
+        async with self.redis.client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                if await pipe.get(key) != self.worker_id:
+                    await pipe.unwatch()
+                    return False
+                pipe.multi()
+                if ttl_ms is None:
+                    pipe.delete(key)
+                else:
+                    pipe.pexpire(key, ttl_ms)
+                await pipe.execute()
+                return True
+            except WatchError:
+                return False  # Taken over between the GET and the EXEC
+    
+    async def release(self, room_code: str, handoff: bool = False):
+        """Give up a room (its game ended, or with `handoff`, for another worker to adopt)"""
+        if room_code not in self._owned:
+            return
+        self._owned.discard(room_code)
+        if not self.redis.enabled:
+            return
+        try:
+            await self._extend(room_code, None)
+            if not handoff:
+                await self.redis.client.hdel(self.redis.key("leases"), room_code)
+        except Exception as e:
+            print(f"Error releasing room {room_code}: {e}")
+    
+    async def _dispatch(self, kind: str, room_code: str, payload: dict):
+        handler = self._handlers.get(kind)
+        if handler is None:
+            print(f"No handler for room event {kind}")
+            return
+        try:
+            await handler(room_code, **payload)
+        except Exception as e:
+            print(f"Error handling room event {kind} for {room_code}: {e}")
+    
+    async def send(self, worker_id: str, kind: str, room_code: str, **payload) -> bool:
+        """Run a handler on a given worker; False if no worker received it"""
+        if worker_id == self.worker_id:
+            await self._dispatch(kind, room_code, payload)
+            return True
+        message = json.dumps({"kind": kind, "room_code": room_code, "payload": payload})
+        receivers = await self.redis.client.publish(self._inbox(worker_id), message)
+        self.forwarded += 1
+        if not receivers:
+            self.undelivered += 1
+            print(f"Worker {worker_id} did not receive {kind} for room {room_code}")
+        return bool(receivers)
+    
+    async def run(self, room_code: str, kind: str, **payload) -> bool:
+        """Run a handler on the room's owner (here if the room has no owner)"""
+        owner = await self.owner(room_code)
+        return await self.send(owner or self.worker_id, kind, room_code, **payload)
+    
+    async def _listen(self):
+        """Handle events forwarded to this worker, in arrival order"""
+        async for message in self._pubsub.listen():
+            if message["type"] != "message":
+                continue
+            self.received += 1
+            try:
+                event = json.loads(message["data"])
+            except ValueError:
+                continue
+            await self._dispatch(event["kind"], event["room_code"], event["payload"])
+    
+    async def _renew(self):
+        """Extend owned leases; rooms whose lease was lost are dropped"""
+        ttl_ms = int(self.lease_ttl_s * 1000)
+        for room_code in list(self._owned):
+            if await self._extend(room_code, ttl_ms):
+                continue
+            self._owned.discard(room_code)
+            self.lost += 1
+            print(f"Lost ownership of room {room_code}")
+            await self._dispatch(LOST, room_code, {})
+    
+    async def _adopt_orphans(self):
+        """Take over rooms whose owner's lease expired, if the ring assigns them here"""
+        client = self.redis.client
+        leases = await client.hgetall(self.redis.key("leases"))
+        candidates = [
+            room_code for room_code in leases
+            if room_code not in self._owned and self.preferred_owner(room_code) == self.worker_id
+        ]
+        for room_code in candidates:
+            if await client.exists(self._lease_key(room_code)):
+                continue  # Owner still alive (or its lease has not expired yet)
+            if await self.acquire(room_code):
+                self.adopted += 1
+                print(f"Adopted room {room_code} from {leases[room_code]}")
+                await self._dispatch(ADOPT, room_code, {})
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.lease_ttl_s / 3)
+            try:
+                self.ring = HashRing(self.membership.live_workers(), self.vnodes)
+                await self._renew()
+                await self._adopt_orphans()
+            except Exception as e:
+                print(f"Error maintaining room leases: {e}")
+    
+    async def start(self):
+        """Subscribe to this worker's inbox and start renewing leases (after `connections.start`)"""
+        if not self.redis.enabled or self._tasks:
+            return
+        self.ring = HashRing(self.membership.live_workers(), self.vnodes)
+        self._pubsub = self.redis.client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self._inbox(self.worker_id))
+        self._tasks = [asyncio.create_task(self._listen()), asyncio.create_task(self._run())]
+    
+    async def stop(self):
+        """Hand owned rooms over to other workers (after the final checkpoint) and stop"""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        for room_code in list(self._owned):
+            await self.release(room_code, handoff=True)
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+    
+    def stats(self) -> Dict[str, int]:
+        """Owned rooms and routing metrics"""
+        return {
+            "owned_rooms": len(self._owned),
+            "ring_workers": len(self.ring.workers),
+            "acquired": self.acquired,
+            "lost": self.lost,
+            "adopted": self.adopted,
+            "forwarded": self.forwarded,
+            "received": self.received,
+            "undelivered": self.undelivered,
+        }
+
+
+# Singleton instance
+ownership = RoomOwnership(
+    redis_client,
+    connections,
+    lease_ttl_s=settings.room_lease_ttl_s,
+    vnodes=settings.room_ring_vnodes,
+)
@@ -0,0 +1,87 @@
+from typing import Any, Dict
+from pydantic import BaseModel
+from app.utils.fast_json import RawJSON
+
+# Compact wire schemas for the MessagePack serializer: field name -> integer key.
+# A field's spec is either its key, or (key, nested) where nested is a schema
+# for an object, [schema] for a list of objects or {"*": schema} for a map of
+# objects keyed by data (e.g. player IDs). Fields missing from a schema keep
+# their names, so adding a field never breaks older clients.
+#
+# Append new fields with new keys; never reuse or renumber a key.
+
+PLAYER = {"id": 0, "name": 1, "score": 2, "is_ready": 3, "is_host": 4}
+
+ROOM = {
+    "id": 0,
+    "host_id": 1,
+    "mode": 2,
+    "status": 3,
+    "players": (4, [PLAYER]),
+    "max_players": 5,
+    "created_at": 6,
+    "started_at": 7,
+    "finished_at": 8,
+}
+
+QUESTION = {"id": 0, "question": 1, "options": 2, "difficulty": 3, "category": 4}
+
+PLAYER_STATS = {"score": 0, "answered": 1, "correct": 2, "accuracy": 3, "average_time": 4}
+
+EVENT_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "join_success": {"room": (0, ROOM)},
+    "player_joined": {"player": (0, PLAYER)},
+    "player_left": {"player_id": 0},
+    "game_started": {"game_id": 0, "total_questions": 1},
+    "question_sent": {"question_index": 0, "question": (1, QUESTION), "time_limit": 2, "deadline": 3},
+    "answer_result": {"is_correct": 0, "points": 1, "correct_answer": 2},
+    "answers_update": {"answers": (0, [{"player_id": 0, "is_correct": 1}]), "scores": 1},
+    "game_finished": {"final_scores": 0, "winner": 1, "player_stats": (2, {"*": PLAYER_STATS})},
+}
+
+
+def plain(value: Any) -> Any:
+    """Turn models and pre-rendered JSON into plain dicts/lists"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, RawJSON):
+        return value.value
+    if isinstance(value, dict):
+        return {k: plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(v) for v in value]
+    return value
+
+
+def _compact_value(value: Any, nested: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(nested, list):
+        return [compact(item, nested[0]) for item in value]
+    if "*" in nested:
+        return {k: compact(v, nested["*"]) for k, v in value.items()}
+    return compact(value, nested)
+
+
+def compact(obj: Dict[str, Any], schema: Dict[str, Any]) -> Dict[Any, Any]:
+    """Replace an object's field names with the schema's integer keys (recursively)"""
+    out = {}
+    for field, value in obj.items():
+        spec = schema.get(field)
+        if spec is None:
+            out[field] = value
+        elif isinstance(spec, int):
+            out[spec] = value
+        else:
+            key, nested = spec
+            out[key] = _compact_value(value, nested)
+    return out
+
+
+def compact_event(event: str, data: Any) -> Any:
+    """An event's payload in its compact form (unchanged if the event has no schema)"""
+    data = plain(data)
+    schema = EVENT_SCHEMAS.get(event)
+    if schema is None or not isinstance(data, dict):
+        return data
+    return compact(data, schema)
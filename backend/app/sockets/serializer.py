@@ -0,0 +1,21 @@
+import msgpack
+from socketio import packet
+from socketio.msgpack_packet import MsgPackPacket
+from app.sockets.schemas import compact_event
+
+
+class CompactMsgPackPacket(MsgPackPacket):
+    """Socket.IO packets in MessagePack, with integer-keyed payloads for the events in EVENT_SCHEMAS.
+    
+    Only outgoing events are compacted; packets from clients are decoded as
+    plain MessagePack. Clients need the MessagePack parser
+    (socket.io-msgpack-parser) and the schemas from `GET /protocol`.
+    """
+    
+    def encode(self):
+        """Encode the packet for transmission"""
+        encoded = self._to_dict()
+        data = encoded.get("data")
+        if self.packet_type == packet.EVENT and data and isinstance(data[0], str):
+            encoded["data"] = [data[0]] + [compact_event(data[0], arg) for arg in data[1:]]
+        return msgpack.dumps(encoded)
@@ -0,0 +1,99 @@
+"""
+Fast JSON encoding for REST responses and Socket.IO packets.
+
+Uses orjson when it is installed and falls back to the stdlib `json`.
+Pydantic models can be passed as-is: pydantic-core writes their JSON
+directly, and with orjson that output is spliced into the document
+(`orjson.Fragment`) instead of going through `model_dump()` dicts. `RawJSON`
+values (JSON encoded ahead of time) are spliced in the same way.
+
+The module has the `dumps`/`loads` interface `socketio.AsyncServer(json=...)`
+expects.
+"""
+import json as _json
+from datetime import date, datetime
+from typing import Any
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson >= 3.9
+_Fragment = getattr(orjson, "Fragment", None)
+
+
+class RawJSON:
+    """Already-encoded JSON that is written into documents as-is (e.g. pre-rendered payloads)"""
+    
+    __slots__ = ("json", "_value")
+    
+    def __init__(self, json: bytes):
+        self.json = json
+        self._value = None
+    
+    @property
+    def value(self) -> Any:
+        """The decoded value (decoded once, for encoders that cannot splice JSON)"""
+        if self._value is None:
+            self._value = loads(self.json)
+        return self._value
+    
+    def __len__(self) -> int:
+        return len(self.json)
+
+
+def model_json(model: BaseModel) -> bytes:
+    """A model's JSON, written by pydantic-core without an intermediate dict"""
+    return model.__pydantic_serializer__.to_json(model)
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, RawJSON):
+        if _Fragment is not None:
+            return _Fragment(obj.json)
+        return obj.value
+    if isinstance(obj, BaseModel):
+        if _Fragment is not None:
+            return _Fragment(model_json(obj))
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()  # Only reached with the stdlib fallback
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Compact UTF-8 JSON"""
+    if isinstance(obj, BaseModel):
+        return model_json(obj)
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return _json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def dumps(obj: Any, **kwargs) -> str:
+    """`json.dumps` replacement (formatting options are ignored: output is always compact)"""
+    return dumps_bytes(obj).decode()
+
+
+def loads(data, **kwargs) -> Any:
+    """`json.loads` replacement"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return _json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with `dumps_bytes`.
+    
+    Returning one from a route (e.g. `FastJSONResponse(room)`) also skips
+    FastAPI's re-validation of the result against `response_model`, which
+    is then only used for the OpenAPI schema.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
@@ -1,12 +1,24 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
 from app.models.user import TokenData
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# JWT secrets published in this repo (config default and .env.example); anyone can sign with them
+PUBLIC_JWT_SECRETS = frozenset({
+    "dev-secret-key-change-in-production",
+    "your-super-secret-jwt-key-change-this-in-production",
+    "",
+})
+
+# Password hashing context (hashes below the configured cost need an update)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -14,6 +26,11 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also returns a new hash if the stored one is outdated"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
@@ -37,6 +54,19 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def session_tokens_enabled() -> bool:
+    """Whether our own tokens can be trusted (never signed with a public secret outside development)"""
+    return settings.environment == "development" or settings.jwt_secret_key not in PUBLIC_JWT_SECRETS
+
+
+def is_access_token(token: str) -> bool:
+    """Whether a bearer token is one of ours rather than a Firebase ID token (judged by its header only)"""
+    try:
+        return jwt.get_unverified_header(token).get("alg") == settings.jwt_algorithm
+    except JWTError:
+        return False
+
+
 def decode_access_token(token: str) -> Optional[TokenData]:
     """Decode and validate a JWT token"""
     try:
@@ -51,6 +81,6 @@ def decode_access_token(token: str) -> Optional[TokenData]:
         if user_id is None or username is None:
             return None
         
-        return TokenData(user_id=user_id, username=username)
+        return TokenData(user_id=user_id, username=username, email=payload.get("email"))
     except JWTError:
         return None
@@ -0,0 +1,153 @@
+"""
+Compare the stdlib JSON path with app.utils.fast_json for the payloads the
+server sends most often.
+
+Cases:
+    rest_room        a Room returned from a route: FastAPI's response_model
+                     validation + serialization + JSONResponse, vs.
+                     returning FastJSONResponse(room)
+    join_success     the Socket.IO packet with the full room dump:
+                     model_dump(mode="json") + stdlib json, vs. passing the
+                     model to the fast_json packet serializer
+    question_sent    a question: model_dump() minus the answer + stdlib json
+                     on every send, vs. the payload pre-rendered at game
+                     creation
+    answers_update   a batched answers/scores dict (no models)
+
+Run from the backend directory:
+    python -m benchmarks.json_encoding --players 6 --number 20000
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from socketio import packet
+
+from app.models.question import QuizQuestion
+from app.models.room import Player, Room
+from app.services.game_registry import public_question
+from app.utils import fast_json
+from app.utils.fast_json import FastJSONResponse
+
+
+def _room(players: int) -> Room:
+    return Room(
+        id="A9F3X2",
+        host_id="player_0",
+        mode="medium",
+        status="active",
+        players=[
+            Player(id=f"player_{i}", name=f"Player {i}", score=i * 100, is_ready=True, is_host=i == 0)
+            for i in range(players)
+        ],
+        started_at=datetime.utcnow(),
+    )
+
+
+def _question() -> QuizQuestion:
+    return QuizQuestion(
+        id="q1",
+        question="Which of these is not a valid Python keyword?",
+        options=["lambda", "yield", "function", "nonlocal"],
+        correct_answer=2,
+        difficulty="medium",
+        category="Science: Computers",
+    )
+
+
+def _question_sent_before(question: QuizQuestion, deadline: int) -> dict:
+    question_data = question.model_dump()
+    del question_data["correct_answer"]
+    return {"question_index": 0, "question": question_data, "time_limit": 15, "deadline": deadline}
+
+
+def _answers(players: int) -> dict:
+    return {
+        "answers": [{"player_id": f"player_{i}", "is_correct": i % 2 == 0} for i in range(players)],
+        "scores": {f"player_{i}": i * 100 for i in range(players)},
+    }
+
+
+def _time(func, number: int) -> float:
+    """Microseconds per call (best of 3)"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e6
+
+
+def _packet(data, json_module) -> str:
+    packet.Packet.json = json_module
+    return packet.Packet(packet.EVENT, data=data).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=6)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+    
+    room = _room(args.players)
+    answers = _answers(args.players)
+    question = _question()
+    rendered = public_question(question)
+    deadline = int(time.time() * 1000)
+    room_field = create_model_field(name="Response_get_room", type_=Room, mode="serialization")
+    loop = asyncio.new_event_loop()
+    stdlib_json = packet.Packet.json
+    
+    def rest_before():
+        content = loop.run_until_complete(serialize_response(field=room_field, response_content=room))
+        return JSONResponse(content).body
+    
+    cases = {
+        "rest_room": (
+            rest_before,
+            lambda: FastJSONResponse(room).body,
+        ),
+        "join_success": (
+            lambda: _packet(["join_success", {"room": room.model_dump(mode="json")}], stdlib_json),
+            lambda: _packet(["join_success", {"room": room}], fast_json),
+        ),
+        "question_sent": (
+            lambda: _packet(["question_sent", _question_sent_before(question, deadline)], stdlib_json),
+            lambda: _packet(
+                ["question_sent", {"question_index": 0, "question": rendered, "time_limit": 15, "deadline": deadline}],
+                fast_json
+            ),
+        ),
+        "answers_update": (
+            lambda: _packet(["answers_update", answers], stdlib_json),
+            lambda: _packet(["answers_update", answers], fast_json),
+        ),
+    }
+    
+    # Both paths must produce the same document
+    for name, (before, after) in cases.items():
+        b, a = before(), after()
+        if name != "rest_room":
+            b, a = b[1:], a[1:]  # Strip the packet type
+        assert json.loads(b) == json.loads(a), name
+    
+    print(f"orjson: {'yes' if fast_json.orjson else 'no (stdlib fallback)'}, "
+          f"pydantic fragments: {'yes' if fast_json._Fragment else 'no'}")
+    print(f"{'case':<16}{'before us':>12}{'after us':>12}{'speedup':>10}")
+    for name, (before, after) in cases.items():
+        t_before = _time(before, args.number)
+        t_after = _time(after, args.number)
+        print(f"{name:<16}{t_before:>12.2f}{t_after:>12.2f}{t_before / t_after:>9.1f}x")
+    
+    packet.Packet.json = stdlib_json
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Measure event-loop lag (what a live game on the same worker feels) during a
+storm of legacy email/password logins.
+
+A ticker coroutine records how late each 10 ms wake-up fires while N
+concurrent logins go through AuthService. Half of the accounts are stored at
+a lower bcrypt cost, so those logins also upgrade their hash. With --inline,
+bcrypt runs on the event loop (the old behaviour) for comparison.
+
+Run from the backend directory (no Firebase project needed):
+    python -m benchmarks.login_storm --logins 40
+    python -m benchmarks.login_storm --logins 40 --inline
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ["STORAGE_BACKEND"] = "memory"
+
+TICK = 0.01
+
+
+async def _ticker(lags: list, stop: asyncio.Event):
+    """Record how late each tick wakes up"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def _login(auth_service, email: str, password: str, timings: list) -> str:
+    start = time.perf_counter()
+    try:
+        await auth_service.login_user(email, password)
+        return "ok"
+    except Exception as e:
+        return type(e).__name__
+    finally:
+        timings.append(time.perf_counter() - start)
+
+
+async def run(logins: int, old_rounds: int) -> dict:
+    from passlib.context import CryptContext
+    from app.config import settings
+    from app.services.auth_service import auth_service
+    from app.services.password_hasher import password_hasher
+    
+    # Accounts stored directly; every other one at an outdated cost
+    old_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=old_rounds)
+    current = await password_hasher.hash("bench-password")
+    outdated = old_context.hash("bench-password")
+    for i in range(logins):
+        user_id = f"bench_{i}"
+        await auth_service.users_ref.set(user_id, {
+            "user_id": user_id,
+            "username": f"bench{i}",
+            "email": f"bench{i}@example.com",
+            "password_hash": outdated if i % 2 else current,
+            "created_at": "2024-01-01T00:00:00",
+            "stats": {},
+        })
+    
+    await password_hasher.start()
+    lags: list = []
+    timings: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(lags, stop))
+    await asyncio.sleep(0.2)  # Baseline ticks
+    
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(_login(auth_service, f"bench{i}@example.com", "bench-password", timings) for i in range(logins))
+    )
+    elapsed = time.perf_counter() - start
+    
+    stop.set()
+    await ticker
+    await password_hasher.stop()
+    
+    return {
+        "logins": logins,
+        "bcrypt_rounds": settings.bcrypt_rounds,
+        "ok": results.count("ok"),
+        "rejected": results.count("PasswordPoolFull"),
+        "rehashed": password_hasher.rehashed,
+        "elapsed_s": round(elapsed, 3),
+        "p50_login_ms": round(statistics.median(timings) * 1000, 1),
+        "max_loop_lag_ms": round(max(lags, default=0) * 1000, 2),
+        "p50_loop_lag_ms": round(statistics.median(lags) * 1000, 2) if lags else 0,
+        "total_blocked_ms": round(sum(lag for lag in lags if lag > TICK) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=None, help="bcrypt cost (default: BCRYPT_ROUNDS)")
+    parser.add_argument("--old-rounds", type=int, default=10, help="cost of the outdated hashes")
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default: PASSWORD_HASH_WORKERS)")
+    parser.add_argument("--inline", action="store_true", help="run bcrypt on the event loop")
+    args = parser.parse_args()
+    
+    # Settings are read at import time (and by the spawned workers)
+    if args.rounds is not None:
+        os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    if args.inline:
+        os.environ["PASSWORD_HASH_WORKERS"] = "0"
+    elif args.workers is not None:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    os.environ.setdefault("PASSWORD_HASH_MAX_QUEUE", str(max(args.logins, 64)))
+    
+    result = asyncio.run(run(args.logins, args.old_rounds))
+    mode = "inline" if args.inline else "process pool"
+    print(f"[{mode}] " + ", ".join(f"{k}={v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
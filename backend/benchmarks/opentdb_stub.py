@@ -0,0 +1,83 @@
+"""
+Local stand-in for the OpenTDB API, for exercising the question refiller
+without hitting the real service (or its rate limit).
+
+Serves random multiple-choice questions in OpenTDB's response format and
+answers with response_code 5 when requests arrive faster than --interval.
+
+Run from the backend directory, then point the server at it:
+    python -m benchmarks.opentdb_stub --port 8765
+    QUIZ_API_URL=http://127.0.0.1:8765/api.php QUIZ_API_MIN_INTERVAL_S=0.5 uvicorn app.main:app
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+_counter = itertools.count(1)
+_lock = threading.Lock()
+_last_request = [0.0]
+
+
+def _question(difficulty: str) -> dict:
+    n = next(_counter)
+    return {
+        "type": "multiple",
+        "difficulty": difficulty,
+        "category": "Science: Computers",
+        "question": f"Stub question #{n}?",
+        "correct_answer": f"Right {n}",
+        "incorrect_answers": [f"Wrong {n}a", f"Wrong {n}b", f"Wrong {n}c"],
+    }
+
+
+def make_handler(interval: float):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            params = parse_qs(urlparse(self.path).query)
+            amount = min(int(params.get("amount", ["10"])[0]), 50)
+            difficulty = params.get("difficulty", ["medium"])[0]
+            
+            with _lock:
+                now = time.monotonic()
+                limited = now - _last_request[0] < interval
+                _last_request[0] = now
+            
+            if limited:
+                body = {"response_code": 5, "results": []}
+            else:
+                body = {"response_code": 0, "results": [_question(difficulty) for _ in range(amount)]}
+            
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        
+        def log_message(self, format, *args):
+            print(f"[opentdb-stub] {self.address_string()} {format % args}")
+    
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=0.5, help="minimum seconds between requests")
+    args = parser.parse_args()
+    
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.interval))
+    print(f"OpenTDB stub on http://{args.host}:{args.port}/api.php")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Per-event Socket.IO payload size report: text JSON vs. MessagePack vs.
+MessagePack with the integer-keyed schemas (app/sockets/schemas.py).
+
+Also reports the client-side decode time of each encoding. Run from the
+backend directory:
+    python -m benchmarks.payload_sizes --players 6
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+
+import msgpack
+from socketio import packet
+from socketio.msgpack_packet import MsgPackPacket
+
+from app.models.question import QuizQuestion
+from app.models.room import Player, Room
+from app.services.game_registry import public_question
+from app.sockets.schemas import EVENT_SCHEMAS, plain
+from app.sockets.serializer import CompactMsgPackPacket
+from app.utils import fast_json
+
+
+def _events(players: int) -> dict:
+    """A representative payload for every event with a compact schema"""
+    ids = [f"u{i:02d}Xq3fTz8LmN0pR7sV2wY5kA" for i in range(players)]  # Firebase-length UIDs
+    room = Room(
+        id="A9F3X2",
+        host_id=ids[0],
+        mode="medium",
+        status="waiting",
+        players=[Player(id=pid, name=f"Player {i}", is_host=i == 0) for i, pid in enumerate(ids)],
+        created_at=datetime.utcnow(),
+    )
+    question = QuizQuestion(
+        id="q3",
+        question='In "C++", which keyword prevents a class from being inherited from?',
+        options=["static", "sealed", "final", "const"],
+        correct_answer=2,
+        difficulty="medium",
+        category="Science: Computers",
+    )
+    stats = {"score": 640, "answered": 10, "correct": 8, "accuracy": 0.8, "average_time": 6.125}
+    return {
+        "join_success": {"room": room},
+        "player_joined": {"player": room.players[-1]},
+        "player_left": {"player_id": ids[-1]},
+        "game_started": {"game_id": "game_A9F3X2", "total_questions": 10},
+        "question_sent": {
+            "question_index": 2,
+            "question": public_question(question),
+            "time_limit": 15,
+            "deadline": int(time.time() * 1000),
+        },
+        "answer_result": {"is_correct": True, "points": 70, "correct_answer": 2},
+        "answers_update": {
+            "answers": [{"player_id": pid, "is_correct": i % 2 == 0} for i, pid in enumerate(ids)],
+            "scores": {pid: 100 * i for i, pid in enumerate(ids)},
+        },
+        "game_finished": {
+            "final_scores": {pid: 100 * i for i, pid in enumerate(ids)},
+            "winner": ids[-1],
+            "player_stats": {pid: stats for pid in ids},
+        },
+    }
+
+
+def _decode_us(decode, encoded, number: int = 2000) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        decode(encoded)
+    return (time.perf_counter() - start) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=6)
+    args = parser.parse_args()
+    
+    packet.Packet.json = fast_json
+    events = _events(args.players)
+    assert set(events) == set(EVENT_SCHEMAS)
+    
+    print(f"{'event':<16}{'json B':>9}{'msgpack B':>11}{'compact B':>11}{'saved':>8}"
+          f"{'json dec us':>13}{'compact dec us':>16}")
+    totals = [0, 0, 0]
+    for event, payload in events.items():
+        as_json = packet.Packet(packet.EVENT, data=[event, payload]).encode().encode()
+        as_msgpack = MsgPackPacket(packet.EVENT, data=[event, plain(payload)]).encode()
+        as_compact = CompactMsgPackPacket(packet.EVENT, data=[event, payload]).encode()
+        sizes = (len(as_json), len(as_msgpack), len(as_compact))
+        totals = [t + s for t, s in zip(totals, sizes)]
+        print(
+            f"{event:<16}{sizes[0]:>9}{sizes[1]:>11}{sizes[2]:>11}"
+            f"{1 - sizes[2] / sizes[0]:>8.0%}"
+            f"{_decode_us(lambda b: json.loads(b[1:]), as_json):>13.2f}"
+            f"{_decode_us(lambda b: msgpack.loads(b, strict_map_key=False), as_compact):>16.2f}"
+        )
+    print(f"{'total':<16}{totals[0]:>9}{totals[1]:>11}{totals[2]:>11}{1 - totals[2] / totals[0]:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+"""
+Minimal in-process Redis stand-in for running several workers locally
+without a Redis server.
+
+Speaks the Redis protocol (RESP2, or RESP3 after HELLO 3) and implements
+only what the backend uses: pub/sub for the Socket.IO client manager, hashes and sorted sets for
+the shared connection registry and worker membership, and strings with
+expiry plus WATCH/MULTI/EXEC for room ownership leases. Data lives in
+memory and is lost when the stub stops.
+
+Run from the backend directory, then point each worker at it:
+    python -m benchmarks.redis_stub --port 6390
+    REDIS_URL=redis://127.0.0.1:6390/0 uvicorn app.main:socket_app --port 8000
+    REDIS_URL=redis://127.0.0.1:6390/0 uvicorn app.main:socket_app --port 8001
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional, Set
+
+
+class RespError(Exception):
+    pass
+
+
+class Push(list):
+    """Out-of-band message (pub/sub), a plain array in RESP2"""
+
+
+def encode(value, resp3: bool = False) -> bytes:
+    """Encode a reply in RESP2 or RESP3"""
+    if value is None:
+        return b"_\r\n" if resp3 else b"$-1\r\n"
+    if isinstance(value, RespError):
+        return b"-" + str(value).encode() + b"\r\n"
+    if isinstance(value, bool):
+        return b":1\r\n" if value else b":0\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str):
+        # Status replies are passed as str ("OK", "PONG", "QUEUED")
+        return b"+" + value.encode() + b"\r\n"
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, dict):
+        if resp3:
+            return b"%%%d\r\n" % len(value) + b"".join(
+                encode(k, resp3) + encode(v, resp3) for k, v in value.items()
+            )
+        value = [item for pair in value.items() for item in pair]
+    if isinstance(value, (list, tuple)):
+        kind = b">" if resp3 and isinstance(value, Push) else b"*"
+        return kind + b"%d\r\n" % len(value) + b"".join(encode(item, resp3) for item in value)
+    raise TypeError(f"Cannot encode {type(value)}")
+
+
+# Marker for commands that already wrote their replies (SUBSCRIBE)
+NO_REPLY = object()
+
+
+class Store:
+    """Keyspace shared by all connections"""
+    
+    def __init__(self):
+        self.data: Dict[bytes, object] = {}
+        self.expires: Dict[bytes, float] = {}
+        self.versions: Dict[bytes, int] = {}  # Bumped on every write, for WATCH
+        self.channels: Dict[bytes, Set["Connection"]] = {}
+    
+    def _expired(self, key: bytes) -> bool:
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+            self.touch(key)
+            return True
+        return False
+    
+    def get(self, key: bytes, kind=None, create: bool = False):
+        if self._expired(key) or key not in self.data:
+            if not create:
+                return None
+            self.data[key] = kind()
+        value = self.data[key]
+        if kind is not None and not isinstance(value, kind):
+            raise RespError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+    
+    def touch(self, key: bytes):
+        self.versions[key] = self.versions.get(key, 0) + 1
+    
+    def version(self, key: bytes) -> int:
+        self._expired(key)
+        return self.versions.get(key, 0)
+    
+    def delete(self, key: bytes) -> bool:
+        existed = not self._expired(key) and key in self.data
+        self.data.pop(key, None)
+        self.expires.pop(key, None)
+        if existed:
+            self.touch(key)
+        return existed
+
+
+class Connection:
+    def __init__(self, store: Store, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.store = store
+        self.reader = reader
+        self.writer = writer
+        self.subscriptions: Set[bytes] = set()
+        self.watched: Dict[bytes, int] = {}
+        self.queued: Optional[List[List[bytes]]] = None  # Inside MULTI
+        self.resp3 = False
+    
+    async def read_command(self) -> Optional[List[bytes]]:
+        line = await self.reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # Inline command (e.g. typed into telnet)
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:])):
+            header = await self.reader.readline()
+            length = int(header[1:])
+            args.append((await self.reader.readexactly(length + 2))[:-2])
+        return args
+    
+    def send(self, value):
+        self.writer.write(encode(value, self.resp3))
+    
+    async def serve(self):
+        try:
+            while True:
+                args = await self.read_command()
+                if args is None:
+                    break
+                if not args:
+                    continue
+                reply = self.dispatch(args)
+                if reply is not NO_REPLY:
+                    self.send(reply)
+                await self.writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in self.subscriptions:
+                self.store.channels.get(channel, set()).discard(self)
+            self.writer.close()
+    
+    def dispatch(self, args: List[bytes]):
+        name = args[0].upper().decode()
+        if self.queued is not None and name not in ("EXEC", "DISCARD", "MULTI", "WATCH"):
+            self.queued.append(args)
+            return "QUEUED"
+        handler = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            return RespError(f"ERR unknown command '{name}'")
+        try:
+            return handler(*args[1:])
+        except RespError as e:
+            return e
+        except (TypeError, ValueError, IndexError):
+            return RespError(f"ERR wrong arguments for '{name}' command")
+    
+    # Connection
+    
+    def cmd_ping(self, message=None):
+        return message if message is not None else "PONG"
+    
+    def cmd_echo(self, message):
+        return message
+    
+    def cmd_hello(self, protover=b"2", *args):
+        if protover not in (b"2", b"3"):
+            raise RespError("NOPROTO unsupported protocol version")
+        self.resp3 = protover == b"3"
+        return {
+            b"server": b"redis", b"version": b"7.0.0", b"proto": int(protover),
+            b"id": id(self), b"mode": b"standalone", b"role": b"master", b"modules": [],
+        }
+    
+    def cmd_client(self, *args):
+        return "OK"
+    
+    def cmd_select(self, db):
+        return "OK"
+    
+    # Pub/sub
+    
+    def cmd_subscribe(self, *channels):
+        for channel in channels:
+            self.subscriptions.add(channel)
+            self.store.channels.setdefault(channel, set()).add(self)
+            self.send(Push([b"subscribe", channel, len(self.subscriptions)]))
+        return NO_REPLY
+    
+    def cmd_unsubscribe(self, *channels):
+        for channel in channels or list(self.subscriptions):
+            self.subscriptions.discard(channel)
+            self.store.channels.get(channel, set()).discard(self)
+            self.send(Push([b"unsubscribe", channel, len(self.subscriptions)]))
+        return NO_REPLY
+    
+    def cmd_publish(self, channel, message):
+        subscribers = list(self.store.channels.get(channel, ()))
+        for subscriber in subscribers:
+            subscriber.send(Push([b"message", channel, message]))
+        return len(subscribers)
+    
+    # Strings and keys
+    
+    def cmd_get(self, key):
+        value = self.store.get(key)
+        if value is not None and not isinstance(value, bytes):
+            raise RespError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+    
+    def cmd_set(self, key, value, *options):
+        options = [o.upper() for o in options]
+        ttl = None
+        if b"PX" in options:
+            ttl = int(options[options.index(b"PX") + 1]) / 1000
+        elif b"EX" in options:
+            ttl = int(options[options.index(b"EX") + 1])
+        exists = self.store.get(key) is not None
+        if (b"NX" in options and exists) or (b"XX" in options and not exists):
+            return None
+        self.store.data[key] = value
+        self.store.expires.pop(key, None)
+        if ttl is not None:
+            self.store.expires[key] = time.monotonic() + ttl
+        self.store.touch(key)
+        return "OK"
+    
+    def cmd_del(self, *keys):
+        return sum(self.store.delete(key) for key in keys)
+    
+    def cmd_exists(self, *keys):
+        return sum(self.store.get(key) is not None for key in keys)
+    
+    def cmd_pexpire(self, key, ms):
+        if self.store.get(key) is None:
+            return 0
+        self.store.expires[key] = time.monotonic() + int(ms) / 1000
+        self.store.touch(key)
+        return 1
+    
+    def cmd_expire(self, key, seconds):
+        return self.cmd_pexpire(key, int(seconds) * 1000)
+    
+    def cmd_pttl(self, key):
+        if self.store.get(key) is None:
+            return -2
+        deadline = self.store.expires.get(key)
+        return -1 if deadline is None else int((deadline - time.monotonic()) * 1000)
+    
+    # Hashes
+    
+    def cmd_hset(self, key, *pairs):
+        h = self.store.get(key, dict, create=True)
+        added = 0
+        for field, value in zip(pairs[::2], pairs[1::2]):
+            added += field not in h
+            h[field] = value
+        self.store.touch(key)
+        return added
+    
+    def cmd_hget(self, key, field):
+        h = self.store.get(key, dict)
+        return h.get(field) if h else None
+    
+    def cmd_hdel(self, key, *fields):
+        h = self.store.get(key, dict)
+        if not h:
+            return 0
+        removed = sum(h.pop(field, None) is not None for field in fields)
+        if not h:
+            self.store.delete(key)
+        elif removed:
+            self.store.touch(key)
+        return removed
+    
+    def cmd_hgetall(self, key):
+        return dict(self.store.get(key, dict) or {})
+    
+    # Sorted sets
+    
+    def cmd_zadd(self, key, *pairs):
+        z = self.store.get(key, dict, create=True)
+        added = 0
+        for score, member in zip(pairs[::2], pairs[1::2]):
+            added += member not in z
+            z[member] = float(score)
+        self.store.touch(key)
+        return added
+    
+    def cmd_zrem(self, key, *members):
+        z = self.store.get(key, dict)
+        if not z:
+            return 0
+        removed = sum(z.pop(member, None) is not None for member in members)
+        if removed:
+            self.store.touch(key)
+        return removed
+    
+    @staticmethod
+    def _bound(value: bytes) -> float:
+        if value in (b"-inf", b"+inf", b"inf"):
+            return float(value.replace(b"+", b""))
+        return float(value)
+    
+    def cmd_zrangebyscore(self, key, low, high, *options):
+        z = self.store.get(key, dict) or {}
+        low, high = self._bound(low), self._bound(high)
+        members = sorted((score, member) for member, score in z.items() if low <= score <= high)
+        if b"WITHSCORES" in [o.upper() for o in options]:
+            return [item for score, member in members for item in (member, repr(score).encode())]
+        return [member for _, member in members]
+    
+    def cmd_zremrangebyscore(self, key, low, high):
+        z = self.store.get(key, dict) or {}
+        low, high = self._bound(low), self._bound(high)
+        doomed = [member for member, score in z.items() if low <= score <= high]
+        return self.cmd_zrem(key, *doomed) if doomed else 0
+    
+    # Transactions (optimistic locking, as used for leases)
+    
+    def cmd_watch(self, *keys):
+        for key in keys:
+            self.watched[key] = self.store.version(key)
+        return "OK"
+    
+    def cmd_unwatch(self):
+        self.watched = {}
+        return "OK"
+    
+    def cmd_multi(self):
+        self.queued = []
+        return "OK"
+    
+    def cmd_discard(self):
+        self.queued = None
+        self.watched = {}
+        return "OK"
+    
+    def cmd_exec(self):
+        queued, self.queued = self.queued or [], None
+        watched, self.watched = self.watched, {}
+        if any(self.store.version(key) != version for key, version in watched.items()):
+            return None  # Aborted: a watched key changed
+        return [self.dispatch(args) for args in queued]
+
+
+async def serve(host: str, port: int):
+    store = Store()
+    
+    async def handle(reader, writer):
+        await Connection(store, reader, writer).serve()
+    
+    server = await asyncio.start_server(handle, host, port)
+    print(f"Redis stub on redis://{host}:{port}/0")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Measure event-loop blocking during a burst of concurrent room joins.
+
+A ticker coroutine records how late each 10 ms wake-up fires while N players
+join rooms through RoomService. With --inline, storage calls run directly on
+the event loop (the old behaviour) for comparison.
+
+Needs the Firestore backend: --inline replaces FirestoreClient's thread-pool
+offload, which the memory backend does not use (its simulated latency is an
+asyncio.sleep and never blocks the loop), so --inline is rejected with
+STORAGE_BACKEND=memory.
+
+Run from the backend directory against Firestore or the emulator:
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python -m benchmarks.room_join_loop_lag
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python -m benchmarks.room_join_loop_lag --inline
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+TICK = 0.01
+
+
+async def _ticker(lags: list, stop: asyncio.Event):
+    """Record how late each tick wakes up"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def run(rooms: int, players: int) -> dict:
+    from app.services.room_service import room_service
+
+    codes = []
+    for i in range(rooms):
+        room = await room_service.create_room(f"bench_host_{i}", "Host", "easy", max_players=players + 1)
+        codes.append(room.id)
+
+    lags: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(lags, stop))
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            room_service.join_room(code, f"bench_{code}_{p}", f"Player{p}")
+            for code in codes
+            for p in range(players)
+        ),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker
+
+    for code in codes:
+        await room_service.rooms_ref.delete(code)
+
+    return {
+        "joins": rooms * players,
+        "elapsed_s": round(elapsed, 3),
+        "max_loop_lag_ms": round(max(lags, default=0) * 1000, 2),
+        "p50_loop_lag_ms": round(statistics.median(lags) * 1000, 2) if lags else 0,
+        "total_blocked_ms": round(sum(lag for lag in lags if lag > TICK) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--players", type=int, default=5)
+    parser.add_argument("--inline", action="store_true", help="run storage calls on the event loop")
+    args = parser.parse_args()
+
+    from app.config import settings
+    if args.inline and settings.storage_backend != "firestore":
+        parser.error("--inline only applies to the Firestore backend (set STORAGE_BACKEND=firestore)")
+
+    if args.inline:
+        from app.database.firestore import FirestoreClient
+
+        async def run_inline(self, func, *a, **kw):
+            return func(*a, **kw)
+
+        FirestoreClient.run = run_inline
+
+    result = asyncio.run(run(args.rooms, args.players))
+    mode = "inline" if args.inline else "offloaded"
+    print(f"[{mode}] " + ", ".join(f"{k}={v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
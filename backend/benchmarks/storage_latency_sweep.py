@@ -0,0 +1,75 @@
+"""
+Benchmark the room lobby hot paths against the in-memory storage backend
+while sweeping the simulated storage latency.
+
+For each latency, N concurrent lobbies run create -> join x players -> start,
+and the script reports throughput and per-operation latency percentiles.
+
+Run from the backend directory (no Firebase project needed):
+    python -m benchmarks.storage_latency_sweep --latencies 0,1,5,20 --jitter 2
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ["STORAGE_BACKEND"] = "memory"
+
+
+def _percentile(samples: list, pct: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct))]
+
+
+async def _timed(timings: dict, op: str, coro):
+    start = time.perf_counter()
+    result = await coro
+    timings.setdefault(op, []).append(time.perf_counter() - start)
+    return result
+
+
+async def _lobby(room_service, timings: dict, index: int, players: int):
+    host_id = f"bench_host_{index}"
+    room = await _timed(timings, "create", room_service.create_room(host_id, "Host", "easy"))
+    for p in range(players):
+        await _timed(timings, "join", room_service.join_room(room.id, f"bench_{index}_{p}", f"Player{p}"))
+    await _timed(timings, "start", room_service.start_game(room.id, host_id))
+
+
+async def run(latency_ms: float, jitter_ms: float, lobbies: int, players: int) -> dict:
+    from app.database.firestore import firestore_client
+    from app.services.room_service import room_service
+
+    firestore_client.latency_ms = latency_ms
+    firestore_client.jitter_ms = jitter_ms
+
+    timings: dict = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(_lobby(room_service, timings, i, players) for i in range(lobbies)))
+    elapsed = time.perf_counter() - start
+
+    result = {"latency_ms": latency_ms, "lobbies_per_s": round(lobbies / elapsed, 1)}
+    for op, samples in timings.items():
+        result[f"{op}_p50_ms"] = round(statistics.median(samples) * 1000, 2)
+        result[f"{op}_p99_ms"] = round(_percentile(samples, 0.99) * 1000, 2)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latencies", default="0,1,5,20", help="comma-separated latencies in ms")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--lobbies", type=int, default=200)
+    parser.add_argument("--players", type=int, default=3)
+    args = parser.parse_args()
+
+    for latency in (float(x) for x in args.latencies.split(",")):
+        result = asyncio.run(run(latency, args.jitter, args.lobbies, args.players))
+        print(", ".join(f"{k}={v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
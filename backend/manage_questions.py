@@ -0,0 +1,51 @@
+"""
+Import and export the local question bank.
+
+Files are streamed in batches, so corpora of any size use constant memory.
+JSONL rows look like the export ({"question", "options", "correct_answer",
+"difficulty", "category"}) or like OpenTDB results ({"question",
+"correct_answer", "incorrect_answers", ...}). CSV files have the columns
+question, options, correct_answer, difficulty, category, with options as a
+JSON array (as exported) or |-separated.
+
+Usage (from the backend directory):
+    python manage_questions.py import questions.jsonl
+    python manage_questions.py import questions.csv --format csv
+    python manage_questions.py export backup.jsonl
+"""
+import argparse
+import json
+import sys
+from app.database.question_bank import question_bank
+from app.services.question_io import FORMATS, export_questions, import_questions
+
+
+def _format(path: str, fmt: str) -> str:
+    if fmt:
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", help="file to read or write ('-' for stdin/stdout)")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    fmt = _format(args.path, args.format)
+    
+    if args.command == "import":
+        source = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8", newline="")
+        with source:
+            report = import_questions(question_bank, source, fmt, args.batch_size)
+        print(json.dumps(report, indent=2))
+    else:
+        target = sys.stdout if args.path == "-" else open(args.path, "w", encoding="utf-8", newline="")
+        with target:
+            for line in export_questions(question_bank, fmt):
+                target.write(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+
+# Unit tests never touch Firebase or Redis
+os.environ["STORAGE_BACKEND"] = "memory"
+os.environ.pop("REDIS_URL", None)
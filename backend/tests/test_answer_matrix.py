@@ -0,0 +1,96 @@
+import pytest
+from app.models.question import QuizQuestion
+from app.services.answer_matrix import AnswerMatrix
+from app.services.game_registry import GameRecord
+from app.services.game_service import game_service
+
+
+def _question(qid: str, correct: int = 1) -> QuizQuestion:
+    return QuizQuestion(
+        id=qid,
+        question=f"Question {qid}?",
+        options=["a", "b", "c", "d"],
+        correct_answer=correct,
+        difficulty="easy",
+        category="Test",
+    )
+
+
+@pytest.fixture
+def game():
+    questions = [_question("q0"), _question("q1", correct=2)]
+    record = GameRecord("game_T1", "T1", questions, AnswerMatrix(["q0", "q1"], 2), "2024-01-01T00:00:00")
+    game_service.active_games.add(record)
+    yield record
+    game_service.active_games.discard(record.game_id)
+
+
+def test_record_and_get():
+    matrix = AnswerMatrix(["q0", "q1"], 2)
+    assert matrix.get("p1", "q0") is None
+    matrix.record("p1", "q0", 3, 4.5, False, 0)
+    assert matrix.get("p1", "q0") == {"answer": 3, "time_taken": 4.5, "is_correct": False, "points": 0}
+    assert matrix.answered_count("q0") == 1
+    assert matrix.answered_count("q1") == 0
+
+
+def test_grows_past_capacity():
+    matrix = AnswerMatrix(["q0", "q1"], 1)
+    for i in range(5):
+        matrix.record(f"p{i}", "q1", i % 4, float(i), i % 2 == 0, 10 * i)
+    assert matrix.capacity == 8
+    assert [matrix.get(f"p{i}", "q1")["points"] for i in range(5)] == [0, 10, 20, 30, 40]
+    assert matrix.get("p0", "q0") is None
+
+
+def test_stats():
+    matrix = AnswerMatrix(["q0", "q1"], 4)
+    matrix.record("p1", "q0", 1, 2.0, True, 100)
+    matrix.record("p2", "q0", 0, 4.0, False, 0)
+    matrix.record("p1", "q1", 2, 6.0, True, 70)
+    assert matrix.question_stats("q0") == {"answered": 2, "correct": 1, "accuracy": 0.5, "average_time": 3.0}
+    stats = matrix.player_stats()
+    assert stats["p1"] == {"score": 170, "answered": 2, "correct": 2, "accuracy": 1.0, "average_time": 4.0}
+    assert stats["p2"]["answered"] == 1
+    assert matrix.totals() == {"p1": (170, 8.0), "p2": (0, 4.0)}
+
+
+def test_round_trip():
+    matrix = AnswerMatrix(["q0", "q1"], 2)
+    matrix.record("p1", "q1", 2, 1.5, True, 100)
+    restored = AnswerMatrix.from_dict(matrix.to_dict())
+    assert restored.get("p1", "q1") == matrix.get("p1", "q1")
+    assert restored.player_ids == ["p1"]
+
+
+def test_submit_answer_scores_and_first_answer_is_final(game):
+    result = game_service.submit_answer("game_T1", "p1", "q0", 0, 3.0)
+    assert result == {"is_correct": False, "points": 0, "correct_answer": 1}
+    
+    # The result revealed the correct answer: resubmitting it must not score
+    with pytest.raises(ValueError, match="Already answered"):
+        game_service.submit_answer("game_T1", "p1", "q0", 1, 0.0)
+    assert game_service.get_player_score("game_T1", "p1") == 0
+    assert game.player_answers.get("p1", "q0")["answer"] == 0
+    assert game_service.get_player_stats("game_T1")["p1"]["answered"] == 1
+    
+    result = game_service.submit_answer("game_T1", "p2", "q0", 1, 3.0)
+    assert result["points"] == 100
+    assert game_service.get_player_score("game_T1", "p2") == 100
+
+
+@pytest.mark.parametrize("answer", [1.0, True, -1, 4, 500, "1", None])
+def test_submit_answer_rejects_bad_answer(game, answer):
+    with pytest.raises(ValueError):
+        game_service.submit_answer("game_T1", "p1", "q0", answer, 3.0)
+    assert game_service.get_scores("game_T1") == {}
+    assert game.player_answers.get("p1", "q0") is None
+    assert "p1" not in game.answered
+
+
+@pytest.mark.parametrize("time_taken", [-1, float("nan"), float("inf"), "3", None, True])
+def test_submit_answer_rejects_bad_time(game, time_taken):
+    with pytest.raises(ValueError):
+        game_service.submit_answer("game_T1", "p1", "q0", 1, time_taken)
+    assert game_service.get_scores("game_T1") == {}
+    assert game.player_answers.get("p1", "q0") is None
@@ -0,0 +1,105 @@
+import asyncio
+from app.database.memory import MemoryClient
+from app.models.question import QuizQuestion
+from app.services.answer_matrix import AnswerMatrix
+from app.services.checkpoints import CHECKPOINTS, GameCheckpointer
+from app.services.game_registry import QUESTION, GameRecord, GameRegistry
+from app.services.persistence import WriteBehindQueue
+
+
+def _questions(prefix: str):
+    return [
+        QuizQuestion(id=f"q{i}", question=f"{prefix} {i}?", options=["a", "b"], correct_answer=0, difficulty="easy", category="T")
+        for i in range(3)
+    ]
+
+
+async def _game(games, room_id: str, created_at: str = "2024-01-01T00:00:00") -> GameRecord:
+    """A running game whose `games` doc is stored, like GameService.create_game"""
+    questions = _questions(room_id)
+    game_id = f"game_{room_id}"
+    await games.set(game_id, {
+        "game_id": game_id,
+        "room_id": room_id,
+        "questions": [q.model_dump() for q in questions],
+        "created_at": created_at,
+    })
+    record = GameRecord(game_id, room_id, questions, AnswerMatrix([q.id for q in questions], 2), created_at)
+    record.roster = {"p1", "p2"}
+    record.current_question_index = 1
+    record.phase = QUESTION
+    record.deadline = 1700000000.0
+    record.player_answers.record("p1", "q0", 0, 2.5, True, 100)
+    return record
+
+
+def _setup():
+    backend = MemoryClient(latency_ms=0, jitter_ms=0, op_latency_ms={})
+    writes = WriteBehindQueue(backend)
+    registry = GameRegistry(backend.collection("games"), writes)
+    checkpointer = GameCheckpointer(backend.collection(CHECKPOINTS), registry, writes)
+    return backend, writes, registry, checkpointer
+
+
+def test_checkpoint_leaves_out_questions_and_resumes_from_games_doc():
+    backend, writes, registry, checkpointer = _setup()
+    
+    async def run():
+        await writes.start()
+        record = await _game(registry.games_ref, "C1")
+        registry.add(record)
+        checkpointer.checkpoint()
+        await writes.wait_idle()
+        
+        doc = await checkpointer.checkpoints_ref.get("game_C1")
+        registry.discard("game_C1")
+        resumed = await checkpointer.load_game("game_C1")
+        await writes.stop()
+        return record, doc, resumed
+    
+    record, doc, resumed = asyncio.run(run())
+    assert "questions" not in doc
+    assert resumed.questions == record.questions
+    assert resumed.current_question_index == 1
+    assert resumed.phase == QUESTION and resumed.deadline == record.deadline
+    assert resumed.roster == {"p1", "p2"}
+    assert resumed.scoreboard.scores() == {"p1": 100}
+
+
+def test_checkpoint_of_a_replaced_game_is_not_resumed():
+    backend, writes, registry, checkpointer = _setup()
+    
+    async def run():
+        await writes.start()
+        registry.add(await _game(registry.games_ref, "C2"))
+        checkpointer.checkpoint()
+        await writes.wait_idle()
+        registry.discard("game_C2")
+        # The room started a new game; its doc now holds other questions
+        await _game(registry.games_ref, "C2", created_at="2024-01-02T00:00:00")
+        resumed = await checkpointer.load_game("game_C2")
+        await writes.stop()
+        return resumed
+    
+    assert asyncio.run(run()) is None
+
+
+def test_spilled_game_is_restored_with_its_questions():
+    backend, writes, registry, checkpointer = _setup()
+    registry.max_games = 1
+    
+    async def run():
+        await writes.start()
+        first = await _game(registry.games_ref, "S1")
+        registry.add(first)
+        registry.add(await _game(registry.games_ref, "S2"))  # Spills S1
+        assert "game_S1" not in registry
+        await writes.wait_idle()
+        restored = await registry.restore("game_S1")
+        await writes.stop()
+        return first, restored
+    
+    first, restored = asyncio.run(run())
+    assert restored.questions == first.questions
+    assert restored.current_question_index == 1
+    assert "questions" not in restored.to_doc()
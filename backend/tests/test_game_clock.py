@@ -0,0 +1,76 @@
+import asyncio
+from app.services.game_clock import GameClock
+
+
+def _run(scenario, clock: GameClock, settle: float):
+    """Run a scenario, then let the wheel run for `settle` seconds"""
+    async def run():
+        result = scenario(asyncio.get_running_loop())
+        await asyncio.sleep(settle)
+        await clock.stop()
+        return result
+    return asyncio.run(run())
+
+
+def test_timers_fire_in_deadline_order_and_never_early():
+    clock = GameClock(tick_s=0.01)
+    fired = []
+    
+    def scenario(loop):
+        start = loop.time()
+        for delay in (0.05, 0.02, 0.03):
+            clock.schedule(delay, lambda d: fired.append((d, loop.time() - start)), delay)
+    
+    _run(scenario, clock, 0.15)
+    assert [d for d, _ in fired] == [0.02, 0.03, 0.05]
+    assert all(at >= delay for delay, at in fired)
+    assert clock.fired == 3 and clock.pending == 0
+
+
+def test_cancelled_timers_do_not_fire():
+    clock = GameClock(tick_s=0.01)
+    fired = []
+    
+    def scenario(loop):
+        handle = clock.schedule(0.02, fired.append, "cancelled")
+        clock.schedule(0.03, fired.append, "kept")
+        clock.cancel(handle)
+        clock.cancel(handle)  # Twice is a no-op
+        assert clock.pending == 1
+    
+    _run(scenario, clock, 0.1)
+    assert fired == ["kept"]
+    assert clock.pending == 0
+
+
+def test_timers_longer_than_a_wheel_revolution_wait_their_turn():
+    clock = GameClock(tick_s=0.01, slots=4)
+    fired = []
+    
+    def scenario(loop):
+        start = loop.time()
+        clock.schedule(0.1, lambda: fired.append(loop.time() - start))  # 10 ticks on a 4-slot wheel
+    
+    _run(scenario, clock, 0.2)
+    assert len(fired) == 1 and fired[0] >= 0.1
+
+
+def test_slow_or_failing_callbacks_do_not_stall_the_wheel():
+    clock = GameClock(tick_s=0.01)
+    fired = []
+    
+    async def slow():
+        await asyncio.sleep(0.2)
+        fired.append("slow")
+    
+    def failing():
+        raise RuntimeError("boom")
+    
+    def scenario(loop):
+        clock.schedule(0.01, slow)
+        clock.schedule(0.01, failing)
+        clock.schedule(0.03, fired.append, "after")
+    
+    _run(scenario, clock, 0.1)
+    assert fired == ["after"]
+    assert clock.fired == 3
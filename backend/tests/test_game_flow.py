@@ -0,0 +1,207 @@
+import asyncio
+import pytest
+from app.models.question import QuizQuestion
+from app.models.user import TokenData
+from app.routers import rooms_test
+from app.services.answer_matrix import AnswerMatrix
+from app.services.game_clock import GameClock
+from app.services.game_registry import QUESTION, GameRecord
+from app.services.game_service import game_service
+from app.sockets import game_events
+
+
+@pytest.fixture
+def flow(monkeypatch):
+    """A 3-question game with emits that yield to other tasks, like real ones"""
+    questions = [
+        QuizQuestion(id=f"q{i}", question="?", options=["a", "b"], correct_answer=0, difficulty="easy", category="T")
+        for i in range(3)
+    ]
+    record = GameRecord("game_F1", "F1", questions, AnswerMatrix([q.id for q in questions], 2), "2024-01-01T00:00:00")
+    record.roster = {"p1", "p2"}
+    record.phase = QUESTION
+    game_service.active_games.add(record)
+    
+    emitted = []
+    
+    async def emit(event, data=None, room=None, **kwargs):
+        await asyncio.sleep(0)
+        emitted.append(event)
+    
+    monkeypatch.setattr(game_events.sio, "emit", emit)
+    monkeypatch.setattr(game_events, "game_clock", GameClock(tick_s=0.01))
+    yield record, emitted
+    game_events.game_timers.pop(record.game_id, None)
+    game_service.active_games.discard(record.game_id)
+
+
+def test_concurrent_triggers_close_a_question_once(flow):
+    record, emitted = flow
+    
+    async def run():
+        # Answers pending for the room, so closing the question awaits a real emit
+        await game_events.answer_broadcaster.add_answer("F1", "p1", True, 100)
+        await asyncio.gather(
+            game_events.end_question("F1", "game_F1", 0),  # Deadline
+            game_events.end_question("F1", "game_F1", 0),  # Last answer
+            game_events.remove_player_from_game("F1", "p2"),  # Disconnect
+        )
+        return game_events.game_clock.pending
+    
+    pending = asyncio.run(run())
+    assert record.current_question_index == 1
+    assert pending == 1  # Only the next question's timer
+    assert emitted.count("answers_update") == 1
+
+
+def test_last_question_finishes_once(flow):
+    record, emitted = flow
+    record.current_question_index = 2
+    
+    async def run():
+        await asyncio.gather(
+            game_events.end_question("F1", "game_F1", 2),
+            game_events.end_question("F1", "game_F1", 2),
+        )
+    
+    asyncio.run(run())
+    assert emitted.count("game_finished") == 1
+    assert "game_F1" not in game_events.game_timers
+
+
+def test_disconnect_keeps_players_in_a_running_game(flow):
+    record, emitted = flow
+    
+    async def run():
+        await game_events.connections.add("s1", "F1", "p1", "P1")
+        await game_events.connections.add("s2", "F1", "p2", "P2")
+        await game_events.disconnect("s1")
+        await game_events.disconnect("s2")  # E.g. every socket closed by a restart
+    
+    asyncio.run(run())
+    assert record.current_question_index == 0  # Nobody left to answer is not "everyone answered"
+    assert record.to_doc()["roster"] == ["p1", "p2"]
+    assert "player_left" not in emitted
+    
+    # A rejoining player is waited for again
+    game_service.add_player("game_F1", "p1")
+    game_service.submit_answer("game_F1", "p1", "q0", 0, 1.0)
+    assert game_service.all_answered("game_F1")
+
+
+def test_disconnected_player_leaves_lobby_after_grace(monkeypatch, flow):
+    _, emitted = flow
+    monkeypatch.setattr(game_events.settings, "disconnect_grace_s", 0.03)
+    
+    async def run():
+        room = await game_events.room_service.create_room("host", "Host", "easy")
+        await game_events.room_service.join_room(room.id, "p1", "P1")
+        await game_events.room_service.join_room(room.id, "p2", "P2")
+        await game_events.connections.add("s1", room.id, "p1", "P1")
+        await game_events.connections.add("s2", room.id, "p2", "P2")
+        await game_events.disconnect("s1")
+        await game_events.disconnect("s2")
+        await game_events.connections.add("s3", room.id, "p2", "P2")  # p2 is back in time
+        await asyncio.sleep(0.1)
+        await game_events.connections.remove("s3")
+        return await game_events.room_service.get_room(room.id)
+    
+    room = asyncio.run(run())
+    assert [p.id for p in room.players] == ["host", "p2"]
+    assert emitted.count("player_left") == 1
+
+
+def test_joining_a_lobby_does_not_look_up_a_game(monkeypatch, flow):
+    loads = []
+    
+    async def authenticate(token):
+        return TokenData(user_id=token, username=token.upper())
+    
+    async def load_game(game_id):
+        loads.append(game_id)
+    
+    monkeypatch.setattr(game_events.token_service, "authenticate", authenticate)
+    monkeypatch.setattr(game_events.game_service, "load_game", load_game)
+    monkeypatch.setattr(game_events.sio, "enter_room", lambda sid, room: None)
+    
+    async def run():
+        room = await game_events.room_service.create_room("host", "Host", "easy")
+        await game_events.room_service.join_room(room.id, "p1", "P1")
+        await game_events.join_room("s1", {"room_id": room.id, "token": "host"})
+        await game_events.join_room("s2", {"room_id": room.id, "token": "p1"})
+        assert loads == []
+        
+        await game_events.room_service.start_game(room.id, "host")
+        await game_events.join_room("s3", {"room_id": room.id, "token": "p1"})  # Reconnect mid-game
+        assert loads == [f"game_{room.id}"]
+        for sid in ("s1", "s2", "s3"):
+            await game_events.connections.remove(sid)
+    
+    asyncio.run(run())
+
+
+def test_answers_only_count_for_the_connected_room_game(flow):
+    record, emitted = flow
+    
+    async def run():
+        await game_events.process_answer("OTHER", "s9", "attacker", {
+            "game_id": "game_F1", "question_id": "q0", "answer": 0, "time_taken": 0.0,
+        })
+    
+    asyncio.run(run())
+    assert "attacker" not in game_service.get_scores("game_F1")
+    assert emitted == ["error"]
+
+
+def test_spectators_are_never_waited_for(flow):
+    record, _ = flow
+    
+    async def run():
+        room = await game_events.room_service.create_room("host", "Host", "easy")
+        await game_events.room_service.join_room(room.id, "p1", "P1")
+        game_id = f"game_{room.id}"
+        game_service.active_games.add(GameRecord(game_id, room.id, record.questions, AnswerMatrix(["q0", "q1", "q2"], 2), record.created_at))
+        for sid, player_id in (("s1", "host"), ("s2", "p1"), ("s3", "spectator")):
+            await game_events.connections.add(sid, room.id, player_id, player_id)
+        
+        await game_events.start_game_flow(room.id, game_id)
+        roster = set(game_service.active_games.get(game_id).roster)
+        await game_events.rejoin_game(room.id, "spectator", "s3", is_player=False)
+        after_rejoin = set(game_service.active_games.get(game_id).roster)
+        
+        game_events.game_clock.cancel(game_events.game_timers.pop(game_id, None))
+        game_service.active_games.discard(game_id)
+        for sid in ("s1", "s2", "s3"):
+            await game_events.connections.remove(sid)
+        return roster, after_rejoin
+    
+    roster, after_rejoin = asyncio.run(run())
+    assert roster == {"host", "p1"}
+    assert after_rejoin == {"host", "p1"}
+
+
+def test_starting_a_room_runs_its_game(monkeypatch, flow):
+    record, emitted = flow
+    
+    async def fetch_questions(mode, count=10, seen_by=()):
+        return record.questions
+    
+    monkeypatch.setattr("app.services.game_service.quiz_service.fetch_questions", fetch_questions)
+    
+    async def run():
+        room = await game_events.room_service.create_room("host", "Host", "easy")
+        await game_events.room_service.join_room(room.id, "p1", "P1")
+        await rooms_test.start_game_test(room.id, "host")
+        
+        game_id = f"game_{room.id}"
+        game = game_service.active_games.get(game_id)
+        timer = game_events.game_timers.pop(game_id, None)
+        game_events.game_clock.cancel(timer)
+        game_service.active_games.discard(game_id)
+        await game_events.ownership.release(room.id)
+        return game, timer
+    
+    game, timer = asyncio.run(run())
+    assert game is not None and game.phase == QUESTION
+    assert timer is not None
+    assert emitted[:2] == ["game_started", "question_sent"]
@@ -0,0 +1,97 @@
+import asyncio
+import time
+from app.database.memory import MemoryClient
+from app.models.question import QuizQuestion
+from app.services.answer_matrix import AnswerMatrix
+from app.services.checkpoints import CHECKPOINTS, GameCheckpointer
+from app.services.game_registry import ABANDONED, ACTIVE, GameRecord, GameRegistry
+from app.services.persistence import WriteBehindQueue
+
+
+def _record(game_id: str, state: str = ACTIVE) -> GameRecord:
+    questions = [QuizQuestion(id="q0", question="?", options=["a", "b"], correct_answer=0, difficulty="easy", category="T")]
+    record = GameRecord(game_id, game_id, questions, AnswerMatrix(["q0"], 2), "2024-01-01T00:00:00")
+    record.state = state
+    return record
+
+
+def _registry(**kwargs) -> GameRegistry:
+    backend = MemoryClient(latency_ms=0, jitter_ms=0, op_latency_ms={})
+    return GameRegistry(backend.collection("games"), WriteBehindQueue(backend), **kwargs)
+
+
+def _idle(record: GameRecord, seconds: float):
+    record.last_used = time.monotonic() - seconds
+
+
+def test_sweep_expires_finished_and_abandons_idle_games():
+    registry = _registry(finished_ttl_s=10, abandoned_ttl_s=100)
+    done, stale, recent, busy = _record("done"), _record("stale"), _record("recent"), _record("busy")
+    for record in (done, stale, recent, busy):
+        registry.add(record)
+    registry.finish(done)
+    registry.finish(recent)
+    registry.retired.clear()
+    _idle(done, 11)
+    _idle(stale, 101)
+    _idle(busy, 50)
+    
+    registry.sweep(force=True)
+    assert [r.game_id for r in registry.records()] == ["recent", "busy"]
+    assert registry.expired == 1 and registry.abandoned == 1
+    assert stale.state == ABANDONED
+    assert registry.writes.pending("games", "stale").data == {"state": ABANDONED}
+    assert registry.retired == ["stale"]
+
+
+def test_sweep_runs_at_most_every_interval():
+    registry = _registry(finished_ttl_s=10, sweep_interval_s=30)
+    done = _record("done")
+    registry.add(done)
+    registry.finish(done)
+    _idle(done, 11)
+    
+    registry.sweep()
+    assert "done" in registry
+    registry.sweep(force=True)
+    assert "done" not in registry
+
+
+def test_caps_evict_finished_games_before_spilling_running_ones():
+    registry = _registry(max_games=2)
+    running, finished = _record("running"), _record("finished")
+    registry.add(running)
+    registry.add(finished)
+    registry.finish(finished)
+    
+    registry.add(_record("new"))  # Over the cap: the older finished game goes first
+    assert [r.game_id for r in registry.records()] == ["running", "new"]
+    assert registry.expired == 1 and registry.spilled == 0
+    
+    registry.add(_record("newer"))  # Only running games left: the oldest is spilled
+    assert [r.game_id for r in registry.records()] == ["new", "newer"]
+    assert registry.spilled == 1
+    assert registry.writes.pending("games", "running").data["snapshot"]["game_id"] == "running"
+
+
+def test_checkpoint_loop_sweeps_without_new_games():
+    registry = _registry(finished_ttl_s=10, sweep_interval_s=0)
+    done = _record("done")
+    registry.add(done)
+    registry.finish(done)
+    _idle(done, 11)
+    checkpointer = GameCheckpointer(
+        MemoryClient(latency_ms=0, jitter_ms=0, op_latency_ms={}).collection(CHECKPOINTS),
+        registry,
+        registry.writes,
+        interval_s=0.01,
+    )
+    
+    async def run():
+        await checkpointer.start()
+        await asyncio.sleep(0.05)
+        await checkpointer.stop()
+    
+    asyncio.run(run())
+    assert "done" not in registry
+    assert registry.expired == 1
@@ -0,0 +1,41 @@
+import asyncio
+from app.database.question_bank import QuestionBank
+from app.models.question import QuizQuestion
+
+
+def _question(text: str) -> QuizQuestion:
+    return QuizQuestion(id="0", question=text, options=["a", "b"], correct_answer=0, difficulty="easy", category="T")
+
+
+def test_bank_can_restart_after_stop(tmp_path):
+    bank = QuestionBank(str(tmp_path / "bank.db"))
+    
+    async def lifespan():
+        await bank.start()
+        await bank.add_many([_question(f"Q{len(await bank.sample('easy', 100))}?")])
+        questions = await bank.sample("easy", 10)
+        await bank.stop()
+        return questions
+    
+    assert len(asyncio.run(lifespan())) == 1
+    assert len(asyncio.run(lifespan())) == 2  # Same instance, second app lifespan
+
+
+def test_questions_committed_by_another_process_are_drawn(tmp_path):
+    path = str(tmp_path / "bank.db")
+    server = QuestionBank(path)
+    
+    async def run():
+        await server.start()
+        before = await server.sample("easy", 10)  # Caches the IDs
+        # E.g. manage_questions.py importing while the server runs
+        importer = QuestionBank(path)
+        await importer.add_many([_question("Imported?")])
+        await importer.stop()
+        after = await server.sample("easy", 10)
+        await server.stop()
+        return before, after
+    
+    before, after = asyncio.run(run())
+    assert before == []
+    assert [q.question for q in after] == ["Imported?"]
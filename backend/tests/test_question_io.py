@@ -0,0 +1,95 @@
+import asyncio
+import json
+import pytest
+from app.database.question_bank import QuestionBank
+from app.models.question import QuizQuestion
+from app.services.question_io import export_questions, import_questions, import_questions_async, row_to_question
+
+
+def _question(text: str, options, correct: int = 0) -> QuizQuestion:
+    return QuizQuestion(
+        id="0", question=text, options=options, correct_answer=correct, difficulty="easy", category="Science"
+    )
+
+
+@pytest.fixture
+def bank(tmp_path):
+    return QuestionBank(str(tmp_path / "bank.db"))
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "csv"])
+def test_round_trip(tmp_path, bank, fmt):
+    questions = [
+        _question("Bitwise operators?", ["&", "|", "^", "~"], correct=1),
+        _question('Quotes "and", commas', ['a, "b"', "c|d", "Ünïcode", "x"], correct=3),
+        _question("Literal &lt;tag&gt; text", ["<", "&lt;"], correct=1),
+    ]
+    bank.insert_batch(questions)
+    lines = "".join(export_questions(bank, fmt)).splitlines(keepends=True)
+    
+    other = QuestionBank(str(tmp_path / "other.db"))
+    report = import_questions(other, lines, fmt)
+    assert report["imported"] == 3 and report["invalid"] == 0
+    restored = {q.question: q for q in other.iter_all()}
+    for question in questions:
+        assert restored[question.question].options == question.options
+        assert restored[question.question].correct_answer == question.correct_answer
+
+
+def test_reimport_is_deduplicated(bank):
+    bank.insert_batch([_question("Same?", ["a", "b"])])
+    lines = list(export_questions(bank, "jsonl"))
+    report = import_questions(bank, lines, "jsonl")
+    assert report["duplicates"] == 1 and report["imported"] == 0
+
+
+def test_separated_options_with_empty_entries_are_rejected(bank):
+    lines = [
+        "question,options,correct_answer,difficulty,category\n",
+        "Ops?,&|||^|~,1,easy,Science\n",
+        "Fine?,a|b|c,2,easy,Science\n",
+    ]
+    report = import_questions(bank, lines, "csv")
+    assert report["invalid"] == 1 and report["imported"] == 1
+    assert report["errors"][0]["line"] == 2
+
+
+def test_opentdb_rows():
+    question = row_to_question({
+        "question": "What does &quot;CPU&quot; stand for?",
+        "correct_answer": "Central Processing Unit",
+        "incorrect_answers": ["Computer Personal Unit", "Central Process Unit"],
+        "difficulty": "Easy",
+        "category": "Science: Computers",
+    })
+    assert question.question == 'What does "CPU" stand for?'
+    assert question.options[question.correct_answer] == "Central Processing Unit"
+    assert question.difficulty == "easy"
+
+
+@pytest.mark.parametrize("row", [
+    {"question": "", "options": ["a", "b"], "correct_answer": 0},
+    {"question": "Q?", "options": ["a", "b"], "correct_answer": 2},
+    {"question": "Q?", "options": ["a", " "], "correct_answer": 0},
+    {"question": "Q?", "options": '{"a": 1}', "correct_answer": 0},
+])
+def test_invalid_rows(row):
+    with pytest.raises(ValueError):
+        row_to_question(row)
+
+
+def test_async_import_submits_each_batch_separately(bank):
+    rows = [{"question": f"Q{i}?", "options": ["a", "b"], "correct_answer": 0} for i in range(5)]
+    lines = [json.dumps(row) + "\n" for row in rows] + ["not json\n", json.dumps(rows[0]) + "\n"]
+    bank_calls = []
+    run = bank.run
+    
+    async def counting_run(func, *args):
+        bank_calls.append(func.__name__)
+        return await run(func, *args)
+    
+    bank.run = counting_run
+    report = asyncio.run(import_questions_async(bank, lines, "jsonl", batch_size=2))
+    
+    assert (report["read"], report["imported"], report["duplicates"], report["invalid"]) == (7, 5, 1, 1)
+    assert bank_calls == ["insert_batch"] * 3  # Bank thread is free between batches
@@ -0,0 +1,63 @@
+import asyncio
+import httpx
+from app.services.game_registry import public_question
+from app.services.quiz_service import QuizService
+
+OPENTDB_RESPONSE = {
+    "response_code": 0,
+    "results": [{
+        "category": "Science: Computers",
+        "type": "multiple",
+        "difficulty": "medium",
+        "question": "What does &quot;HTML&quot; stand for?",
+        "correct_answer": "HyperText Markup Language",
+        "incorrect_answers": ["Hyperlinks &amp; Text", "Home Tool", "&lt;html&gt;"],
+    }],
+}
+
+
+def _service(payload) -> QuizService:
+    service = QuizService()
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=payload)))
+    return service
+
+
+def test_opentdb_entities_are_decoded_at_ingest():
+    [question] = asyncio.run(_service(OPENTDB_RESPONSE)._request_questions("medium", 1))
+    
+    assert question.question == 'What does "HTML" stand for?'
+    assert question.options == ["Hyperlinks & Text", "Home Tool", "<html>", "HyperText Markup Language"]
+    assert question.correct_answer == 3
+
+
+def test_public_question_sends_text_as_stored():
+    # Already-plain text must not be decoded a second time
+    [question] = asyncio.run(_service(OPENTDB_RESPONSE)._request_questions("medium", 1))
+    literal = question.model_copy(update={"question": "Is &amp; an entity?", "options": ["&lt;", "<"]})
+    
+    payload = public_question(literal).value
+    assert payload["question"] == "Is &amp; an entity?"
+    assert payload["options"] == ["&lt;", "<"]
+
+
+def test_refill_loop_survives_a_failing_pass(monkeypatch):
+    monkeypatch.setattr("app.services.quiz_service.settings.question_bank_refill_s", 0.01)
+    service = QuizService()
+    passes = []
+    
+    async def refill():
+        passes.append(1)
+        if len(passes) == 1:
+            raise RuntimeError("bank unavailable")
+        return 0
+    
+    service.refill = refill
+    
+    async def run():
+        task = asyncio.create_task(service._refill_loop())
+        await asyncio.sleep(0.1)
+        task.cancel()
+    
+    asyncio.run(run())
+    assert len(passes) > 1
+    assert service.fetch_errors == 1
@@ -0,0 +1,77 @@
+import asyncio
+from contextlib import asynccontextmanager
+from benchmarks.redis_stub import Connection, Store
+from app.database.firestore import firestore_client
+from app.database.redis_client import redis_client
+from app.services.room_service import RoomService
+
+
+@asynccontextmanager
+async def shared_redis(monkeypatch):
+    """Point the Redis client at an in-process stub for the duration of a test"""
+    store = Store()
+    
+    async def handle(reader, writer):
+        await Connection(store, reader, writer).serve()
+    
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    monkeypatch.setattr(redis_client, "url", f"redis://127.0.0.1:{port}/0")
+    monkeypatch.setattr(redis_client, "_client", None)
+    try:
+        yield
+    finally:
+        await redis_client.stop()
+        server.close()
+
+
+def test_single_worker_join_and_leave():
+    async def run():
+        rooms = RoomService()
+        room = await rooms.create_room("host", "Host", "easy")
+        await rooms.join_room(room.id, "p1", "P1")
+        await rooms.leave_room(room.id, "host")
+        stored = await firestore_client.rooms.get(room.id)
+        assert [p["id"] for p in stored["players"]] == ["p1"]
+        assert stored["host_id"] == "p1"
+        assert await rooms.leave_room(room.id, "p1") is None
+        assert await rooms.get_room(room.id) is None
+    
+    asyncio.run(run())
+
+
+def test_joins_on_two_workers_are_all_kept(monkeypatch):
+    async def run():
+        async with shared_redis(monkeypatch):
+            worker_a, worker_b = RoomService(), RoomService()
+            room = await worker_a.create_room("host", "Host", "easy")
+            await asyncio.gather(
+                worker_a.join_room(room.id, "p1", "P1"),
+                worker_b.join_room(room.id, "p2", "P2"),
+                worker_b.join_room(room.id, "p3", "P3"),
+            )
+            await worker_a.leave_room(room.id, "p3")
+            stored = await firestore_client.rooms.get(room.id)
+            assert sorted(p["id"] for p in stored["players"]) == ["host", "p1", "p2"]
+            assert len((await worker_b.get_room(room.id)).players) == 3
+    
+    asyncio.run(run())
+
+
+def test_room_code_collision_does_not_overwrite(monkeypatch):
+    async def run():
+        worker_a, worker_b = RoomService(), RoomService()
+        room = await worker_a.create_room("host_a", "A", "easy")
+        await worker_b.start()
+        
+        # Worker B's code set predates the room
+        worker_b.code_allocator.live.discard(room.id)
+        codes = iter([room.id])
+        allocate = worker_b.code_allocator.allocate
+        monkeypatch.setattr(worker_b.code_allocator, "allocate", lambda: next(codes, None) or allocate())
+        
+        other = await worker_b.create_room("host_b", "B", "easy")
+        assert other.id != room.id
+        assert (await firestore_client.rooms.get(room.id))["host_id"] == "host_a"
+    
+    asyncio.run(run())
@@ -0,0 +1,49 @@
+import random
+from app.services.scoreboard import Scoreboard
+
+
+def test_empty_scoreboard():
+    board = Scoreboard()
+    assert board.winner() is None
+    assert board.top(3) == []
+    assert board.rank("p1") is None
+
+
+def test_higher_score_ranks_first_and_ties_go_to_the_faster_player():
+    board = Scoreboard()
+    board.record("slow", 100, 9.0)
+    board.record("fast", 100, 3.0)
+    board.record("best", 150, 12.0)
+    board.record("zero", 0, 1.0)
+    
+    assert board.top(4) == [("best", 150), ("fast", 100), ("slow", 100), ("zero", 0)]
+    assert board.rank("fast") == 2 and board.rank("slow") == 3
+    assert board.winner() == "best"
+
+
+def test_later_answers_move_players():
+    board = Scoreboard()
+    board.record("p1", 100, 2.0)
+    board.record("p2", 50, 1.0)
+    board.record("p2", 100, 4.0)  # 150 in total: overtakes p1
+    
+    assert board.top(2) == [("p2", 150), ("p1", 100)]
+    board.record("p1", 50, 5.0)  # 150 in 7s vs p2's 150 in 5s
+    assert board.top(2) == [("p2", 150), ("p1", 150)]
+    assert board.scores() == {"p1": 150, "p2": 150}
+
+
+def test_ranking_matches_a_full_sort():
+    rng = random.Random(7)
+    board = Scoreboard()
+    totals, times = {}, {}
+    for _ in range(500):
+        player_id = f"p{rng.randrange(20)}"
+        points, time_taken = rng.choice([0, 50, 100]), rng.uniform(0.5, 15.0)
+        board.record(player_id, points, time_taken)
+        totals[player_id] = totals.get(player_id, 0) + points
+        times[player_id] = times.get(player_id, 0.0) + time_taken
+    
+    expected = sorted(totals, key=lambda p: (-totals[p], times[p], p))
+    assert [player_id for player_id, _ in board.top(len(expected))] == expected
+    assert [board.rank(p) for p in expected] == list(range(1, len(expected) + 1))
@@ -0,0 +1,184 @@
+import asyncio
+import datetime
+import time
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+from app.models.user import TokenData, User
+from app.routers import auth as auth_router
+from app.services.token_service import TokenService
+from app.utils.security import create_access_token
+
+PROJECT = "test-project"
+
+
+def _signing_key():
+    """An RSA key and its self-signed certificate (PEM), like Google's token signing certs"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "test")])
+    now = datetime.datetime.utcnow()
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(1)
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    return private_pem, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+@pytest.fixture(scope="module")
+def signing_key():
+    return _signing_key()
+
+
+def firebase_token(private_pem: bytes, kid: str = "k1", uid: str = "uid1", **claims) -> str:
+    now = int(time.time())
+    payload = {
+        "iss": f"https://securetoken.google.com/{PROJECT}",
+        "aud": PROJECT,
+        "sub": uid,
+        "iat": now,
+        "exp": now + 3600,
+        **claims,
+    }
+    return jwt.encode(payload, private_pem, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def service(monkeypatch, signing_key):
+    """A TokenService whose key store counts fetches instead of calling Google"""
+    monkeypatch.setattr("app.services.token_service.settings.firebase_project_id", PROJECT)
+    service = TokenService()
+    service.key_store.fetches = 0
+    
+    async def fetch():
+        service.key_store.fetches += 1
+        return {"k1": signing_key[1]}, 3600.0
+    
+    service.key_store._fetch = fetch
+    return service
+
+
+def test_verifies_firebase_token(service, signing_key):
+    claims = asyncio.run(service.verify_firebase_token(firebase_token(signing_key[0], email="a@b.c")))
+    assert claims["uid"] == "uid1"
+    assert claims["email"] == "a@b.c"
+
+
+def test_unknown_key_ids_are_refetched_at_most_once(service, signing_key):
+    forged = [firebase_token(signing_key[0], kid=f"forged{i}") for i in range(50)]
+    
+    async def run():
+        await service.key_store.refresh()
+        return await asyncio.gather(*(service.verify_firebase_token(t) for t in forged), return_exceptions=True)
+    
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert service.key_store.fetches == 1  # Fetched recently: no refetch for any of them
+    assert service.key_store.throttled == 50
+
+
+def test_rotated_key_is_fetched(service, signing_key):
+    async def run():
+        await service.key_store.refresh()
+        service.key_store.certs = {"old": "..."}  # Loaded before Google rotated to k1
+        service.key_store._last_attempt -= 3600
+        return await service.verify_firebase_token(firebase_token(signing_key[0]))
+    
+    assert asyncio.run(run())["uid"] == "uid1"
+    assert service.key_store.fetches == 2
+
+
+def test_session_tokens_are_verified_locally(service):
+    token = service.issue_session_token(TokenData(user_id="u1", username="alice", email="a@b.c"))
+    token_data = asyncio.run(service.authenticate(token))
+    
+    assert (token_data.user_id, token_data.username, token_data.email) == ("u1", "alice", "a@b.c")
+    assert not token_data.firebase
+    assert service.session_verified == 1 and service.firebase_verified == 0
+    assert service.key_store.fetches == 0  # Never touched Google's keys
+
+
+def test_firebase_tokens_go_through_the_key_store(service, signing_key):
+    token_data = asyncio.run(service.authenticate(firebase_token(signing_key[0], email="bob@example.com")))
+    
+    assert token_data.firebase
+    assert (token_data.user_id, token_data.username) == ("uid1", "bob")
+    assert service.firebase_verified == 1 and service.session_verified == 0
+
+
+def test_bad_session_token_does_not_fall_back_to_firebase(service):
+    expired = create_access_token({"sub": "u1", "username": "alice"}, expires_delta=datetime.timedelta(seconds=-1))
+    with pytest.raises(ValueError):
+        asyncio.run(service.authenticate(expired))
+    assert service.key_store.fetches == 0
+
+
+def _bearer(token: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_session_token_works_without_firebase(monkeypatch, service):
+    user = User(user_id="u1", username="alice", email="a@b.c", created_at="2024-01-01T00:00:00")
+    
+    async def get_user_by_id(user_id):
+        return user if user_id == "u1" else None
+    
+    monkeypatch.setattr(auth_router, "firebase_initialized", False)
+    monkeypatch.setattr(auth_router, "token_service", service)
+    monkeypatch.setattr(auth_router.auth_service, "get_user_by_id", get_user_by_id)
+    
+    session = service.issue_session_token(TokenData(user_id="u1", username="alice"))
+    assert asyncio.run(auth_router.get_current_user(_bearer(session))) == user
+    
+    with pytest.raises(HTTPException) as unknown:
+        asyncio.run(auth_router.get_current_user(_bearer(service.issue_session_token(TokenData(user_id="u2", username="x")))))
+    assert unknown.value.status_code == 401
+    
+    with pytest.raises(HTTPException) as no_firebase:
+        asyncio.run(auth_router.get_current_user(_bearer("not-a-session-token")))
+    assert no_firebase.value.status_code == 503
+
+
+def test_session_exchange_needs_a_firebase_token(monkeypatch, service, signing_key):
+    user = User(user_id="uid1", username="bob", email="bob@example.com", created_at="2024-01-01T00:00:00")
+    
+    async def get_or_create_firebase_user(user_id, email, username):
+        return user
+    
+    monkeypatch.setattr(auth_router, "firebase_initialized", True)
+    monkeypatch.setattr(auth_router, "token_service", service)
+    monkeypatch.setattr(auth_router.auth_service, "get_or_create_firebase_user", get_or_create_firebase_user)
+    
+    session = asyncio.run(auth_router.create_session(_bearer(firebase_token(signing_key[0]))))
+    assert session.expires_in == auth_router.settings.session_token_ttl_s
+    assert asyncio.run(service.authenticate(session.access_token)).user_id == "uid1"
+    
+    with pytest.raises(HTTPException) as again:
+        asyncio.run(auth_router.create_session(_bearer(session.access_token)))
+    assert again.value.status_code == 400
+
+
+def test_public_jwt_secret_is_refused_outside_development(monkeypatch, service):
+    token = service.issue_session_token(TokenData(user_id="u1", username="alice"))
+    monkeypatch.setattr("app.utils.security.settings.environment", "production")
+    
+    with pytest.raises(ValueError):
+        asyncio.run(service.authenticate(token))
+    with pytest.raises(ValueError):
+        service.issue_session_token(TokenData(user_id="u1", username="alice"))
+    
+    monkeypatch.setattr("app.utils.security.settings.jwt_secret_key", "a-real-secret")
+    assert asyncio.run(service.authenticate(create_access_token({"sub": "u1", "username": "alice"}))).user_id == "u1"
@@ -21,6 +21,9 @@ class QuestService {
   GameState _gameState = GameState();
   String? _currentGameId;
   String? _currentUserId;
+  DateTime? _questionDeadline;
+  int _timeLimit = 15;
+  Timer? _countdown;
 
   Room? get currentRoom => _currentRoom;
   List<QuizQuestion> get questions => _questions;
@@ -76,6 +79,7 @@ class QuestService {
       _gameState = _gameState.copyWith(
         status: GameStatus.starting,
         totalQuestions: data['total_questions'] ?? 10,
+        playerScores: {},
       );
       _gameStateController.add(_gameState);
     };
@@ -85,36 +89,40 @@ class QuestService {
       final questionIndex = data['question_index'];
       final questionData = data['question'];
       final timeLimit = data['time_limit'] ?? 15;
+      final deadline = data['deadline'];
 
       // Add question to list if not already there
       if (questionIndex >= _questions.length) {
         _questions.add(QuizQuestion.fromJson(questionData));
       }
 
+      // The server sends the deadline (epoch ms) instead of per-second ticks
+      _timeLimit = timeLimit;
+      _questionDeadline = deadline != null
+          ? DateTime.fromMillisecondsSinceEpoch(deadline)
+          : DateTime.now().add(Duration(seconds: timeLimit));
+
       _gameState = _gameState.copyWith(
         status: GameStatus.inProgress,
         currentQuestionIndex: questionIndex,
-        timeRemaining: timeLimit,
+        timeRemaining: _secondsRemaining().ceil(),
         hasAnswered: false,
         selectedAnswer: null,
       );
       _gameStateController.add(_gameState);
+      _startCountdown();
     };
 
-    _socket.onTimerUpdate = (data) {
-      final timeRemaining = data['time_remaining'];
-      _gameState = _gameState.copyWith(timeRemaining: timeRemaining);
-      _gameStateController.add(_gameState);
-    };
-
-    _socket.onAnswerReceived = (data) {
+    _socket.onAnswerResult = (data) {
       print('✅ Answer acknowledged: $data');
-      // Server acknowledged our answer
+      // Server scored our answer
     };
 
-    _socket.onScoreUpdate = (data) {
-      print('🏆 Score update: $data');
-      final scores = Map<String, int>.from(data['scores']);
+    _socket.onAnswersUpdate = (data) {
+      print('🏆 Answers update: $data');
+      // Only the scores that changed are sent, so merge them in
+      final scores = Map<String, int>.from(_gameState.playerScores)
+        ..addAll(Map<String, int>.from(data['scores'] ?? {}));
       _gameState = _gameState.copyWith(playerScores: scores);
       _gameStateController.add(_gameState);
     };
@@ -123,6 +131,7 @@ class QuestService {
       print('🎉 Game finished: $data');
       final scores = Map<String, int>.from(data['final_scores']);
       final winner = data['winner'];
+      _stopCountdown();
       
       _gameState = _gameState.copyWith(
         status: GameStatus.ended,
@@ -136,6 +145,32 @@ class QuestService {
     };
   }
 
+  /// Seconds left on the current question (clamped to its time limit, in case of clock skew)
+  double _secondsRemaining() {
+    if (_questionDeadline == null) return 0;
+    final remaining =
+        _questionDeadline!.difference(DateTime.now()).inMilliseconds / 1000;
+    return remaining.clamp(0, _timeLimit).toDouble();
+  }
+
+  /// Update the countdown locally until the question's deadline
+  void _startCountdown() {
+    _stopCountdown();
+    _countdown = Timer.periodic(const Duration(milliseconds: 250), (timer) {
+      final timeRemaining = _secondsRemaining().ceil();
+      if (timeRemaining != _gameState.timeRemaining) {
+        _gameState = _gameState.copyWith(timeRemaining: timeRemaining);
+        _gameStateController.add(_gameState);
+      }
+      if (timeRemaining <= 0) _stopCountdown();
+    });
+  }
+
+  void _stopCountdown() {
+    _countdown?.cancel();
+    _countdown = null;
+  }
+
   /// Create a new room
   Future<Room> createRoom({
     required String mode,
@@ -183,6 +218,7 @@ class QuestService {
       await _api.leaveRoom(_currentRoom!.id);
       _socket.leaveRoom(_currentRoom!.id);
       
+      _stopCountdown();
       _currentRoom = null;
       _questions = [];
       _gameState = GameState();
@@ -215,7 +251,7 @@ class QuestService {
   }) async {
     if (!_gameState.canAnswer || _currentGameId == null) return;
 
-    final timeTaken = 15 - _gameState.timeRemaining.toDouble();
+    final timeTaken = _timeLimit - _secondsRemaining();
     final question = _questions[_gameState.currentQuestionIndex];
 
     // Mark as answered locally to prevent double submission
@@ -236,6 +272,7 @@ class QuestService {
 
   /// Dispose the service
   void dispose() {
+    _stopCountdown();
     _roomController.close();
     _gameStateController.close();
     _socket.disconnect();
@@ -10,9 +10,8 @@ class MultiplayerSocketService {
   Function(dynamic)? onPlayerLeft;
   Function(dynamic)? onGameStarted;
   Function(dynamic)? onQuestionSent;
-  Function(dynamic)? onTimerUpdate;
-  Function(dynamic)? onAnswerReceived;
-  Function(dynamic)? onScoreUpdate;
+  Function(dynamic)? onAnswerResult;
+  Function(dynamic)? onAnswersUpdate;
   Function(dynamic)? onGameFinished;
   Function(String)? onError;
   
@@ -80,19 +79,16 @@ class MultiplayerSocketService {
       onQuestionSent?.call(data);
     });
     
-    _socket!.on('timer_update', (data) {
-      print('⏱️ Timer update: $data');
-      onTimerUpdate?.call(data);
+    // Sent only to the player who answered
+    _socket!.on('answer_result', (data) {
+      print('✅ Answer result: $data');
+      onAnswerResult?.call(data);
     });
     
-    _socket!.on('answer_received', (data) {
-      print('✅ Answer received: $data');
-      onAnswerReceived?.call(data);
-    });
-    
-    _socket!.on('score_update', (data) {
-      print('🏆 Score update: $data');
-      onScoreUpdate?.call(data);
+    // Answers batched per room: {answers: [{player_id, is_correct}], scores: {player_id: total}}
+    _socket!.on('answers_update', (data) {
+      print('🏆 Answers update: $data');
+      onAnswersUpdate?.call(data);
     });
     
     _socket!.on('game_finished', (data) {
@@ -164,9 +160,8 @@ class MultiplayerSocketService {
     onPlayerLeft = null;
     onGameStarted = null;
     onQuestionSent = null;
-    onTimerUpdate = null;
-    onAnswerReceived = null;
-    onScoreUpdate = null;
+    onAnswerResult = null;
+    onAnswersUpdate = null;
     onGameFinished = null;
     onError = null;
   }